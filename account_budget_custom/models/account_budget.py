@@ -214,40 +214,14 @@ class CrossoveredBudgetLines(models.Model):
                 reserved_amount -= line.with_context({'reserved': True}).pull_out
             line.reserved_amount = reserved_amount
 
-    def _compute_practical_amount(self):
-        for line in self:
-            acc_ids = line.general_budget_id.account_ids.ids
-            date_to = self.env.context.get('wizard_date_to') or line.date_to
-            date_from = self.env.context.get(
-                'wizard_date_from') or line.date_from
-            if line.analytic_account_id.id:
-                analytic_line_obj = self.env['account.analytic.line']
-                domain = [('account_id', '=', line.analytic_account_id.id),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to),
-                          ]
-                if acc_ids:
-                    domain += [('general_account_id', 'in', acc_ids)]
-
-                where_query = analytic_line_obj._where_calc(domain)
-                analytic_line_obj._apply_ir_rules(where_query, 'read')
-                from_clause, where_clause, where_clause_params = where_query.get_sql()
-                select = "SELECT SUM(amount) from " + from_clause + " where " + where_clause
-
-            else:
-                aml_obj = self.env['account.move.line']
-                domain = [('account_id', 'in',
-                           line.general_budget_id.account_ids.ids),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to)
-                          ]
-                where_query = aml_obj._where_calc(domain)
-                aml_obj._apply_ir_rules(where_query, 'read')
-                from_clause, where_clause, where_clause_params = where_query.get_sql()
-                select = "SELECT sum(credit)-sum(debit) from " + from_clause + " where " + where_clause
-
-            self.env.cr.execute(select, where_clause_params)
-            line.practical_amount = self.env.cr.fetchone()[0] or 0.0
+    def _get_practical_amount_dates(self):
+        date_from, date_to = super(CrossoveredBudgetLines, self)._get_practical_amount_dates()
+        return self.env.context.get('wizard_date_from') or date_from, self.env.context.get('wizard_date_to') or date_to
+
+    @api.model
+    def _get_practical_amount_move_line_domain(self):
+        # The journal items are summed whatever the state of their entry.
+        return []
 
     def _check_amount(self, amount=0, purchase_remind=0, transfer=False):
         for obj in self:
@@ -216,7 +216,7 @@ class BudgetConfirmationLine(models.Model):
         analytic_account_id = self.analytic_account_id
         date = self.date
         date = fields.Date.from_string(date)
-        budget_post = self.env['account.budget.post'].search([]).filtered(lambda x: self.account_id in x.account_ids)
+        budget_post = self.env['account.budget.post']._get_budget_posts(self.account_id)
 
         budget_lines = analytic_account_id.crossovered_budget_line.filtered(
             lambda x: x.general_budget_id in budget_post and
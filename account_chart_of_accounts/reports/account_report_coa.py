@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import io
+import tempfile
 from copy import deepcopy
 from collections import defaultdict
 from odoo import models, fields, api, _
@@ -257,6 +258,13 @@ class AccountChartOfAccountReport(models.AbstractModel):
         ]
         return [header1, header2]
 
+    def get_xlsx_file(self, options):
+        # OVERRIDE: the full hierarchy needs all the lines at once, keep building the workbook in memory.
+        output = tempfile.TemporaryFile()
+        output.write(self.get_xlsx(options))
+        output.seek(0)
+        return output
+
     def get_xlsx(self, options, response=None):
         output = io.BytesIO()
         workbook = xlsxwriter.Workbook(output, {'in_memory': True})
@@ -1,4 +1,7 @@
 from . import account_group
 from . import account
+from . import account_move
 from . import account_move_line
+from . import account_move_line_residual
+from . import account_partial_reconcile
 from . import ir_actions_report
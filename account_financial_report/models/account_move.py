@@ -0,0 +1,16 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        self.env["account.move.line.residual"].sudo()._refresh(posted.line_ids.ids)
+        return posted
+
+    def button_draft(self):
+        res = super().button_draft()
+        self.env["account.move.line.residual"].sudo()._refresh(self.line_ids.ids)
+        return res
@@ -31,6 +31,15 @@ class AccountMoveLine(models.Model):
             ON account_move_line (account_id, partner_id)"""
             )
 
+    def write(self, vals):
+        res = super().write(vals)
+        residual_model = self.env["account.move.line.residual"].sudo()
+        if not residual_model._residual_fields.isdisjoint(vals):
+            residual_model._refresh(
+                self.filtered(lambda line: line.parent_state == "posted").ids
+            )
+        return res
+
     @api.model
     def search_count(self, args):
         # In Big DataBase every time you change the domain widget this method
@@ -0,0 +1,152 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountMoveLineResidual(models.Model):
+    """Dated history of the residual amount of the posted journal items on
+    reconcilable accounts.
+
+    Each row gives the residual of a journal item (in company currency) during
+    the [date_from, date_to[ interval, date_to being empty for the current one.
+    The residual changes at the max_date of each partial reconciliation. Intervals
+    during which the journal item is fully reconciled are not stored, so the open
+    items at a given date are the rows whose interval contains this date.
+
+    The history is recomputed for the journal items involved each time they are
+    posted, reset to draft, reconciled or unreconciled.
+    """
+
+    _name = "account.move.line.residual"
+    _description = "Journal Item Residual History"
+    _log_access = False
+
+    move_line_id = fields.Many2one(
+        "account.move.line", required=True, readonly=True, ondelete="cascade"
+    )
+    company_id = fields.Many2one("res.company", required=True, readonly=True)
+    account_id = fields.Many2one("account.account", required=True, readonly=True)
+    date_from = fields.Date(required=True, readonly=True)
+    date_to = fields.Date(readonly=True)
+    residual = fields.Float(readonly=True)
+
+    # Fields of account.move.line the history depends on.
+    _residual_fields = {
+        "company_id",
+        "account_id",
+        "date",
+        "debit",
+        "credit",
+        "balance",
+    }
+
+    def init(self):
+        self._cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS account_move_line_residual_move_line_id_index
+            ON account_move_line_residual (move_line_id)
+            """
+        )
+        self._cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS account_move_line_residual_date_index
+            ON account_move_line_residual (company_id, account_id, date_from, date_to)
+            """
+        )
+        self._cr.execute("SELECT 1 FROM account_move_line_residual LIMIT 1")
+        if not self._cr.fetchone():
+            self._rebuild()
+
+    def _get_insert_query(self, where_clause):
+        """Build the query computing the residual intervals of journal items.
+
+        :param where_clause: An additional SQL condition on "line".
+        :return: The INSERT query as a string.
+        """
+        return (
+            """
+            WITH lines AS (
+                SELECT line.id, line.date, line.balance
+                FROM account_move_line line
+                JOIN account_account account ON account.id = line.account_id
+                WHERE line.parent_state = 'posted'
+                AND account.reconcile
+                AND """
+            + where_clause
+            + """
+            ),
+            events AS (
+                SELECT lines.id AS move_line_id, lines.date, lines.balance AS amount
+                FROM lines
+                UNION ALL
+                SELECT lines.id, part.max_date, -part.amount
+                FROM lines
+                JOIN account_partial_reconcile part ON part.debit_move_id = lines.id
+                UNION ALL
+                SELECT lines.id, part.max_date, part.amount
+                FROM lines
+                JOIN account_partial_reconcile part ON part.credit_move_id = lines.id
+            ),
+            daily_events AS (
+                SELECT move_line_id, date, SUM(amount) AS amount
+                FROM events
+                GROUP BY move_line_id, date
+            ),
+            intervals AS (
+                SELECT
+                    move_line_id,
+                    date AS date_from,
+                    LEAD(date) OVER line_window AS date_to,
+                    SUM(amount) OVER line_window AS residual
+                FROM daily_events
+                WINDOW line_window AS (PARTITION BY move_line_id ORDER BY date)
+            )
+            INSERT INTO account_move_line_residual (
+                move_line_id, company_id, account_id, date_from, date_to, residual
+            )
+            SELECT
+                intervals.move_line_id,
+                line.company_id,
+                line.account_id,
+                intervals.date_from,
+                intervals.date_to,
+                ROUND(intervals.residual, currency.decimal_places)
+            FROM intervals
+            JOIN account_move_line line ON line.id = intervals.move_line_id
+            JOIN res_currency currency ON currency.id = line.company_currency_id
+            WHERE ROUND(intervals.residual, currency.decimal_places) != 0
+            """
+        )
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole history."""
+        self.env["account.move.line"].flush()
+        self.env["account.partial.reconcile"].flush()
+        self._cr.execute("TRUNCATE account_move_line_residual")
+        self._cr.execute(self._get_insert_query("TRUE"))
+        _logger.info(
+            "Journal items residual history rebuilt: %s rows.", self._cr.rowcount
+        )
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh(self, move_line_ids):
+        """Recompute the history of some journal items.
+
+        :param move_line_ids: The ids of account.move.line records.
+        """
+        if not move_line_ids:
+            return
+        move_line_ids = list(move_line_ids)
+        self.env["account.move.line"].flush()
+        self.env["account.partial.reconcile"].flush()
+        self._cr.execute(
+            "DELETE FROM account_move_line_residual WHERE move_line_id = ANY(%s)",
+            [move_line_ids],
+        )
+        self._cr.execute(self._get_insert_query("line.id = ANY(%s)"), [move_line_ids])
+        self.invalidate_cache()
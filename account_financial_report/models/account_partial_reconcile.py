@@ -0,0 +1,22 @@
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+from odoo import api, models
+
+
+class AccountPartialReconcile(models.Model):
+    _inherit = "account.partial.reconcile"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        partials = super().create(vals_list)
+        self.env["account.move.line.residual"].sudo()._refresh(
+            (partials.debit_move_id | partials.credit_move_id).ids
+        )
+        return partials
+
+    def unlink(self):
+        # Partials are also removed directly, e.g. from the payment widget, so
+        # the history is refreshed here rather than in remove_move_reconcile.
+        lines = self.debit_move_id | self.credit_move_id
+        res = super().unlink()
+        self.env["account.move.line.residual"].sudo()._refresh(lines.exists().ids)
+        return res
@@ -2,11 +2,9 @@
 # Copyright 2020 ForgeFlow S.L. (https://www.forgeflow.com)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
-import operator
-from datetime import date, datetime, timedelta
+from datetime import datetime, timedelta
 
 from odoo import api, models
-from odoo.tools import float_is_zero
 
 
 class AgedPartnerBalanceReport(models.AbstractModel):
@@ -14,6 +12,17 @@ class AgedPartnerBalanceReport(models.AbstractModel):
     _description = "Aged Partner Balance Report"
     _inherit = "report.account_financial_report.abstract_report"
 
+    # Amounts computed by _get_move_lines_data, in the order of the query columns.
+    _amount_keys = (
+        "residual",
+        "current",
+        "30_days",
+        "60_days",
+        "90_days",
+        "120_days",
+        "older",
+    )
+
     @api.model
     def _initialize_account(self, ag_pb_data, acc_id):
         ag_pb_data[acc_id] = {}
@@ -119,6 +128,91 @@ class AgedPartnerBalanceReport(models.AbstractModel):
             )
         return accounts_partial_reconcile, debit_amount, credit_amount
 
+    def _get_open_items_query(
+        self, company_id, account_ids, partner_ids, date_at_object, date_from,
+        only_posted_moves,
+    ):
+        """Build the query returning the journal items open at date_at_object
+        with their residual at that date, read from account.move.line.residual.
+
+        :return: (query, params)
+        """
+        params = {
+            "company_id": company_id,
+            "account_ids": tuple(account_ids),
+            "partner_ids": tuple(partner_ids or ()),
+            "date_at": date_at_object,
+            "date_from": date_from,
+        }
+        open_items_query = """
+            SELECT hist.move_line_id AS id, hist.residual AS amount_residual
+            FROM account_move_line_residual hist
+            WHERE hist.company_id = %(company_id)s
+            AND hist.account_id IN %(account_ids)s
+            AND hist.date_from <= %(date_at)s
+            AND (hist.date_to IS NULL OR hist.date_to > %(date_at)s)
+        """
+        if not only_posted_moves:
+            # Draft journal items can't be reconciled: their residual is constant.
+            open_items_query += """
+                UNION ALL
+                SELECT line.id, line.amount_residual
+                FROM account_move_line line
+                WHERE line.parent_state = 'draft'
+                AND line.company_id = %(company_id)s
+                AND line.account_id IN %(account_ids)s
+                AND line.date <= %(date_at)s
+                AND line.amount_residual != 0
+            """
+        where_clause = "TRUE"
+        if partner_ids:
+            where_clause += " AND line.partner_id IN %(partner_ids)s"
+        if date_from:
+            where_clause += " AND line.date > %(date_from)s"
+        # Apply the record rules on the journal items, as search_read did.
+        aml_model = self.env["account.move.line"]
+        aml_model.check_access_rights("read")
+        rules_query = aml_model._where_calc([])
+        aml_model._apply_ir_rules(rules_query, "read")
+        from_clause, rules_where_clause, rules_params = rules_query.get_sql()
+        if rules_where_clause:
+            rules_subquery = self.env.cr.mogrify(
+                "SELECT account_move_line.id FROM {} WHERE {}".format(
+                    from_clause, rules_where_clause
+                ),
+                rules_params,
+            ).decode()
+            # The query is executed with named parameters: escape the literals.
+            where_clause += " AND line.id IN ({})".format(
+                rules_subquery.replace("%", "%%")
+            )
+        query = """
+            SELECT
+                line.id,
+                line.name,
+                line.ref,
+                line.date,
+                line.date_maturity,
+                line.move_id,
+                line.journal_id,
+                line.account_id,
+                line.partner_id,
+                open_items.amount_residual
+            FROM ({}) open_items
+            JOIN account_move_line line ON line.id = open_items.id
+            WHERE {}
+        """.format(
+            open_items_query, where_clause
+        )
+        return query, params
+
+    @api.model
+    def _add_amounts(self, ag_pb_data, acc_id, prt_id, amounts):
+        for key, amount in amounts.items():
+            ag_pb_data[acc_id][key] += amount
+            ag_pb_data[acc_id][prt_id][key] += amount
+        return ag_pb_data
+
     def _get_move_lines_data(
         self,
         company_id,
@@ -129,123 +223,151 @@ class AgedPartnerBalanceReport(models.AbstractModel):
         only_posted_moves,
         show_move_line_details,
     ):
-        domain = self._get_move_lines_domain_not_reconciled(
-            company_id, account_ids, partner_ids, only_posted_moves, date_from
-        )
-        ml_fields = [
-            "id",
-            "name",
-            "date",
-            "move_id",
-            "journal_id",
-            "account_id",
-            "partner_id",
-            "amount_residual",
-            "date_maturity",
-            "ref",
-            "reconciled",
-        ]
-        line_model = self.env["account.move.line"]
-        move_lines = line_model.search_read(domain=domain, fields=ml_fields)
         journals_ids = set()
-        partners_ids = set()
         partners_data = {}
         ag_pb_data = {}
-        if date_at_object < date.today():
-            (
-                acc_partial_rec,
-                debit_amount,
-                credit_amount,
-            ) = self._get_account_partial_reconciled(company_id, date_at_object)
-            if acc_partial_rec:
-                ml_ids = list(map(operator.itemgetter("id"), move_lines))
-                debit_ids = list(
-                    map(operator.itemgetter("debit_move_id"), acc_partial_rec)
-                )
-                credit_ids = list(
-                    map(operator.itemgetter("credit_move_id"), acc_partial_rec)
+        if not account_ids:
+            return ag_pb_data, {}, partners_data, {}
+        query, params = self._get_open_items_query(
+            company_id,
+            account_ids,
+            partner_ids,
+            date_at_object,
+            date_from,
+            only_posted_moves,
+        )
+        self.env["account.move.line"].flush()
+        # Age the residuals directly in SQL, see _calculate_amounts.
+        self.env.cr.execute(
+            """
+            SELECT
+                open_items.account_id,
+                COALESCE(open_items.partner_id, 0),
+                SUM(open_items.amount_residual),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity IS NULL
+                    OR open_items.date_maturity >= %(date_at)s
+                ),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity < %(date_at)s
+                    AND open_items.date_maturity >= %(date_at)s::date - 30
+                ),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity < %(date_at)s::date - 30
+                    AND open_items.date_maturity >= %(date_at)s::date - 60
+                ),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity < %(date_at)s::date - 60
+                    AND open_items.date_maturity >= %(date_at)s::date - 90
+                ),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity < %(date_at)s::date - 90
+                    AND open_items.date_maturity >= %(date_at)s::date - 120
+                ),
+                SUM(open_items.amount_residual) FILTER (
+                    WHERE open_items.date_maturity < %(date_at)s::date - 120
                 )
-                move_lines = self._recalculate_move_lines(
-                    move_lines,
-                    debit_ids,
-                    credit_ids,
-                    debit_amount,
-                    credit_amount,
-                    ml_ids,
-                    account_ids,
-                    company_id,
-                    partner_ids,
-                    only_posted_moves,
+            FROM ({}) open_items
+            GROUP BY open_items.account_id, COALESCE(open_items.partner_id, 0)
+            """.format(
+                query
+            ),
+            params,
+        )
+        groups = self.env.cr.fetchall()
+        partners_names = dict(
+            self.env["res.partner"]
+            .browse({prt_id for dummy, prt_id, *amounts in groups if prt_id})
+            .name_get()
+        )
+        for acc_id, prt_id, *amounts in groups:
+            amounts = [amount or 0.0 for amount in amounts]
+            if prt_id not in partners_data:
+                partners_data.update(
+                    {prt_id: {"id": prt_id, "name": partners_names.get(prt_id, "")}}
                 )
-        move_lines = [
-            move_line
-            for move_line in move_lines
-            if move_line["date"] <= date_at_object
-            and not float_is_zero(move_line["amount_residual"], precision_digits=2)
-        ]
-        for move_line in move_lines:
-            journals_ids.add(move_line["journal_id"][0])
-            acc_id = move_line["account_id"][0]
-            if move_line["partner_id"]:
-                prt_id = move_line["partner_id"][0]
-                prt_name = move_line["partner_id"][1]
-            else:
-                prt_id = 0
-                prt_name = ""
-            if prt_id not in partners_ids:
-                partners_data.update({prt_id: {"id": prt_id, "name": prt_name}})
-                partners_ids.add(prt_id)
             if acc_id not in ag_pb_data.keys():
                 ag_pb_data = self._initialize_account(ag_pb_data, acc_id)
-            if prt_id not in ag_pb_data[acc_id]:
-                ag_pb_data = self._initialize_partner(ag_pb_data, acc_id, prt_id)
-            move_line_data = {}
-            if show_move_line_details:
-                if move_line["ref"] == move_line["name"]:
-                    if move_line["ref"]:
-                        ref_label = move_line["ref"]
+            ag_pb_data = self._initialize_partner(ag_pb_data, acc_id, prt_id)
+            ag_pb_data = self._add_amounts(
+                ag_pb_data,
+                acc_id,
+                prt_id,
+                dict(zip(self._amount_keys, amounts)),
+            )
+            ag_pb_data = self._calculate_extra_info(
+                ag_pb_data,
+                acc_id,
+                prt_id,
+                date_at_object,
+            )
+        if show_move_line_details:
+            line_model = self.env["account.move.line"]
+            self.env.cr.execute(
+                """
+                SELECT
+                    open_items.id,
+                    open_items.name,
+                    open_items.ref,
+                    open_items.date,
+                    open_items.date_maturity,
+                    open_items.move_id,
+                    open_items.journal_id,
+                    open_items.account_id,
+                    COALESCE(open_items.partner_id, 0),
+                    open_items.amount_residual
+                FROM ({}) open_items
+                ORDER BY open_items.date, open_items.id
+                """.format(
+                    query
+                ),
+                params,
+            )
+            move_lines = self.env.cr.fetchall()
+            moves_names = dict(
+                self.env["account.move"]
+                .browse({move_line[5] for move_line in move_lines})
+                .name_get()
+            )
+            for (
+                ml_id,
+                name,
+                ref,
+                ml_date,
+                date_maturity,
+                move_id,
+                journal_id,
+                acc_id,
+                prt_id,
+                residual,
+            ) in move_lines:
+                journals_ids.add(journal_id)
+                if ref == name:
+                    if ref:
+                        ref_label = ref
                     else:
                         ref_label = ""
-                elif not move_line["ref"]:
-                    ref_label = move_line["name"]
-                elif not move_line["name"]:
-                    ref_label = move_line["ref"]
+                elif not ref:
+                    ref_label = name
+                elif not name:
+                    ref_label = ref
                 else:
-                    ref_label = move_line["ref"] + str(" - ") + move_line["name"]
-                move_line_data.update(
+                    ref_label = ref + str(" - ") + name
+                ag_pb_data[acc_id][prt_id]["move_lines"].append(
                     {
-                        "line_rec": line_model.browse(move_line["id"]),
-                        "date": move_line["date"],
-                        "entry": move_line["move_id"][1],
-                        "jnl_id": move_line["journal_id"][0],
+                        "line_rec": line_model.browse(ml_id),
+                        "date": ml_date,
+                        "entry": moves_names[move_id],
+                        "jnl_id": journal_id,
                         "acc_id": acc_id,
-                        "partner": prt_name,
+                        "partner": partners_data[prt_id]["name"],
                         "ref_label": ref_label,
-                        "due_date": move_line["date_maturity"],
-                        "residual": move_line["amount_residual"],
+                        "due_date": date_maturity,
+                        "residual": residual,
                     }
                 )
-                ag_pb_data[acc_id][prt_id]["move_lines"].append(move_line_data)
-            ag_pb_data = self._calculate_amounts(
-                ag_pb_data,
-                acc_id,
-                prt_id,
-                move_line["amount_residual"],
-                move_line["date_maturity"],
-                date_at_object,
-            )
-            ag_pb_data = self._calculate_extra_info(
-                    ag_pb_data,
-                    acc_id,
-                    prt_id,
-                    date_at_object,
-                )
         journals_data = self._get_journals_data(list(journals_ids))
         accounts_data = self._get_accounts_data(ag_pb_data.keys())
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>ag_pb_data",ag_pb_data)
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>accounts_data",accounts_data)
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>partners_data",partners_data)
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>journals_data",journals_data)
         return ag_pb_data, accounts_data, partners_data, journals_data
 
     @api.model
@@ -413,7 +535,6 @@ class AgedPartnerBalanceReport(models.AbstractModel):
             date_at_object,
         )
         aged_partner_data = self._calculate_percent(aged_partner_data)
-        print("--------------------------aged_partner_data",aged_partner_data)
         return {
             "doc_ids": [wizard_id],
             "doc_model": "open.items.report.wizard",
@@ -4,10 +4,12 @@
 
 import calendar
 import datetime
+import itertools
 import operator
 
 from odoo import _, api, models, fields
-from odoo.tools import float_is_zero
+from odoo.models import PREFETCH_MAX
+from odoo.tools import float_is_zero, split_every
 
 
 class GeneralLedgerReport(models.AbstractModel):
@@ -21,6 +23,30 @@ class GeneralLedgerReport(models.AbstractModel):
          ('account_per_page', 'Account Per Page')]
     )
 
+    # Columns of the journal items fetched by _get_period_ml_data. Until the report is
+    # built, each journal item is kept as a tuple of these values in the "move_lines"
+    # block of its account (or partner).
+    _period_ml_columns = (
+        "id",
+        "date",
+        "move_id",
+        "journal_id",
+        "account_id",
+        "partner_id",
+        "ref",
+        "name",
+        "debit",
+        "credit",
+        "balance",
+        "amount_currency",
+        "full_reconcile_id",
+        "currency_id",
+        "analytic_account_id",
+        "tax_ids",
+        "analytic_tag_ids",
+    )
+    _period_ml_fetch_size = 10000
+
     def _get_tags_data(self, tags_ids):
         tags = self.env["account.analytic.tag"].browse(tags_ids)
         tags_data = {}
@@ -294,41 +320,54 @@ class GeneralLedgerReport(models.AbstractModel):
         return gen_ld_data, partners_data, partner_ids
 
     @api.model
-    def _get_move_line_data(self, move_line):
+    def _get_move_line_data(self, move_line, names_data):
+        """Build the values of a journal item from the tuple fetched by
+        _get_period_ml_data and the names resolved once for the whole report."""
+        (
+            ml_id,
+            date,
+            move_id,
+            journal_id,
+            account_id,
+            partner_id,
+            ref,
+            name,
+            debit,
+            credit,
+            balance,
+            amount_currency,
+            rec_id,
+            currency_id,
+            analytic_account_id,
+            tax_ids,
+            tag_ids,
+        ) = move_line
         move_line_data = {
-            "id": move_line["id"],
-            "date": move_line["date"],
-            "entry": move_line["move_id"][1],
-            "entry_id": move_line["move_id"][0],
-            "journal_id": move_line["journal_id"][0],
-            "account_id": move_line["account_id"][0],
-            "partner_id": move_line["partner_id"][0]
-            if move_line["partner_id"]
-            else False,
-            "partner_name": move_line["partner_id"][1]
-            if move_line["partner_id"]
-            else "",
-            "ref": "" if not move_line["ref"] else move_line["ref"],
-            "name": "" if not move_line["name"] else move_line["name"],
-            "tax_ids": move_line["tax_ids"],
-            "debit": move_line["debit"],
-            "credit": move_line["credit"],
-            "balance": move_line["balance"],
-            "bal_curr": move_line["amount_currency"],
-            "rec_id": move_line["full_reconcile_id"][0]
-            if move_line["full_reconcile_id"]
+            "id": ml_id,
+            "date": date,
+            "entry": names_data["moves"][move_id],
+            "entry_id": move_id,
+            "journal_id": journal_id,
+            "account_id": account_id,
+            "partner_id": partner_id or False,
+            "partner_name": names_data["partners"][partner_id] if partner_id else "",
+            "ref": ref or "",
+            "name": name or "",
+            "tax_ids": tax_ids,
+            "debit": debit,
+            "credit": credit,
+            "balance": balance,
+            "bal_curr": amount_currency,
+            "rec_id": rec_id or False,
+            "rec_name": names_data["full_reconciles"][rec_id] if rec_id else "",
+            "tag_ids": tag_ids,
+            "currency_id": (currency_id, names_data["currencies"][currency_id])
+            if currency_id
             else False,
-            "rec_name": move_line["full_reconcile_id"][1]
-            if move_line["full_reconcile_id"]
+            "analytic_account": names_data["analytic_accounts"][analytic_account_id]
+            if analytic_account_id
             else "",
-            "tag_ids": move_line["analytic_tag_ids"],
-            "currency_id": move_line["currency_id"],
-            "analytic_account": move_line["analytic_account_id"][1]
-            if move_line["analytic_account_id"]
-            else "",
-            "analytic_account_id": move_line["analytic_account_id"][0]
-            if move_line["analytic_account_id"]
-            else False,
+            "analytic_account_id": analytic_account_id or False,
         }
         if (
                 move_line_data["ref"] == move_line_data["name"]
@@ -426,6 +465,84 @@ class GeneralLedgerReport(models.AbstractModel):
         rec_after_date_to_ids = [i[0] for i in rec_after_date_to_ids]
         return rec_after_date_to_ids
 
+    def _get_period_ml_query(self, domain):
+        """Build the query fetching the journal items of the period as tuples of
+        _period_ml_columns, grouped by account and ordered like the report
+        displays them."""
+        aml_model = self.env["account.move.line"]
+        aml_model.check_access_rights("read")
+        query = aml_model._where_calc(domain)
+        aml_model._apply_ir_rules(query, "read")
+        from_clause, where_clause, where_params = query.get_sql()
+        query_str = """
+            SELECT
+                account_move_line.id,
+                account_move_line.date,
+                account_move_line.move_id,
+                account_move_line.journal_id,
+                account_move_line.account_id,
+                account_move_line.partner_id,
+                account_move_line.ref,
+                account_move_line.name,
+                account_move_line.debit,
+                account_move_line.credit,
+                account_move_line.balance,
+                account_move_line.amount_currency,
+                account_move_line.full_reconcile_id,
+                account_move_line.currency_id,
+                account_move_line.analytic_account_id,
+                ARRAY(
+                    SELECT rel.account_tax_id
+                    FROM account_move_line_account_tax_rel rel
+                    WHERE rel.account_move_line_id = account_move_line.id
+                ),
+                ARRAY(
+                    SELECT rel.account_analytic_tag_id
+                    FROM account_analytic_tag_account_move_line_rel rel
+                    WHERE rel.account_move_line_id = account_move_line.id
+                )
+            FROM {}
+            WHERE {}
+            ORDER BY
+                account_move_line.account_id,
+                account_move_line.date,
+                account_move_line.move_name DESC,
+                account_move_line.id
+        """.format(
+            from_clause, where_clause
+        )
+        return query_str, where_params
+
+    def _iter_period_ml_rows(self, query, params):
+        """Yield the rows of the query through a server-side cursor: only
+        _period_ml_fetch_size rows are transferred from the database at once."""
+        self.env["account.move.line"].flush()
+        self.env.cr.execute(
+            "DECLARE general_ledger_period_ml NO SCROLL CURSOR FOR " + query, params
+        )
+        try:
+            while True:
+                self.env.cr.execute(
+                    "FETCH %s FROM general_ledger_period_ml",
+                    [self._period_ml_fetch_size],
+                )
+                rows = self.env.cr.fetchall()
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            self.env.cr.execute("CLOSE general_ledger_period_ml")
+
+    def _get_names_data(self, model, ids):
+        """Resolve the display names of many records at once, without keeping
+        them in the cache."""
+        names = {}
+        for sub_ids in split_every(PREFETCH_MAX, list(ids)):
+            records = self.env[model].browse(sub_ids)
+            names.update(records.name_get())
+            records.invalidate_cache(ids=list(sub_ids))
+        return names
+
     def _get_period_ml_data(
             self,
             account_ids,
@@ -454,91 +571,110 @@ class GeneralLedgerReport(models.AbstractModel):
         )
         if extra_domain:
             domain += extra_domain
-        ml_fields = [
-            "id",
-            "name",
-            "date",
-            "move_id",
-            "journal_id",
-            "account_id",
-            "partner_id",
-            "debit",
-            "credit",
-            "balance",
-            "currency_id",
-            "full_reconcile_id",
-            "tax_ids",
-            "analytic_tag_ids",
-            "amount_currency",
-            "ref",
-            "name",
-            "analytic_account_id",
-        ]
-        move_lines = self.env["account.move.line"].search_read(
-            domain=domain, fields=ml_fields
-        )
+        query, params = self._get_period_ml_query(domain)
         journal_ids = set()
-        full_reconcile_ids = set()
         taxes_ids = set()
         tags_ids = set()
-        full_reconcile_data = {}
-        acc_prt_account_ids = self._get_acc_prt_accounts_ids(company_id)
-        for move_line in move_lines:
-            journal_ids.add(move_line["journal_id"][0])
-            for tax_id in move_line["tax_ids"]:
-                taxes_ids.add(tax_id)
-            for analytic_tag_id in move_line["analytic_tag_ids"]:
-                tags_ids.add(analytic_tag_id)
-            if move_line["full_reconcile_id"]:
-                rec_id = move_line["full_reconcile_id"][0]
-                if rec_id not in full_reconcile_ids:
-                    full_reconcile_data.update(
-                        {
-                            rec_id: {
-                                "id": rec_id,
-                                "name": move_line["full_reconcile_id"][1],
-                            }
-                        }
-                    )
-                    full_reconcile_ids.add(rec_id)
-            acc_id = move_line["account_id"][0]
-            ml_id = move_line["id"]
-            if move_line["partner_id"]:
-                prt_id = move_line["partner_id"][0]
-                partner_name = move_line["partner_id"][1]
-            if acc_id not in gen_ld_data.keys():
+        # Names resolved so far, by model.
+        names_data = {
+            "moves": {},
+            "partners": {},
+            "full_reconciles": {},
+            "currencies": {},
+            "analytic_accounts": {},
+        }
+        acc_prt_account_ids = set(self._get_acc_prt_accounts_ids(company_id))
+        # The journal items come grouped by account: the values of the report are
+        # built as soon as all the journal items of an account are fetched, so
+        # that only the rows of one account are kept as tuples at once.
+        rows = self._iter_period_ml_rows(query, params)
+        for acc_id, move_lines in itertools.groupby(rows, key=operator.itemgetter(4)):
+            move_ids = set()
+            partner_ids_seen = set()
+            full_reconcile_ids = set()
+            currency_ids = set()
+            analytic_account_ids = set()
+            if acc_id not in gen_ld_data:
                 gen_ld_data = self._initialize_account(
                     gen_ld_data, acc_id, foreign_currency
                 )
-            if acc_id in acc_prt_account_ids:
-                if not move_line["partner_id"]:
-                    prt_id = 0
-                    partner_name = "Missing Partner"
-                partners_ids.append(prt_id)
-                partners_data.update({prt_id: {"id": prt_id, "name": partner_name}})
-                if prt_id not in gen_ld_data[acc_id]:
-                    gen_ld_data = self._initialize_partner(
-                        gen_ld_data, acc_id, prt_id, foreign_currency
-                    )
-                gen_ld_data[acc_id][prt_id][ml_id] = self._get_move_line_data(move_line)
-                gen_ld_data[acc_id][prt_id]["fin_bal"]["credit"] += move_line["credit"]
-                gen_ld_data[acc_id][prt_id]["fin_bal"]["debit"] += move_line["debit"]
-                gen_ld_data[acc_id][prt_id]["fin_bal"]["balance"] += move_line[
-                    "balance"
-                ]
+            acc_data = gen_ld_data[acc_id]
+            blocks = []
+            for move_line in move_lines:
+                ml_id, date, move_id, journal_id, acc_id, prt_id = move_line[:6]
+                debit, credit, balance, amount_currency, rec_id = move_line[8:13]
+                currency_id, analytic_account_id, tax_ids, tag_ids = move_line[13:]
+                journal_ids.add(journal_id)
+                move_ids.add(move_id)
+                taxes_ids.update(tax_ids)
+                tags_ids.update(tag_ids)
+                if prt_id:
+                    partner_ids_seen.add(prt_id)
+                if rec_id:
+                    full_reconcile_ids.add(rec_id)
+                if currency_id:
+                    currency_ids.add(currency_id)
+                if analytic_account_id:
+                    analytic_account_ids.add(analytic_account_id)
+                if acc_id in acc_prt_account_ids:
+                    prt_id = prt_id or 0
+                    if prt_id not in acc_data:
+                        gen_ld_data = self._initialize_partner(
+                            gen_ld_data, acc_id, prt_id, foreign_currency
+                        )
+                    block = acc_data[prt_id]
+                    block["fin_bal"]["credit"] += credit
+                    block["fin_bal"]["debit"] += debit
+                    block["fin_bal"]["balance"] += balance
+                    if foreign_currency:
+                        block["fin_bal"]["bal_curr"] += amount_currency
+                else:
+                    block = acc_data
+                if "move_lines" not in block:
+                    block["move_lines"] = []
+                    blocks.append(block)
+                block["move_lines"].append(move_line)
+                acc_data["fin_bal"]["credit"] += credit
+                acc_data["fin_bal"]["debit"] += debit
+                acc_data["fin_bal"]["balance"] += balance
                 if foreign_currency:
-                    gen_ld_data[acc_id][prt_id]["fin_bal"]["bal_curr"] += move_line[
-                        "amount_currency"
-                    ]
-            else:
-                gen_ld_data[acc_id][ml_id] = self._get_move_line_data(move_line)
-            gen_ld_data[acc_id]["fin_bal"]["credit"] += move_line["credit"]
-            gen_ld_data[acc_id]["fin_bal"]["debit"] += move_line["debit"]
-            gen_ld_data[acc_id]["fin_bal"]["balance"] += move_line["balance"]
-            if foreign_currency:
-                gen_ld_data[acc_id]["fin_bal"]["bal_curr"] += move_line[
-                    "amount_currency"
+                    acc_data["fin_bal"]["bal_curr"] += amount_currency
+
+            # Resolve the names not known yet, then replace the tuples of the
+            # account by the values expected by the report.
+            for key, model, ids in (
+                ("moves", "account.move", move_ids),
+                ("partners", "res.partner", partner_ids_seen),
+                ("full_reconciles", "account.full.reconcile", full_reconcile_ids),
+                ("currencies", "res.currency", currency_ids),
+                ("analytic_accounts", "account.analytic.account", analytic_account_ids),
+            ):
+                names_data[key].update(
+                    self._get_names_data(model, ids.difference(names_data[key]))
+                )
+            for block in blocks:
+                block["move_lines"] = [
+                    self._get_move_line_data(move_line, names_data)
+                    for move_line in block["move_lines"]
                 ]
+
+        full_reconcile_data = {
+            rec_id: {"id": rec_id, "name": name}
+            for rec_id, name in names_data["full_reconciles"].items()
+        }
+        for acc_id in acc_prt_account_ids.intersection(gen_ld_data):
+            for prt_id, block in gen_ld_data[acc_id].items():
+                if not isinstance(prt_id, int) or "move_lines" not in block:
+                    continue
+                if prt_id not in partners_data:
+                    partners_ids.append(prt_id)
+                partners_data[prt_id] = {
+                    "id": prt_id,
+                    "name": names_data["partners"][prt_id]
+                    if prt_id
+                    else "Missing Partner",
+                }
+
         journals_data = self._get_journals_data(list(journal_ids))
         accounts_data = self._get_accounts_data(gen_ld_data.keys())
         taxes_data = self._get_taxes_data(list(taxes_ids))
@@ -569,13 +705,11 @@ class GeneralLedgerReport(models.AbstractModel):
         return move_lines
 
     def _create_account(self, account, acc_id, gen_led_data, rec_after_date_to_ids):
-        move_lines = []
-        for ml_id in gen_led_data[acc_id].keys():
-            if not isinstance(ml_id, int):
-                account.update({ml_id: gen_led_data[acc_id][ml_id]})
-            else:
-                move_lines += [gen_led_data[acc_id][ml_id]]
-        move_lines = sorted(move_lines, key=lambda k: (k["date"]))
+        for key in gen_led_data[acc_id].keys():
+            if not isinstance(key, int):
+                account.update({key: gen_led_data[acc_id][key]})
+        # The block is already sorted by date, see _get_period_ml_query.
+        move_lines = gen_led_data[acc_id].get("move_lines", [])
         move_lines = self._recalculate_cumul_balance(
             move_lines,
             gen_led_data[acc_id]["init_bal"]["balance"],
@@ -592,9 +726,7 @@ class GeneralLedgerReport(models.AbstractModel):
             if not isinstance(prt_id, int):
                 account.update({prt_id: gen_led_data[acc_id][prt_id]})
             else:
-                for ml_id in gen_led_data[acc_id][prt_id].keys():
-                    if isinstance(ml_id, int):
-                        move_lines += [gen_led_data[acc_id][prt_id][ml_id]]
+                move_lines += gen_led_data[acc_id][prt_id].get("move_lines", [])
         move_lines = sorted(move_lines, key=lambda k: (k["date"]))
         move_lines = self._recalculate_cumul_balance(
             move_lines,
@@ -643,20 +775,12 @@ class GeneralLedgerReport(models.AbstractModel):
                     list_partner = []
                     for prt_id in gen_led_data[acc_id].keys():
                         partner = {}
-                        move_lines = []
                         if not isinstance(prt_id, int):
                             account.update({prt_id: gen_led_data[acc_id][prt_id]})
                         else:
-                            for ml_id in gen_led_data[acc_id][prt_id].keys():
-                                if not isinstance(ml_id, int):
-                                    partner.update(
-                                        {ml_id: gen_led_data[acc_id][prt_id][ml_id]}
-                                    )
-                                else:
-                                    move_lines += [gen_led_data[acc_id][prt_id][ml_id]]
-                            move_lines = sorted(move_lines, key=lambda k: (k["date"]))
+                            partner.update(gen_led_data[acc_id][prt_id])
                             move_lines = self._recalculate_cumul_balance(
-                                move_lines,
+                                partner.get("move_lines", []),
                                 gen_led_data[acc_id][prt_id]["init_bal"]["balance"],
                                 rec_after_date_to_ids,
                             )
@@ -842,7 +966,6 @@ class GeneralLedgerReport(models.AbstractModel):
                         account["partners"] = False
                         del account["list_partner"]
         general_ledger = sorted(general_ledger, key=lambda k: k["code"])
-        print("--------------------------------------------------general_ledger", general_ledger)
         return {
             "doc_ids": [wizard_id],
             "doc_model": "general.ledger.report.wizard",
@@ -1,9 +1,12 @@
 #  Copyright 2021 Simone Rubino - Agile Business Group
 #  License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
-from odoo.tests import TransactionCase
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT, test_reports
 
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
 
 class TestAgedPartnerBalance(TransactionCase):
     def setUp(self):
@@ -32,3 +35,84 @@ class TestAgedPartnerBalance(TransactionCase):
             data=data,
         )
         self.assertTrue(result)
+
+
+@tagged("post_install", "-at_install")
+class TestAgedPartnerBalanceResidual(AccountTestInvoicingCommon):
+    def _create_move(self, move_date, receivable_amount):
+        move = self.env["account.move"].create(
+            {
+                "date": move_date,
+                "journal_id": self.company_data["default_journal_misc"].id,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "debit": max(receivable_amount, 0.0),
+                            "credit": max(-receivable_amount, 0.0),
+                            "account_id": self.receivable_account.id,
+                            "partner_id": self.partner_a.id,
+                            "date_maturity": move_date,
+                        },
+                    ),
+                    (
+                        0,
+                        0,
+                        {
+                            "debit": max(-receivable_amount, 0.0),
+                            "credit": max(receivable_amount, 0.0),
+                            "account_id": self.company_data[
+                                "default_account_revenue"
+                            ].id,
+                        },
+                    ),
+                ],
+            }
+        )
+        move.action_post()
+        return move.line_ids.filtered(
+            lambda line: line.account_id == self.receivable_account
+        )
+
+    def _get_residual(self, date_at):
+        report = self.env["report.account_financial_report.aged_partner_balance"]
+        ag_pb_data = report._get_move_lines_data(
+            self.env.company.id,
+            self.receivable_account.ids,
+            [],
+            fields.Date.from_string(date_at),
+            False,
+            True,
+            False,
+        )[0]
+        return ag_pb_data.get(self.receivable_account.id, {}).get("residual", 0.0)
+
+    def test_residual_history(self):
+        self.receivable_account = self.company_data["default_account_receivable"]
+        invoice_line = self._create_move("2017-01-01", 1000.0)
+        payment_line = self._create_move("2017-03-01", -400.0)
+        (invoice_line | payment_line).reconcile()
+
+        self.assertEqual(self._get_residual("2016-12-31"), 0.0)
+        self.assertEqual(self._get_residual("2017-02-28"), 1000.0)
+        self.assertEqual(self._get_residual("2017-03-01"), 600.0)
+
+        payment_line.remove_move_reconcile()
+        self.assertEqual(self._get_residual("2017-03-01"), 600.0)
+        self.assertEqual(
+            self.env["account.move.line.residual"].search_count(
+                [("move_line_id", "=", payment_line.id), ("date_to", "=", False)]
+            ),
+            1,
+        )
+
+        # Partials removed directly, e.g. from the payment widget.
+        (invoice_line | payment_line).reconcile()
+        invoice_line.matched_credit_ids.unlink()
+        self.assertRecordValues(
+            self.env["account.move.line.residual"].search(
+                [("move_line_id", "=", invoice_line.id), ("date_to", "=", False)]
+            ),
+            [{"date_from": fields.Date.from_string("2017-01-01"), "residual": 1000.0}],
+        )
@@ -5,6 +5,7 @@
 
 import time
 from datetime import date
+from unittest.mock import patch
 
 from odoo import api, fields
 from odoo.tests import tagged
@@ -677,6 +678,43 @@ class TestGeneralLedgerReport(AccountTestInvoicingCommon):
         self.assertEqual(unaffected_fin_balance["credit"], 1000)
         self.assertEqual(unaffected_fin_balance["balance"], 500)
 
+    def test_05_move_lines(self):
+        self._add_move(
+            date=self.fy_date_start,
+            receivable_debit=1000,
+            receivable_credit=0,
+            income_debit=0,
+            income_credit=1000,
+        )
+        self._add_move(
+            date=self.fy_date_end,
+            receivable_debit=0,
+            receivable_credit=250,
+            income_debit=250,
+            income_credit=0,
+        )
+        # Fetch the journal items one by one to go through several batches.
+        with patch.object(
+            type(self.env["report.account_financial_report.general_ledger"]),
+            "_period_ml_fetch_size",
+            1,
+        ):
+            res_data = self._get_report_lines(with_partners=True)
+        income_account = [
+            account
+            for account in res_data["general_ledger"]
+            if account["id"] == self.income_account.id
+        ][0]
+        move_lines = income_account["move_lines"]
+        self.assertEqual(len(move_lines), 2)
+        self.assertEqual(
+            [(ml["date"], ml["credit"], ml["balance"]) for ml in move_lines],
+            [(self.fy_date_start, 1000, -1000), (self.fy_date_end, 0, -750)],
+        )
+        move = self.env["account.move.line"].browse(move_lines[0]["id"]).move_id
+        self.assertEqual(move_lines[0]["entry"], move.display_name)
+        self.assertEqual(move_lines[0]["partner_name"], self.partner.display_name)
+
     def test_partner_filter(self):
         partner_1 = self.env.ref("base.res_partner_1")
         partner_2 = self.env.ref("base.res_partner_2")
@@ -4,14 +4,22 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
 
+from concurrent.futures import ThreadPoolExecutor
 from psycopg2 import OperationalError
+from psycopg2.extensions import TransactionRollbackError
 import base64
 import logging
+import threading
+import time
 
 _logger = logging.getLogger(__name__)
 
 DEFAULT_BLOCKING_LEVEL = 'error'
 
+# Delay (in seconds) a worker of the web services pool waits after a failed job, doubled at each consecutive failure.
+POOL_BACKOFF_MIN = 1.0
+POOL_BACKOFF_MAX = 60.0
+
 
 class AccountEdiDocument(models.Model):
     _name = 'account.edi.document'
@@ -252,14 +260,141 @@ class AccountEdiDocument(models.Model):
 
         return len(all_jobs) - len(jobs_to_process)
 
+    def _claim_web_services_job(self):
+        ''' Lock the rows needed to process the job of the documents in self, skipping the rows already locked by
+        another transaction.
+
+        :return: True if all the rows have been locked, False if another transaction is processing some of them.
+        '''
+        attachments_potential_unlink = self.attachment_id.filtered(lambda a: not a.res_model and not a.res_id)
+        for table, ids in (
+            ('account_edi_document', self.ids),
+            ('account_move', self.move_id.ids),
+            ('ir_attachment', attachments_potential_unlink.ids),
+        ):
+            if not ids:
+                continue
+            self._cr.execute('SELECT id FROM %s WHERE id IN %%s FOR UPDATE SKIP LOCKED' % table, [tuple(ids)])
+            if self._cr.rowcount != len(ids):
+                return False
+        return True
+
+    @api.model
+    def _process_web_services_batch(self, jobs, counters, lock):
+        ''' Process a batch of jobs of the web services pool in the current transaction.
+
+        :param jobs:        A list of tuples (document ids, doc_type) as returned by '_prepare_jobs'.
+        :param counters:    The counters of the pool, see '_process_documents_web_services_pool'.
+        :param lock:        The lock protecting the counters.
+        '''
+        backoff = 0.0
+        for document_ids, doc_type in jobs:
+            if backoff:
+                time.sleep(backoff)
+
+            documents = self.browse(document_ids)
+            try:
+                with self.env.cr.savepoint(flush=False):
+                    claimed = documents._claim_web_services_job()
+            except TransactionRollbackError:
+                # The rows have been updated by a transaction committed after this one started.
+                claimed = False
+            # The job may have been processed by another worker in the meantime.
+            documents = documents.filtered(lambda d: d.state in ('to_send', 'to_cancel'))
+            if not claimed or not documents:
+                with lock:
+                    counters['skipped'] += 1
+                continue
+
+            try:
+                with self.env.cr.savepoint():
+                    self._process_job(documents, doc_type)
+                failed = any(doc.blocking_level == 'error' for doc in documents)
+            except Exception:
+                _logger.exception('EDI web services pool: job on documents %s failed.', documents.ids)
+                failed = True
+
+            with lock:
+                counters['processed'] += 1
+                counters['documents'] += len(documents)
+                if failed:
+                    counters['failed'] += 1
+            backoff = min(max(backoff * 2, POOL_BACKOFF_MIN), POOL_BACKOFF_MAX) if failed else 0.0
+
+    @api.model
+    def _process_web_services_batch_in_worker(self, jobs, counters, lock):
+        ''' Entry point of a thread of the web services pool: process a batch of jobs with a dedicated cursor, committed
+        at the end of the batch.
+        '''
+        with api.Environment.manage(), self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            env['account.edi.document']._process_web_services_batch(jobs, counters, lock)
+
+    def _process_documents_web_services_pool(self, job_count=None, workers=2, batch_size=10):
+        ''' Same as '_process_documents_web_services' but the jobs are dispatched by batches across a pool of worker
+        threads. Each batch is processed with its own cursor and committed at its end. The rows of each job are claimed
+        using SKIP LOCKED so the workers never wait for each other, and a worker backs off after a failed job.
+
+        :param job_count:   The maximum number of jobs to process if specified.
+        :param workers:     The number of worker threads.
+        :param batch_size:  The number of jobs processed between two commits.
+        :return:            A tuple (remaining, counters) where remaining is the number of remaining jobs to process and
+                            counters is a dictionary giving the number of 'processed', 'skipped' and 'failed' jobs, the
+                            number of processed 'documents', the 'duration' in seconds and the 'throughput' in
+                            documents per second.
+        '''
+        all_jobs = self.filtered(lambda d: d.edi_format_id._needs_web_services())._prepare_jobs()
+        jobs_to_process = all_jobs[0:job_count] if job_count else all_jobs
+
+        # Only the ids are given to the workers, they browse them in their own environment.
+        jobs = [(documents.ids, doc_type) for documents, doc_type in jobs_to_process]
+        batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+        counters = {'processed': 0, 'skipped': 0, 'failed': 0, 'documents': 0}
+        lock = threading.Lock()
+        start = time.time()
+
+        if self.pool.in_test_mode() or workers <= 1:
+            # No other cursor can be opened: process everything in the current transaction.
+            for batch in batches:
+                self._process_web_services_batch(batch, counters, lock)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._process_web_services_batch_in_worker, batch, counters, lock)
+                    for batch in batches
+                ]
+                for future in futures:
+                    exception = future.exception()
+                    if exception:
+                        _logger.error('EDI web services pool: a batch failed: %s', exception)
+
+        counters['duration'] = time.time() - start
+        counters['throughput'] = counters['documents'] / counters['duration'] if counters['duration'] else 0.0
+        _logger.info(
+            'EDI web services pool: %(processed)s jobs processed (%(documents)s documents), %(skipped)s skipped, '
+            '%(failed)s failed in %(duration).1fs (%(throughput).2f documents/s).',
+            counters,
+        )
+        return len(all_jobs) - len(jobs_to_process), counters
+
     @api.model
     def _cron_process_documents_web_services(self, job_count=None):
         ''' Method called by the EDI cron processing all web-services.
 
+        The jobs are processed by a pool of worker threads when the 'exp_account_edi.web_services_workers' system
+        parameter is greater than 1, see '_process_documents_web_services_pool'.
+
         :param job_count: Limit explicitely the number of web service calls. If not provided, process all.
         '''
         edi_documents = self.search([('state', 'in', ('to_send', 'to_cancel')), ('move_id.state', '=', 'posted')])
-        nb_remaining_jobs = edi_documents._process_documents_web_services(job_count=job_count)
+        ICP = self.env['ir.config_parameter'].sudo()
+        workers = int(ICP.get_param('exp_account_edi.web_services_workers', 1))
+        if workers > 1:
+            batch_size = int(ICP.get_param('exp_account_edi.web_services_batch_size', 10))
+            nb_remaining_jobs, dummy = edi_documents._process_documents_web_services_pool(
+                job_count=job_count, workers=workers, batch_size=batch_size)
+        else:
+            nb_remaining_jobs = edi_documents._process_documents_web_services(job_count=job_count)
 
         # Mark the CRON to be triggered again asap since there is some remaining jobs to process.
         if nb_remaining_jobs > 0:
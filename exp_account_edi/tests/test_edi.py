@@ -230,6 +230,31 @@ class TestAccountEdi(AccountEdiTestCommon, CronMixinCase):
             self.assertEqual(len(capt.records), 2, "Not all records have been processed in this run, the cron should "
                                                    "re-trigger itself to process some more later")
 
+    def test_process_documents_web_services_pool(self):
+        invoices = self.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'invoice_date': '2019-01-01',
+            'date': '2019-01-01',
+            'partner_id': self.partner_a.id,
+            'invoice_line_ids': [Command.create({'product_id': self.product_a.id})],
+        } for i in range(3)])
+
+        with self.mock_edi(_needs_web_services_method=_generate_mocked_needs_web_services(True)):
+            invoices.action_post()
+            docs = invoices.edi_document_ids
+            self.assertEqual(set(docs.mapped('state')), {'to_send'})
+
+            remaining, counters = docs._process_documents_web_services_pool(job_count=2, workers=2, batch_size=1)
+            self.assertEqual(remaining, 1)
+            self.assertEqual((counters['processed'], counters['skipped'], counters['failed']), (2, 0, 0))
+            self.assertEqual(counters['documents'], 2)
+            self.assertEqual(docs.mapped('state').count('sent'), 2)
+
+            remaining, counters = docs._process_documents_web_services_pool(workers=2)
+            self.assertEqual(remaining, 0)
+            self.assertEqual(counters['processed'], 1)
+            self.assertEqual(set(docs.mapped('state')), {'sent'})
+
     def test_invoice_ready_to_be_sent(self):
         def _is_needed_for_invoice(edi_format, invoice):
             return True
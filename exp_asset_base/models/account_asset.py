@@ -84,7 +84,7 @@ class AccountAssetAsset(models.Model):
     )
     next_maintenance_date = fields.Date(
         states={'draft': [('readonly', False)], 'unlock': [('readonly', False)]},
-        readonly=True,
+        readonly=True, index=True,
     )
     warranty_period = fields.Integer(
         states={'draft': [('readonly', False)], 'unlock': [('readonly', False)]},
@@ -92,7 +92,7 @@ class AccountAssetAsset(models.Model):
     )
     warranty_end_date = fields.Date(
         compute='_compute_warranty_end_date',
-        readonly=True, store=True,
+        readonly=True, store=True, index=True,
     )
     warranty_contract = fields.Binary(
         states={'draft': [('readonly', False)], 'unlock': [('readonly', False)]},
@@ -268,27 +268,48 @@ class AccountAssetAsset(models.Model):
         return action
 
     @api.model
-    def _asset_cron(self):
-        today = fields.Date.today()
-        for asset in self.search([('next_maintenance_date', '=', today)]):
-            self.env['mail.activity'].sudo().create({
-                'res_model_id': self.env.ref('account_asset.model_account_asset_asset').id,
-                'res_id': asset.id,
-                'user_id': asset.responsible_user_id.id,
-                'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
-                'summary': _('The %s with barcode %s has schedule maintenance today ,please follow.') % (
+    def _prepare_asset_cron_activities(self, date_from, date_to, defaults):
+        """ Prepare the values of the reminder activities of the assets having a date in the ]date_from, date_to] window.
+        :param defaults: The values shared by all the activities.
+        :return: A list of values to create mail.activity records.
+        """
+        vals_list = []
+        for asset in self.search([('next_maintenance_date', '>', date_from), ('next_maintenance_date', '<=', date_to)]):
+            vals_list.append(dict(
+                defaults,
+                res_id=asset.id,
+                user_id=asset.responsible_user_id.id,
+                summary=_('The %s with barcode %s has schedule maintenance today ,please follow.') % (
                     asset.name, asset.barcode),
-                'date_deadline': asset.next_maintenance_date,
-            })
-        for asset in self.search([('warranty_end_date', '=', today)]):
-            self.env['mail.activity'].sudo().create({
-                'res_model_id': self.env.ref('account_asset.model_account_asset_asset').id,
-                'res_id': asset.id,
-                'user_id': asset.responsible_user_id.id,
-                'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
-                'summary': _('The warrant period of %s with barcode %s has end!') % (asset.name, asset.barcode),
-                'date_deadline': asset.warranty_end_date,
-            })
+                date_deadline=asset.next_maintenance_date,
+            ))
+        for asset in self.search([('warranty_end_date', '>', date_from), ('warranty_end_date', '<=', date_to)]):
+            vals_list.append(dict(
+                defaults,
+                res_id=asset.id,
+                user_id=asset.responsible_user_id.id,
+                summary=_('The warrant period of %s with barcode %s has end!') % (asset.name, asset.barcode),
+                date_deadline=asset.warranty_end_date,
+            ))
+        return vals_list
+
+    @api.model
+    def _asset_cron(self):
+        """ Create the reminder activities of the assets for all the days since the last run, so that no reminder is
+        missed when the cron did not run on a given day.
+        """
+        config_parameter = self.env['ir.config_parameter'].sudo()
+        date_to = fields.Date.today()
+        last_date = config_parameter.get_param('exp_asset_base.asset_cron_last_date')
+        date_from = last_date and fields.Date.from_string(last_date) or date_to - relativedelta(days=1)
+        if date_from >= date_to:
+            return
+        defaults = {
+            'res_model_id': self.env['ir.model']._get_id('account.asset'),
+            'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
+        }
+        self.env['mail.activity'].sudo().create(self._prepare_asset_cron_activities(date_from, date_to, defaults))
+        config_parameter.set_param('exp_asset_base.asset_cron_last_date', fields.Date.to_string(date_to))
 
     @api.onchange('model_id', 'original_value')
     def _onchange_model_id(self):
@@ -14,7 +14,7 @@ class AccountAssetAsset(models.Model):
         selection=[('temporary', 'Temporary'), ('permanent', 'Permanent')],
     )
     purpose = fields.Html()
-    return_date = fields.Date()
+    return_date = fields.Date(index=True)
     department_id = fields.Many2one(
         comodel_name='hr.department',
         string='Current Department'
@@ -53,15 +53,14 @@ class AccountAssetAsset(models.Model):
         }
 
     @api.model
-    def _asset_cron(self):
-        super(AccountAssetAsset, self)._asset_cron()
-        today = fields.Date.today()
-        for asset in self.search([('return_date', '=', today)]):
-            self.env['mail.activity'].sudo().create({
-                'res_model_id': self.env.ref('account_asset.model_account_asset_asset').id,
-                'res_id': asset.id,
-                'user_id': asset.responsible_user_id.id,
-                'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
-                'summary': _('The period of %s is finished %s.') % (asset.name, asset.return_date),
-                'date_deadline': asset.return_date,
-            })
+    def _prepare_asset_cron_activities(self, date_from, date_to, defaults):
+        vals_list = super(AccountAssetAsset, self)._prepare_asset_cron_activities(date_from, date_to, defaults)
+        for asset in self.search([('return_date', '>', date_from), ('return_date', '<=', date_to)]):
+            vals_list.append(dict(
+                defaults,
+                res_id=asset.id,
+                user_id=asset.responsible_user_id.id,
+                summary=_('The period of %s is finished %s.') % (asset.name, asset.return_date),
+                date_deadline=asset.return_date,
+            ))
+        return vals_list
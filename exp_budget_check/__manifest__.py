@@ -27,7 +27,9 @@
     # always loaded
     'data': [
         'security/security.xml',
+        'security/ir.model.access.csv',
         'data/server_action.xml',
+        'data/budget_commitment_data.xml',
         'views/account_invoice_view.xml',
         'views/hr_expense_view.xml',
     ],
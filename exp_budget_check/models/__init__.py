@@ -3,4 +3,5 @@
 from . import account_invoice
 from . import analytic_account
 from . import account_budget
+from . import budget_commitment
 from . import hr_expense
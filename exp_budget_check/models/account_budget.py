@@ -11,54 +11,15 @@ class CrossoveredBudgetLines(models.Model):
 
     @api.depends('analytic_account_id')
     def _compute_confirm(self):
+        amounts = self.env['crossovered.budget.commitment']._get_budget_line_amounts(self)
         for rec in self:
-            order_lines = self.env['purchase.order.line'].search(
-                [('account_analytic_id', '=', rec.analytic_account_id.id),
-                 ('order_id.date_order', '>=', rec.crossovered_budget_id.date_from),
-                 ('order_id.date_order', '<=', rec.crossovered_budget_id.date_to),
-                 '|', ('product_id.property_account_expense_id', 'in', rec.general_budget_id.account_ids.ids),
-                 ('product_id.categ_id.property_account_expense_categ_id', 'in', rec.general_budget_id.account_ids.ids),
-                 ('order_id.state', 'in', ['purchase', 'done'])])
-            orders_without_tax = sum(order_lines.mapped('price_subtotal'))
-            need_tax = 0
-            invoice_amount = 0
-            for line in order_lines:
-                vals = line._prepare_compute_all_values()
-                taxes = line.taxes_id.filtered(lambda x: x.analytic).compute_all(
-                    vals['price_unit'],
-                    vals['currency_id'],
-                    vals['product_qty'],
-                    vals['product'],
-                    vals['partner'])
-                need_tax += sum(t.get('amount', 0.0) for t in taxes.get('taxes', []))
-                invoiced = self.env['account.move.line'].search(
-                    [('purchase_line_id', '=', line.id), ('move_id.state', 'not in', ['draft', 'cancel'])])
-                invoice_amount += sum(invoiced.mapped('price_subtotal')) if not need_tax else sum(
-                    invoiced.mapped('move_id.amount_total'))
-            rec.confirm = ((orders_without_tax + need_tax) - invoice_amount) * -1
+            rec.confirm = amounts.get(rec._origin.id, (0.0, 0.0))[1] * -1
 
     @api.depends('analytic_account_id')
     def _compute_reserve(self):
+        amounts = self.env['crossovered.budget.commitment']._get_budget_line_amounts(self)
         for rec in self:
-            order_lines = self.env['purchase.order.line'].search(
-                [('account_analytic_id', '=', rec.analytic_account_id.id),
-                 ('order_id.date_order', '>=', rec.crossovered_budget_id.date_from),
-                 ('order_id.date_order', '<=', rec.crossovered_budget_id.date_to),
-                 '|', ('product_id.property_account_expense_id', 'in', rec.general_budget_id.account_ids.ids),
-                 ('product_id.categ_id.property_account_expense_categ_id', 'in', rec.general_budget_id.account_ids.ids),
-                 ('order_id.state', 'in', ['draft', 'sent', 'to approve'])])
-            orders_without_tax = sum(order_lines.mapped('price_subtotal'))
-            need_tax = 0
-            for line in order_lines:
-                vals = line._prepare_compute_all_values()
-                taxes = line.taxes_id.filtered(lambda x: x.analytic).compute_all(
-                    vals['price_unit'],
-                    vals['currency_id'],
-                    vals['product_qty'],
-                    vals['product'],
-                    vals['partner'])
-                need_tax += sum(t.get('amount', 0.0) for t in taxes.get('taxes', []))
-            rec.reserve = (orders_without_tax + need_tax) * -1
+            rec.reserve = amounts.get(rec._origin.id, (0.0, 0.0))[0] * -1
 
     def _compute_operations_amount(self):
         if not self.ids: return
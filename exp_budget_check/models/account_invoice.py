@@ -23,17 +23,12 @@ class BudgetConfirmationCustom(models.Model):
             self.invoice_id.write({'is_approve': True})
             self.invoice_id.write({'state': 'budget_approve'})
             for rec in self:
+                budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(
+                    [(line.analytic_account_id.id, line.account_id.id) for line in rec.lines_ids], rec.date)
                 for line in rec.lines_ids:
-                    budget_post = self.env['account.budget.post'].search([]).filtered(
-                        lambda x: line.account_id in x.account_ids)
-                    analytic_account_id = line.analytic_account_id
-                    budget_lines = analytic_account_id.crossovered_budget_line.filtered(
-                        lambda x: x.general_budget_id in budget_post and
-                                  x.crossovered_budget_id.state == 'done' and
-                                  x.date_from <= self.date <= x.date_to)
+                    budget_lines = budget_lines_by_key[line.analytic_account_id.id, line.account_id.id]
                     if len(budget_lines) > 1:
                         budget_lines = budget_lines[0]
-                    print("budget_lines.reserve budget_lines.reserve budget_lines.reserve", budget_lines.reserve)
                     amount = budget_lines.reserve
                     amount += line.amount
                     budget_lines.write({'reserve': amount})
@@ -69,16 +64,22 @@ class AccountMove(models.Model):
         #         ('invoice_rec_id', '=', invoice.id)
         #     ])
         #     invoice.rec_payment_count = payments
+        invoice_ids = set(self._origin.ids)
+        payments = self.env['account.payment'].sudo().search([('invoice_rec_ids', 'in', list(invoice_ids))]) \
+            if invoice_ids else self.env['account.payment']
+        count_by_invoice = dict.fromkeys(invoice_ids, 0)
+        for payment in payments:
+            for invoice_id in invoice_ids.intersection(payment.invoice_rec_ids.ids):
+                count_by_invoice[invoice_id] += 1
         for invoice in self:
-            payments = self.env['account.payment'].sudo().search([]).filtered(lambda r: invoice.id in r.invoice_rec_ids.ids)
-            invoice.rec_payment_count = len(payments)
+            invoice.rec_payment_count = count_by_invoice.get(invoice._origin.id, 0)
 
     def action_open_related_payment_records(self):
         """ Opens a tree view with related records filtered by a dynamic domain """
         # payments = self.env['account.payment'].search([
         #     ('invoice_rec_id', '=', self.id)
         # ]).ids
-        payments = self.env['account.payment'].search([]).filtered(lambda r: self.id in r.invoice_rec_ids.ids).ids
+        payments = self.env['account.payment'].search([('invoice_rec_ids', 'in', self.ids)]).ids
 
         return {
             'name': _('Payments'),
@@ -87,6 +88,16 @@ class AccountMove(models.Model):
             'view_mode': 'tree,form',
             'domain': [('id', 'in', payments)],
         }
+
+    def write(self, vals):
+        res = super(AccountMove, self).write(vals)
+        if 'state' in vals:
+            # The amounts invoiced on the purchase order lines are deduced from the confirmed budget.
+            purchase_lines = self.filtered(lambda m: m.is_purchase_document(include_receipts=True)).line_ids.purchase_line_id
+            if purchase_lines:
+                self.env['crossovered.budget.commitment']._refresh(purchase_lines)
+        return res
+
     def copy(self):
         self.write({'budget_check': False})
         # self.write({'is_check':False})
@@ -120,15 +131,10 @@ class AccountMove(models.Model):
     def button_cancel(self):
         res = super(AccountMove, self).button_cancel()
         if self.is_check:
-            date = fields.Date.from_string(self.date)
+            budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(
+                [(line.analytic_account_id.id, line.account_id.id) for line in self.invoice_line_ids], self.date)
             for line in self.invoice_line_ids:
-                analytic_account_id = line.analytic_account_id
-                budget_post = self.env['account.budget.post'].search([]).filtered(
-                    lambda x: line.account_id in x.account_ids)
-                budget_lines = analytic_account_id.crossovered_budget_line.filtered(
-                    lambda x: x.general_budget_id in budget_post and
-                              x.crossovered_budget_id.state == 'done' and
-                              fields.Date.from_string(x.date_from) <= date <= fields.Date.from_string(x.date_to))
+                budget_lines = budget_lines_by_key[line.analytic_account_id.id, line.account_id.id]
                 amount = budget_lines.reserve
                 amount -= (line.price_subtotal + line.price_tax)
                 budget_lines.write({'reserve': amount})
@@ -140,14 +146,11 @@ class AccountMove(models.Model):
         if self.is_check:
             confirm_budget = self.env['budget.confirmation'].search([('invoice_id', '=', self.id)])
             confirm_budget.write({'ref': self.name})
+            budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(
+                [(line.analytic_account_id.id, line.account_id.id) for line in self.invoice_line_ids],
+                self.invoice_date)
             for line in self.invoice_line_ids:
-                analytic_account_id = line.analytic_account_id
-                budget_post = self.env['account.budget.post'].search([]).filtered(
-                    lambda x: line.account_id in x.account_ids)
-                budget_lines = analytic_account_id.crossovered_budget_line.filtered(
-                    lambda x: x.general_budget_id in budget_post and
-                              x.crossovered_budget_id.state == 'done' and
-                              x.date_from <= self.invoice_date <= x.date_to)
+                budget_lines = budget_lines_by_key[line.analytic_account_id.id, line.account_id.id]
                 amount = budget_lines.confirm
                 amount += (line.price_subtotal + line.price_tax)
                 budget_lines.write({'confirm': amount})
@@ -158,15 +161,10 @@ class AccountMove(models.Model):
         res = super(AccountMove, self).button_draft()
         for rec in self:
             if rec.is_check:
-                date = fields.Date.from_string(rec.date)
+                budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(
+                    [(line.analytic_account_id.id, line.account_id.id) for line in rec.invoice_line_ids], rec.date)
                 for line in rec.invoice_line_ids:
-                    analytic_account_id = line.analytic_account_id
-                    budget_post = self.env['account.budget.post'].search([]).filtered(
-                        lambda x: line.account_id in x.account_ids)
-                    budget_lines = analytic_account_id.crossovered_budget_line.filtered(
-                        lambda x: x.general_budget_id in budget_post and
-                                  x.crossovered_budget_id.state == 'done' and
-                                  fields.Date.from_string(x.date_from) <= date <= fields.Date.from_string(x.date_to))
+                    budget_lines = budget_lines_by_key[line.analytic_account_id.id, line.account_id.id]
                     amount = budget_lines.confirm
                     amount -= (line.price_subtotal + line.price_tax)
                     budget_lines.write({'confirm': amount})
@@ -189,20 +187,20 @@ class AccountMove(models.Model):
                     if confirm_budget.state =='cancel':
                         confirm_budget.state='draft'
                     return True
-            for line in self.invoice_line_ids.filtered(lambda r: r.analytic_account_id.is_analytic_budget == True):
+            budget_invoice_lines = self.invoice_line_ids.filtered(
+                lambda r: r.analytic_account_id.is_analytic_budget == True)
+            budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(
+                [(line.analytic_account_id.id, line.account_id.id) for line in budget_invoice_lines],
+                self.invoice_date)
+            for line in budget_invoice_lines:
                 if line.analytic_account_id:
                     if not line.analytic_account_id:
                         raise ValidationError(_('Please Choose Analytic account for This Bill'))
-                    budget_post = self.env['account.budget.post'].search([]).filtered(lambda x: line.account_id in x.account_ids)
+                    budget_post = self.env['account.budget.post']._get_budget_posts(line.account_id)
                     if len(budget_post.ids) > 1:
                         raise ValidationError(
                             _("The Expense account %s is assigned to more than one budget position %s")%(line.account_id.name,[x.name for x in budget_post]))
-                    budget_lines = self.env['crossovered.budget.lines'].search(
-                        [('analytic_account_id', '=', line.analytic_account_id.id),
-                         ('general_budget_id', 'in', budget_post.ids),
-                         ('crossovered_budget_id.state', '=', 'done'),
-                         ('crossovered_budget_id.date_from', '<=', self.invoice_date),
-                         ('crossovered_budget_id.date_to', '>=', self.invoice_date)])
+                    budget_lines = budget_lines_by_key[line.analytic_account_id.id, line.account_id.id]
                     if not budget_lines:
                         confirmation_lines=[]
                     else:
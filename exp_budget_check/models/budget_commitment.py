@@ -0,0 +1,194 @@
+from odoo import api, fields, models
+
+# States of the purchase orders whose lines are reserved or confirmed on the budget.
+RESERVE_ORDER_STATES = ('draft', 'sent', 'to approve')
+CONFIRM_ORDER_STATES = ('purchase', 'done')
+
+
+class CrossoveredBudgetCommitment(models.Model):
+    """ Ledger of the amounts committed on the budget by the purchase order lines.
+
+    Each purchase order line which is not cancelled has a single row holding its amount (analytic taxes included)
+    and the amount already invoiced. The rows are refreshed each time the purchase order line, the state of its order
+    or the state of one of its bills change, so that the reserved and confirmed amounts of the budget lines are
+    computed with a single grouped query.
+    """
+    _name = 'crossovered.budget.commitment'
+    _description = 'Budget Commitment'
+    _log_access = False
+
+    purchase_line_id = fields.Many2one('purchase.order.line', required=True, readonly=True, ondelete='cascade',
+                                       index=True)
+    company_id = fields.Many2one('res.company', readonly=True)
+    analytic_account_id = fields.Many2one('account.analytic.account', readonly=True)
+    account_id = fields.Many2one('account.account', readonly=True, help='Expense account of the product.')
+    categ_account_id = fields.Many2one('account.account', readonly=True,
+                                       help='Expense account of the product category.')
+    date_order = fields.Datetime(readonly=True)
+    state = fields.Selection([('reserve', 'Reserved'), ('confirm', 'Confirmed')], required=True, readonly=True)
+    amount = fields.Float(readonly=True)
+    invoiced_amount = fields.Float(readonly=True)
+
+    def init(self):
+        self._cr.execute('''
+            CREATE INDEX IF NOT EXISTS crossovered_budget_commitment_analytic_date_idx
+            ON crossovered_budget_commitment (analytic_account_id, date_order)
+        ''')
+
+    @api.model
+    def _refresh(self, purchase_lines):
+        """ Recompute the rows of some purchase order lines.
+        :param purchase_lines: A purchase.order.line recordset.
+        """
+        purchase_lines = purchase_lines.exists()
+        if not purchase_lines:
+            return
+        self = self.sudo()
+        self.search([('purchase_line_id', 'in', purchase_lines.ids)]).unlink()
+        vals_list = []
+        for line in purchase_lines.sudo():
+            if line.order_id.state in RESERVE_ORDER_STATES + CONFIRM_ORDER_STATES and not line.display_type:
+                vals_list.append(line._prepare_budget_commitment_vals())
+        self.create(vals_list)
+
+    @api.model
+    def _rebuild(self):
+        """ Recompute the whole ledger. """
+        self._cr.execute('TRUNCATE crossovered_budget_commitment')
+        self.invalidate_cache()
+        self._refresh(self.env['purchase.order.line'].search([('order_id.state', '!=', 'cancel')]))
+
+    @api.model
+    def _rebuild_if_empty(self):
+        """ Fill the ledger when the module is installed or upgraded from a version without it. """
+        self._cr.execute('SELECT 1 FROM crossovered_budget_commitment LIMIT 1')
+        if not self._cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _refresh_products(self, products):
+        """ Recompute the rows of the purchase order lines of some products, when their expense accounts change.
+        :param products: A product.product recordset.
+        """
+        rows = self.sudo().search([('purchase_line_id.product_id', 'in', products.ids)])
+        self._refresh(rows.purchase_line_id)
+
+    @api.model
+    def _get_budget_line_amounts(self, budget_lines):
+        """ Sum the committed amounts matching some budget lines.
+
+        A row matches a budget line when it has the same analytic account, its order date is in the period of the
+        budget and the expense account of its product or product category belongs to the budgetary position.
+
+        :param budget_lines:    A crossovered.budget.lines recordset.
+        :return:                A dictionary mapping the id of each budget line to a (reserve, confirm) tuple.
+        """
+        budget_line_ids = [line_id for line_id in budget_lines._origin.ids if line_id]
+        if not budget_line_ids:
+            return {}
+        self.flush()
+        budget_lines.flush(['analytic_account_id', 'general_budget_id', 'crossovered_budget_id'])
+        self.env['crossovered.budget'].flush(['date_from', 'date_to'])
+        self.env['account.budget.post'].flush(['account_ids'])
+        self._cr.execute('''
+            SELECT budget_line.id,
+                   SUM(commitment.amount) FILTER (WHERE commitment.state = 'reserve'),
+                   SUM(commitment.amount - commitment.invoiced_amount) FILTER (WHERE commitment.state = 'confirm')
+            FROM crossovered_budget_lines budget_line
+            JOIN crossovered_budget budget ON budget.id = budget_line.crossovered_budget_id
+            JOIN crossovered_budget_commitment commitment ON (
+                commitment.analytic_account_id = budget_line.analytic_account_id
+                OR (commitment.analytic_account_id IS NULL AND budget_line.analytic_account_id IS NULL)
+            )
+            AND commitment.date_order >= budget.date_from
+            AND commitment.date_order <= budget.date_to
+            WHERE budget_line.id IN %s
+            AND EXISTS(
+                SELECT 1
+                FROM account_budget_rel rel
+                WHERE rel.budget_id = budget_line.general_budget_id
+                AND rel.account_id IN (commitment.account_id, commitment.categ_account_id)
+            )
+            GROUP BY budget_line.id
+        ''', [tuple(budget_line_ids)])
+        return {line_id: (reserve or 0.0, confirm or 0.0) for line_id, reserve, confirm in self._cr.fetchall()}
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    def write(self, vals):
+        res = super(ProductTemplate, self).write(vals)
+        if 'property_account_expense_id' in vals or 'categ_id' in vals:
+            products = self.with_context(active_test=False).product_variant_ids
+            self.env['crossovered.budget.commitment']._refresh_products(products)
+        return res
+
+
+class ProductCategory(models.Model):
+    _inherit = 'product.category'
+
+    def write(self, vals):
+        res = super(ProductCategory, self).write(vals)
+        if 'property_account_expense_categ_id' in vals:
+            products = self.env['product.product'].with_context(active_test=False).search([('categ_id', 'in', self.ids)])
+            self.env['crossovered.budget.commitment']._refresh_products(products)
+        return res
+
+
+class PurchaseOrder(models.Model):
+    _inherit = 'purchase.order'
+
+    def write(self, vals):
+        res = super(PurchaseOrder, self).write(vals)
+        if 'state' in vals or 'date_order' in vals:
+            self.env['crossovered.budget.commitment']._refresh(self.order_line)
+        return res
+
+
+class PurchaseOrderLine(models.Model):
+    _inherit = 'purchase.order.line'
+
+    # Fields of the line the budget commitment depends on.
+    _budget_commitment_fields = {
+        'product_id', 'product_qty', 'price_unit', 'taxes_id', 'account_analytic_id', 'display_type', 'order_id',
+    }
+
+    def _prepare_budget_commitment_vals(self):
+        self.ensure_one()
+        vals = self._prepare_compute_all_values()
+        taxes = self.taxes_id.filtered(lambda x: x.analytic).compute_all(
+            vals['price_unit'],
+            vals['currency_id'],
+            vals['product_qty'],
+            vals['product'],
+            vals['partner'])
+        tax_amount = sum(t.get('amount', 0.0) for t in taxes.get('taxes', []))
+        invoiced_amount = 0.0
+        if self.order_id.state in CONFIRM_ORDER_STATES:
+            invoice_lines = self.invoice_lines.filtered(lambda l: l.move_id.state not in ('draft', 'cancel'))
+            invoiced_amount = sum(invoice_lines.mapped('price_total' if tax_amount else 'price_subtotal'))
+        product = self.product_id.with_company(self.company_id)
+        return {
+            'purchase_line_id': self.id,
+            'company_id': self.company_id.id,
+            'analytic_account_id': self.account_analytic_id.id,
+            'account_id': product.property_account_expense_id.id,
+            'categ_account_id': product.categ_id.property_account_expense_categ_id.id,
+            'date_order': self.order_id.date_order,
+            'state': 'confirm' if self.order_id.state in CONFIRM_ORDER_STATES else 'reserve',
+            'amount': self.price_subtotal + tax_amount,
+            'invoiced_amount': invoiced_amount,
+        }
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(PurchaseOrderLine, self).create(vals_list)
+        self.env['crossovered.budget.commitment']._refresh(lines)
+        return lines
+
+    def write(self, vals):
+        res = super(PurchaseOrderLine, self).write(vals)
+        if self._budget_commitment_fields.intersection(vals):
+            self.env['crossovered.budget.commitment']._refresh(self)
+        return res
@@ -63,12 +63,13 @@ class AccountingExpressionProcessor(object):
 
     How it works:
         * by accumulating the expressions before hand, it ensures to do the
-          strict minimum number of queries to the database (for each period,
-          one query per domain and mode);
-        * it queries using the orm read_group which reduces to a query with
-          sum on debit and credit and group by on account_id and company_id,
-          (note: it seems the orm then does one query per account to fetch
-          the account name...);
+          strict minimum number of queries to the database;
+        * all domains and modes of a period are merged in a single scan
+          of the move lines, with one conditional sum (FILTER clause) on
+          debit and credit per domain and mode, grouped by account_id and
+          company_id;
+        * prefetch_queries() can be invoked with all the periods of a
+          report beforehand, so they also share the same scans;
         * additionally, one query per view/consolidation account is done to
           discover the children accounts.
     """
@@ -114,6 +115,10 @@ class AccountingExpressionProcessor(object):
         self.smart_end = True
         # Account model
         self._account_model = self.env[account_model].with_context(active_test=False)
+        # {accounting variable groups: (field, mode, acc_domain, ml_domain)}
+        self._parsed_vars = {}
+        # {period key: {(domain, mode): {account_id: (debit, credit)}}}
+        self._prefetched_data = {}
 
     def _account_codes_to_domain(self, account_codes):
         """Convert a comma separated list of account codes
@@ -133,6 +138,19 @@ class AccountingExpressionProcessor(object):
 
         Returns field, mode, account domain, move line domain.
         """
+        return self._parse_var_groups(mo.groups())
+
+    def _parse_var_groups(self, var_groups):
+        """Split the regex groups of an accounting variable
+
+        Returns field, mode, account domain, move line domain.
+        The result is cached as it involves evaluating domains.
+        """
+        if var_groups not in self._parsed_vars:
+            self._parsed_vars[var_groups] = self._do_parse_var_groups(var_groups)
+        return self._parsed_vars[var_groups]
+
+    def _do_parse_var_groups(self, var_groups):
         domain_eval_context = {
             "ref": self.env.ref,
             "user": self.env.user,
@@ -140,7 +158,7 @@ class AccountingExpressionProcessor(object):
             "datetime": datetime,
             "dateutil": dateutil,
         }
-        field, mode, account_sel, ml_domain = mo.groups()
+        field, mode, account_sel, ml_domain = var_groups
         # handle some legacy modes
         if not mode:
             mode = self.MODE_VARIATION
@@ -201,6 +219,30 @@ class AccountingExpressionProcessor(object):
                 all_account_ids.update(account_ids)
             self._map_account_ids[key] = list(all_account_ids)
 
+    @classmethod
+    def compile_expr(cls, expr):
+        """Split an expression into a template and its accounting variables.
+
+        Each accounting variable of the expression is replaced by a local
+        name (see get_var_values) so the template can be compiled once
+        and evaluated for any period or account.
+
+        Returns (template, var_groups) where var_groups is a tuple holding
+        the regex groups of each accounting variable. It only depends on
+        the expression, so it can be cached.
+        """
+        var_groups = []
+
+        def f(mo):
+            var_groups.append(mo.groups())
+            return cls._var_name(len(var_groups) - 1)
+
+        return cls._ACC_RE.sub(f, expr), tuple(var_groups)
+
+    @classmethod
+    def _var_name(cls, index):
+        return "_aep_var_{}".format(index)
+
     @classmethod
     def has_account_var(cls, expr):
         """Test if an string contains an accounting variable."""
@@ -304,6 +346,38 @@ class AccountingExpressionProcessor(object):
             company_rates[company.id] = (rate, company.currency_id.decimal_places)
         return company_rates
 
+    # maximum number of domains and modes queried in a single scan
+    _MAX_FILTERS_PER_QUERY = 500
+
+    def _get_period_key(
+        self, date_from, date_to, target_move, additional_move_line_filter, aml_model
+    ):
+        return (
+            fields.Date.to_date(date_from),
+            fields.Date.to_date(date_to),
+            target_move,
+            repr(additional_move_line_filter or []),
+            aml_model or "account.move.line",
+        )
+
+    def prefetch_queries(self, periods):
+        """Query sums of debit and credit for several periods at once,
+        so all their domains and modes share the same scans of the move
+        lines. do_queries() then reuses the prefetched data of a period
+        instead of querying again.
+
+        :param periods: a list of tuples with the arguments of do_queries():
+                        (date_from, date_to, target_move,
+                        additional_move_line_filter, aml_model)
+
+        This method must be executed after done_parsing().
+        """
+        self._prefetched_data.update(
+            self._query_periods(
+                {self._get_period_key(*period): period for period in periods}
+            )
+        )
+
     def do_queries(
         self,
         date_from,
@@ -317,72 +391,168 @@ class AccountingExpressionProcessor(object):
 
         This method must be executed after done_parsing().
         """
-        if not aml_model:
-            aml_model = self.env["account.move.line"]
-        else:
-            aml_model = self.env[aml_model]
-        aml_model = aml_model.with_context(active_test=False)
-        company_rates = self._get_company_rates(date_to)
+        period = (
+            date_from,
+            date_to,
+            target_move,
+            additional_move_line_filter,
+            aml_model,
+        )
+        period_key = self._get_period_key(*period)
+        if period_key not in self._prefetched_data:
+            self._prefetched_data.update(self._query_periods({period_key: period}))
         # {(domain, mode): {account_id: (debit, credit)}}
-        self._data = defaultdict(dict)
-        domain_by_mode = {}
-        ends = []
-        for key in self._map_account_ids:
-            domain, mode = key
-            if mode == self.MODE_END and self.smart_end:
-                # postpone computation of ending balance
-                ends.append((domain, mode))
-                continue
-            if mode not in domain_by_mode:
-                domain_by_mode[mode] = self.get_aml_domain_for_dates(
-                    date_from, date_to, mode, target_move
-                )
-            domain = list(domain) + domain_by_mode[mode]
-            domain.append(("account_id", "in", self._map_account_ids[key]))
-            if additional_move_line_filter:
-                domain.extend(additional_move_line_filter)
-            # fetch sum of debit/credit, grouped by account_id
-            accs = aml_model.read_group(
-                domain,
-                ["debit", "credit", "account_id", "company_id"],
-                ["account_id", "company_id"],
-                lazy=False,
-            )
-            for acc in accs:
-                rate, dp = company_rates[acc["company_id"][0]]
-                debit = acc["debit"] or 0.0
-                credit = acc["credit"] or 0.0
-                if mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED) and float_is_zero(
-                    debit - credit, precision_digits=self.dp
-                ):
-                    # in initial mode, ignore accounts with 0 balance
-                    continue
-                self._data[key][acc["account_id"][0]] = (debit * rate, credit * rate)
-        # compute ending balances by summing initial and variation
-        for key in ends:
-            domain, mode = key
-            initial_data = self._data[(domain, self.MODE_INITIAL)]
-            variation_data = self._data[(domain, self.MODE_VARIATION)]
-            account_ids = set(initial_data.keys()) | set(variation_data.keys())
-            for account_id in account_ids:
-                di, ci = initial_data.get(account_id, (AccountingNone, AccountingNone))
-                dv, cv = variation_data.get(
-                    account_id, (AccountingNone, AccountingNone)
-                )
-                self._data[key][account_id] = (di + dv, ci + cv)
+        self._data = self._prefetched_data[period_key]
 
-    def replace_expr(self, expr):
-        """Replace accounting variables in an expression by their amount.
-
-        Returns a new expression string.
+    def _query_periods(self, periods):
+        """Query sums of debit and credit for all accounts and domains
+        used in expressions, for several periods.
 
-        This method must be executed after do_queries().
+        :param periods: {period key: do_queries() arguments}
+        :return: {period key: {(domain, mode): {account_id: (debit, credit)}}}
         """
-
-        def f(mo):
-            field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
-            key = (ml_domain, mode)
-            account_ids_data = self._data[key]
+        data_by_period = {}
+        # {aml model: [(period key, (domain, mode), aml domain)]}
+        filters_by_model = defaultdict(list)
+        for period_key, period in periods.items():
+            (
+                date_from,
+                date_to,
+                target_move,
+                additional_move_line_filter,
+                aml_model,
+            ) = period
+            data_by_period[period_key] = defaultdict(dict)
+            domain_by_mode = {}
+            for key in self._map_account_ids:
+                domain, mode = key
+                if mode == self.MODE_END and self.smart_end:
+                    # postpone computation of ending balance
+                    continue
+                if mode not in domain_by_mode:
+                    domain_by_mode[mode] = self.get_aml_domain_for_dates(
+                        date_from, date_to, mode, target_move
+                    )
+                domain = list(domain) + domain_by_mode[mode]
+                domain.append(("account_id", "in", self._map_account_ids[key]))
+                if additional_move_line_filter:
+                    domain.extend(additional_move_line_filter)
+                filters_by_model[aml_model or "account.move.line"].append(
+                    (period_key, key, domain)
+                )
+        for aml_model, filters in filters_by_model.items():
+            self._query_filters(self.env[aml_model], filters, periods, data_by_period)
+        # compute ending balances by summing initial and variation
+        if self.smart_end:
+            for data in data_by_period.values():
+                for key in self._map_account_ids:
+                    domain, mode = key
+                    if mode != self.MODE_END:
+                        continue
+                    initial_data = data[(domain, self.MODE_INITIAL)]
+                    variation_data = data[(domain, self.MODE_VARIATION)]
+                    account_ids = set(initial_data.keys()) | set(variation_data.keys())
+                    for account_id in account_ids:
+                        di, ci = initial_data.get(
+                            account_id, (AccountingNone, AccountingNone)
+                        )
+                        dv, cv = variation_data.get(
+                            account_id, (AccountingNone, AccountingNone)
+                        )
+                        data[key][account_id] = (di + dv, ci + cv)
+        return data_by_period
+
+    def _query_filters(self, aml_model, filters, periods, data_by_period):
+        """Fetch sum of debit/credit, grouped by account_id and company_id,
+        for each (period key, (domain, mode), aml domain) of filters.
+
+        Filters sharing the same joins are computed in a single scan,
+        using one conditional sum per filter.
+        """
+        aml_model = aml_model.with_context(active_test=False)
+        aml_model.check_access_rights("read")
+        table = aml_model._table
+        # {(from clause, join params): [(filter, where clause, where params)]}
+        filters_by_from = defaultdict(list)
+        for aml_filter in filters:
+            query = aml_model._where_calc(aml_filter[2])
+            aml_model._apply_ir_rules(query, "read")
+            from_clause, where_clause, params = query.get_sql()
+            join_params_count = from_clause.count("%s")
+            filters_by_from[(from_clause, tuple(params[:join_params_count]))].append(
+                (aml_filter, where_clause or "TRUE", params[join_params_count:])
+            )
+        company_rates_by_period = {
+            period_key: self._get_company_rates(periods[period_key][1])
+            for period_key in {aml_filter[0] for aml_filter in filters}
+        }
+        for (from_clause, join_params), from_filters in filters_by_from.items():
+            for i in range(0, len(from_filters), self._MAX_FILTERS_PER_QUERY):
+                chunk = from_filters[i : i + self._MAX_FILTERS_PER_QUERY]
+                flags = ", ".join(
+                    "({}) AS f{}".format(where_clause, j)
+                    for j, (_f, where_clause, _p) in enumerate(chunk)
+                )
+                sums = ", ".join(
+                    "SUM(debit) FILTER (WHERE f{j}), "
+                    "SUM(credit) FILTER (WHERE f{j})".format(j=j)
+                    for j in range(len(chunk))
+                )
+                where = " OR ".join(
+                    "({})".format(where_clause) for _f, where_clause, _p in chunk
+                )
+                params = []
+                for _f, _w, where_params in chunk:
+                    params.extend(where_params)
+                params.extend(join_params)
+                for _f, _w, where_params in chunk:
+                    params.extend(where_params)
+                query = (
+                    "SELECT account_id, company_id, {sums} "
+                    "FROM ("
+                    'SELECT "{table}".account_id, "{table}".company_id, '
+                    '"{table}".debit, "{table}".credit, {flags} '
+                    "FROM {from_clause} "
+                    "WHERE {where}"
+                    ") AS aml "
+                    "GROUP BY account_id, company_id".format(
+                        sums=sums,
+                        table=table,
+                        flags=flags,
+                        from_clause=from_clause,
+                        where=where,
+                    )
+                )
+                self.env.cr.execute(query, params)
+                for row in self.env.cr.fetchall():
+                    account_id, company_id = row[0], row[1]
+                    for j, (aml_filter, _w, _p) in enumerate(chunk):
+                        debit, credit = row[2 + 2 * j], row[3 + 2 * j]
+                        if debit is None and credit is None:
+                            # no move line of the group matches this filter
+                            continue
+                        period_key, key, _domain = aml_filter
+                        mode = key[1]
+                        rate, dp = company_rates_by_period[period_key][company_id]
+                        debit = debit or 0.0
+                        credit = credit or 0.0
+                        if mode in (
+                            self.MODE_INITIAL,
+                            self.MODE_UNALLOCATED,
+                        ) and float_is_zero(debit - credit, precision_digits=self.dp):
+                            # in initial mode, ignore accounts with 0 balance
+                            continue
+                        data_by_period[period_key][key][account_id] = (
+                            debit * rate,
+                            credit * rate,
+                        )
+
+    def _get_var_value(self, field, mode, acc_domain, ml_domain, account_id=None):
+        """Compute the amount of an accounting variable, for all its accounts
+        or for the given account only."""
+        key = (ml_domain, mode)
+        account_ids_data = self._data[key]
+        if account_id is None:
             v = AccountingNone
             account_ids = self._account_ids_by_acc_domain[acc_domain]
             for account_id in account_ids:
@@ -399,36 +569,12 @@ class AccountingExpressionProcessor(object):
                     v += debit
                 elif field == "crd":
                     v += credit
-            # in initial balance mode, assume 0 is None
-            # as it does not make sense to distinguish 0 from "no data"
-            if (
-                v is not AccountingNone
-                and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
-                and float_is_zero(v, precision_digits=self.dp)
-            ):
-                v = AccountingNone
-            return "(" + repr(v) + ")"
-
-        return self._ACC_RE.sub(f, expr)
-
-    def replace_exprs_by_account_id(self, exprs):
-        """Replace accounting variables in a list of expression
-        by their amount, iterating by accounts involved in the expression.
-
-        yields account_id, replaced_expr
-
-        This method must be executed after do_queries().
-        """
-
-        def f(mo):
-            field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
-            key = (ml_domain, mode)
+        else:
             # first check if account_id is involved in
             # the current expression part
             if account_id not in self._account_ids_by_acc_domain[acc_domain]:
-                return "(AccountingNone)"
+                return AccountingNone
             # here we know account_id is involved in acc_domain
-            account_ids_data = self._data[key]
             debit, credit = account_ids_data.get(
                 account_id, (AccountingNone, AccountingNone)
             )
@@ -448,29 +594,97 @@ class AccountingExpressionProcessor(object):
                 v = debit
             elif field == "crd":
                 v = credit
-            # in initial balance mode, assume 0 is None
-            # as it does not make sense to distinguish 0 from "no data"
-            if (
-                v is not AccountingNone
-                and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
-                and float_is_zero(v, precision_digits=self.dp)
-            ):
-                v = AccountingNone
+        # in initial balance mode, assume 0 is None
+        # as it does not make sense to distinguish 0 from "no data"
+        if (
+            v is not AccountingNone
+            and mode in (self.MODE_INITIAL, self.MODE_UNALLOCATED)
+            and float_is_zero(v, precision_digits=self.dp)
+        ):
+            v = AccountingNone
+        return v
+
+    def replace_expr(self, expr):
+        """Replace accounting variables in an expression by their amount.
+
+        Returns a new expression string.
+
+        This method must be executed after do_queries().
+        """
+
+        def f(mo):
+            v = self._get_var_value(*self._parse_match_object(mo))
             return "(" + repr(v) + ")"
 
+        return self._ACC_RE.sub(f, expr)
+
+    def get_var_values(self, var_groups, account_id=None):
+        """Compute the accounting variables of an expression compiled
+        with compile_expr(), for all accounts or for the given account.
+
+        Returns a dictionary mapping the local names of the template
+        to their amount.
+
+        This method must be executed after do_queries().
+        """
+        return {
+            self._var_name(i): self._get_var_value(
+                *self._parse_var_groups(groups), account_id=account_id
+            )
+            for i, groups in enumerate(var_groups)
+        }
+
+    def _get_account_ids_with_data(self, var_groups_list):
         account_ids = set()
-        for expr in exprs:
-            for mo in self._ACC_RE.finditer(expr):
-                field, mode, acc_domain, ml_domain = self._parse_match_object(mo)
+        for var_groups in var_groups_list:
+            for groups in var_groups:
+                field, mode, acc_domain, ml_domain = self._parse_var_groups(groups)
                 key = (ml_domain, mode)
                 account_ids_data = self._data[key]
                 for account_id in self._account_ids_by_acc_domain[acc_domain]:
                     if account_id in account_ids_data:
                         account_ids.add(account_id)
+        return account_ids
 
+    def replace_exprs_by_account_id(self, exprs):
+        """Replace accounting variables in a list of expression
+        by their amount, iterating by accounts involved in the expression.
+
+        yields account_id, replaced_expr
+
+        This method must be executed after do_queries().
+        """
+
+        def f(mo):
+            v = self._get_var_value(
+                *self._parse_match_object(mo), account_id=account_id
+            )
+            return "(" + repr(v) + ")"
+
+        account_ids = self._get_account_ids_with_data(
+            [
+                tuple(mo.groups() for mo in self._ACC_RE.finditer(expr))
+                for expr in exprs
+            ]
+        )
         for account_id in account_ids:
             yield account_id, [self._ACC_RE.sub(f, expr) for expr in exprs]
 
+    def get_var_values_by_account_id(self, var_groups_list):
+        """Compute the accounting variables of a list of expressions
+        compiled with compile_expr(), iterating by accounts involved
+        in the expressions.
+
+        yields account_id, [var_values]
+
+        This method must be executed after do_queries().
+        """
+        for account_id in self._get_account_ids_with_data(var_groups_list):
+            yield account_id, [
+                self.get_var_values(var_groups, account_id=account_id)
+                for var_groups in var_groups_list
+            ]
+
     @classmethod
     def _get_balances(cls, mode, companies, date_from, date_to, target_move="posted"):
         expr = "deb{mode}[], crd{mode}[]".format(mode=mode)
@@ -1,7 +1,10 @@
 # Copyright 2020 ACSONE SA/NV (<http://acsone.eu>)
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
-from .mis_safe_eval import NameDataError, mis_safe_eval
+from collections import ChainMap
+
+from .aep import AccountingExpressionProcessor as AEP
+from .mis_safe_eval import NameDataError, mis_safe_compile, mis_safe_eval
 
 try:
     import itertools.izip as zip
@@ -9,6 +12,24 @@ except ImportError:
     pass  # python 3
 
 
+def compile_expression(expr):
+    """Compile a KPI expression so it can be evaluated for any period
+    without parsing it again.
+
+    Returns (var_groups, template, code) where var_groups are the
+    accounting variables of the expression (see AEP.compile_expr),
+    template the expression where they are replaced by local names and
+    code the compiled template, or None if it is not a valid expression.
+    """
+    template, var_groups = AEP.compile_expr(expr)
+    try:
+        code = mis_safe_compile(template)
+    except Exception:
+        # mis_safe_eval will report the error when evaluating the template
+        code = None
+    return var_groups, template, code
+
+
 class ExpressionEvaluator(object):
     def __init__(
         self,
@@ -26,6 +47,7 @@ class ExpressionEvaluator(object):
         self.additional_move_line_filter = additional_move_line_filter
         self.aml_model = aml_model
         self._aep_queries_done = False
+        self._none_compiled = compile_expression("AccountingNone")
 
     def aep_do_queries(self):
         if self.aep and not self._aep_queries_done:
@@ -38,22 +60,35 @@ class ExpressionEvaluator(object):
             )
             self._aep_queries_done = True
 
+    def _get_compiled(self, expression):
+        if not expression:
+            return self._none_compiled
+        return expression._get_compiled_expression()
+
+    def _eval_compiled(self, compiled, var_values, locals_dict):
+        var_groups, template, code = compiled
+        if var_values:
+            locals_dict = ChainMap(var_values, locals_dict)
+        return mis_safe_eval(code if code is not None else template, locals_dict)
+
     def eval_expressions(self, expressions, locals_dict):
         vals = []
         drilldown_args = []
         name_error = False
         for expression in expressions:
-            expr = expression and expression.name or "AccountingNone"
-            if self.aep:
-                replaced_expr = self.aep.replace_expr(expr)
+            compiled = self._get_compiled(expression)
+            var_groups = compiled[0]
+            if var_groups and not self.aep:
+                # no accounting data: evaluate the expression as is
+                val = mis_safe_eval(expression.name, locals_dict)
             else:
-                replaced_expr = expr
-            val = mis_safe_eval(replaced_expr, locals_dict)
+                var_values = var_groups and self.aep.get_var_values(var_groups)
+                val = self._eval_compiled(compiled, var_values, locals_dict)
             vals.append(val)
             if isinstance(val, NameDataError):
                 name_error = True
-            if replaced_expr != expr:
-                drilldown_args.append({"expr": expr})
+            if var_groups and self.aep:
+                drilldown_args.append({"expr": expression.name})
             else:
                 drilldown_args.append(None)
         return vals, drilldown_args, name_error
@@ -62,14 +97,19 @@ class ExpressionEvaluator(object):
         if not self.aep:
             return
         exprs = [e and e.name or "AccountingNone" for e in expressions]
-        for account_id, replaced_exprs in self.aep.replace_exprs_by_account_id(exprs):
+        compiled_exprs = [self._get_compiled(e) for e in expressions]
+        for account_id, var_values_list in self.aep.get_var_values_by_account_id(
+            [compiled[0] for compiled in compiled_exprs]
+        ):
             vals = []
             drilldown_args = []
             name_error = False
-            for expr, replaced_expr in zip(exprs, replaced_exprs):
-                val = mis_safe_eval(replaced_expr, locals_dict)
+            for expr, compiled, var_values in zip(
+                exprs, compiled_exprs, var_values_list
+            ):
+                val = self._eval_compiled(compiled, var_values, locals_dict)
                 vals.append(val)
-                if replaced_expr != expr:
+                if compiled[0]:
                     drilldown_args.append({"expr": expr, "account_id": account_id})
                 else:
                     drilldown_args.append(None)
@@ -262,7 +262,9 @@ class KpiMatrix(object):
                 # evaluate style expression
                 try:
                     style_name = mis_safe_eval(
-                        row.kpi.style_expression, col.locals_dict
+                        row.kpi._get_compiled_style_expression()
+                        or row.kpi.style_expression,
+                        col.locals_dict,
                     )
                 except Exception:
                     _logger.error(
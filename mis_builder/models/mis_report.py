@@ -13,16 +13,17 @@ import pytz
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 from odoo.models import expression as osv_expression
+from odoo.tools import ormcache
 from odoo.tools.safe_eval import safe_eval
 
 from .accounting_none import AccountingNone
 from .aep import AccountingExpressionProcessor as AEP
 from .aggregate import _avg, _max, _min, _sum
-from .expression_evaluator import ExpressionEvaluator
+from .expression_evaluator import ExpressionEvaluator, compile_expression
 from .kpimatrix import KpiMatrix
 from .mis_kpi_data import ACC_AVG, ACC_NONE, ACC_SUM
 from .mis_report_style import CMP_DIFF, CMP_NONE, CMP_PCT, TYPE_NUM, TYPE_PCT, TYPE_STR
-from .mis_safe_eval import DataError
+from .mis_safe_eval import DataError, mis_safe_compile
 from .simple_array import SimpleArray, named_simple_array
 
 _logger = logging.getLogger(__name__)
@@ -226,6 +227,23 @@ class MisReportKpi(models.Model):
             self.compare_method = CMP_NONE
             self.accumulation_method = ACC_NONE
 
+    @ormcache("self.style_expression")
+    def _get_compiled_style_expression(self):
+        """Compile the style expression once for all cells of the KPI.
+
+        The cache key is the expression itself, so a modified expression is
+        compiled again.
+
+        Returns None if there is no style expression or if it is invalid,
+        in which case it must be evaluated as a string to report the error.
+        """
+        if not self.style_expression:
+            return None
+        try:
+            return mis_safe_compile(self.style_expression)
+        except Exception:
+            return None
+
     def _get_expression_str_for_subkpi(self, subkpi):
         e = self._get_expression_for_subkpi(subkpi)
         return e and e.name or ""
@@ -301,6 +319,15 @@ class MisReportKpiExpression(models.Model):
         )
     ]
 
+    @ormcache("self.name")
+    def _get_compiled_expression(self):
+        """Compile the expression once for all periods of all reports.
+
+        See compile_expression() for the returned value. The cache key is
+        the expression itself so a modified expression is compiled again.
+        """
+        return compile_expression(self.name or "AccountingNone")
+
     def name_get(self):
         res = []
         for rec in self:
@@ -791,6 +791,26 @@ class MisReportInstance(models.Model):
             no_auto_expand_accounts=self.no_auto_expand_accounts,
         )
 
+    def _prefetch_move_lines_queries(self, aep):
+        """Query the accounting data of all move lines columns at once,
+        so they share the same scans of the move lines instead of
+        querying them column by column."""
+        aep.prefetch_queries(
+            [
+                (
+                    period.date_from,
+                    period.date_to,
+                    None,  # target_move now part of additional_move_line_filter
+                    period._get_additional_move_line_filter(),
+                    period._get_aml_model_name(),
+                )
+                for period in self.period_ids
+                if period.source in (SRC_ACTUALS, SRC_ACTUALS_ALT)
+                and period.date_from
+                and period.date_to
+            ]
+        )
+
     def _add_column_sumcol(self, aep, kpi_matrix, period, label, description):
         kpi_matrix.declare_sum(
             period.id,
@@ -832,6 +852,7 @@ class MisReportInstance(models.Model):
         self.ensure_one()
         aep = self.report_id._prepare_aep(self.query_company_ids, self.currency_id)
         kpi_matrix = self.report_id.prepare_kpi_matrix(self.multi_company)
+        self._prefetch_move_lines_queries(aep)
         for period in self.period_ids:
             description = None
             if period.mode == MODE_NONE:
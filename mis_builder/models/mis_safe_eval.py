@@ -2,24 +2,42 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl.html).
 
 import traceback
+from types import CodeType
 
 from odoo.tools.safe_eval import _BUILTINS, _SAFE_OPCODES, test_expr
 
 from .data_error import DataError, NameDataError
 
-__all__ = ["mis_safe_eval"]
+__all__ = ["mis_safe_compile", "mis_safe_eval"]
+
+
+def mis_safe_compile(expr):
+    """Check an expression using safe_eval rules and compile it
+
+    Returns a code object that can be passed to mis_safe_eval
+    to evaluate the expression without parsing it again.
+
+    Raises the parsing or validation error if the expression is invalid.
+    """
+    return test_expr(expr, _SAFE_OPCODES, mode="eval")
 
 
 def mis_safe_eval(expr, locals_dict):
     """Evaluate an expression using safe_eval
 
+    The expression is either a string or a code object
+    obtained with mis_safe_compile.
+
     Returns the evaluated value or DataError.
 
     Raises NameError if the evaluation depends on a variable that is not
     present in local_dict.
     """
     try:
-        c = test_expr(expr, _SAFE_OPCODES, mode="eval")
+        if isinstance(expr, CodeType):
+            c = expr
+        else:
+            c = mis_safe_compile(expr)
         globals_dict = {"__builtins__": _BUILTINS}
         # pylint: disable=eval-used,eval-referenced
         val = eval(c, globals_dict, locals_dict)
@@ -410,3 +410,48 @@ class TestAEP(common.TransactionCase):
         )
         # let's see if there was a match
         self.assertEqual(self._eval(expr), -100)
+
+    def test_compile_expr(self):
+        template, var_groups = AEP.compile_expr("balp[400AR] + 2 * bale[700IN]")
+        self.assertEqual(template, "_aep_var_0 + 2 * _aep_var_1")
+        self.assertEqual(len(var_groups), 2)
+        self.aep.done_parsing()
+        self._do_queries(
+            datetime.date(self.prev_year, 12, 1), datetime.date(self.prev_year, 12, 31)
+        )
+        var_values = self.aep.get_var_values(var_groups)
+        self.assertEqual(var_values, {"_aep_var_0": 100, "_aep_var_1": -100})
+        eval_dict = dict(var_values, AccountingNone=AccountingNone)
+        self.assertEqual(
+            safe_eval(template, eval_dict),
+            self._eval("balp[400AR] + 2 * bale[700IN]"),
+        )
+        # by account
+        res = dict(self.aep.get_var_values_by_account_id([var_groups]))
+        self.assertEqual(
+            res[self.account_ar.id], [{"_aep_var_0": 100, "_aep_var_1": AccountingNone}]
+        )
+
+    def test_prefetch_queries(self):
+        self.aep.done_parsing()
+        dec = (
+            datetime.date(self.prev_year, 12, 1),
+            datetime.date(self.prev_year, 12, 31),
+            "posted",
+            None,
+            None,
+        )
+        jan = (
+            datetime.date(self.curr_year, 1, 1),
+            datetime.date(self.curr_year, 1, 31),
+            "posted",
+            None,
+            None,
+        )
+        self.aep.prefetch_queries([dec, jan])
+        self._do_queries(dec[0], dec[1])
+        self.assertEqual(self._eval("balp[400AR]"), 100)
+        self.assertEqual(self._eval("bale[700IN]"), -100)
+        self._do_queries(jan[0], jan[1])
+        self.assertEqual(self._eval("bali[400AR]"), 100)
+        self.assertIs(self._eval("bali[700IN]"), AccountingNone)
@@ -3,7 +3,12 @@
 
 import odoo.tests.common as common
 
-from ..models.mis_safe_eval import DataError, NameDataError, mis_safe_eval
+from ..models.mis_safe_eval import (
+    DataError,
+    NameDataError,
+    mis_safe_compile,
+    mis_safe_eval,
+)
 
 
 class TestMisSafeEval(common.TransactionCase):
@@ -23,3 +28,10 @@ class TestMisSafeEval(common.TransactionCase):
         val = mis_safe_eval("a + 1", {})
         self.assertTrue(isinstance(val, NameDataError))
         self.assertEqual(val.name, "#NAME")
+
+    def test_compiled(self):
+        code = mis_safe_compile("a + 1")
+        self.assertEqual(mis_safe_eval(code, {"a": 1}), 2)
+        self.assertEqual(mis_safe_eval(code, {"a": 2}), 3)
+        with self.assertRaises(SyntaxError):
+            mis_safe_compile("1a")
@@ -42,6 +42,17 @@ class AccountMoveLine(models.Model):
 
     move_attachment_ids = fields.One2many('ir.attachment', compute='_compute_attachment')
 
+    def init(self):
+        super().init()
+        # Used to match the statement lines against the open journal items of a partner by amount in the
+        # reconciliation widget. Only the journal items not reconciled yet are indexed, using the same condition as
+        # the domain ('reconciled', '=', False) so that the planner can use the index for the widget queries.
+        self._cr.execute('''
+            CREATE INDEX IF NOT EXISTS account_move_line_partner_residual_account_idx
+            ON account_move_line (partner_id, amount_residual, account_id)
+            WHERE (reconciled = FALSE OR reconciled IS NULL)
+        ''')
+
     def _compute_attachment(self):
         for record in self:
             record.move_attachment_ids = self.env['ir.attachment'].search(expression.OR(record._get_attachment_domains()))
@@ -78,10 +78,7 @@ class AccountReconciliation(models.AbstractModel):
         self._cr.execute(query + trailing_query, params + trailing_params)
         move_lines = self.env['account.move.line'].browse(res['id'] for res in self._cr.dictfetchall())
 
-        js_vals_list = []
-        for line in move_lines:
-            js_vals_list.append(self._prepare_js_reconciliation_widget_move_line(statement_line, line))
-        return js_vals_list
+        return self._prepare_js_reconciliation_widget_move_lines(statement_line, move_lines)
 
     @api.model
     def _get_bank_statement_line_partners(self, st_lines):
@@ -164,8 +161,15 @@ class AccountReconciliation(models.AbstractModel):
 
         matching_amls = reconcile_model._apply_rules(bank_statement_lines, excluded_ids=excluded_ids, partner_map=partner_map)
 
+        # Fetch at once the propositions and the partners of all the statement lines to serialize them without
+        # querying the database line by line.
+        all_aml_ids = [aml_id for vals in matching_amls.values() if vals.get('status') != 'reconciled' for aml_id in vals.get('aml_ids') or []]
+        all_amls = self.env['account.move.line'].browse(all_aml_ids)
+        self._prefetch_reconciliation_widget_move_lines(all_amls)
+        partners = self.env['res.partner'].browse([partner_id for partner_id in partner_map.values() if partner_id])
+        partners.mapped('name')
+
         # Iterate on st_lines to keep the same order in the results list.
-        bank_statements_left = self.env['account.bank.statement']
         for line in bank_statement_lines:
             if matching_amls[line.id].get('status') == 'reconciled':
                 reconciled_move_lines = matching_amls[line.id].get('reconciled_lines')
@@ -173,9 +177,8 @@ class AccountReconciliation(models.AbstractModel):
                 results['reconciled_aml_ids'] += reconciled_move_lines and reconciled_move_lines.ids or []
             else:
                 aml_ids = matching_amls[line.id]['aml_ids']
-                bank_statements_left += line.statement_id
 
-                amls = aml_ids and self.env['account.move.line'].browse(aml_ids)
+                amls = all_amls.browse(aml_ids or [])
                 line_vals = {
                     'st_line': self._get_statement_line(line),
                     'reconciliation_proposition': [self._prepare_js_reconciliation_widget_move_line(line, aml) for aml in amls],
@@ -186,7 +189,7 @@ class AccountReconciliation(models.AbstractModel):
                 line_partner = matching_amls[line.id].get('partner')
 
                 if not line_partner and partner_map.get(line.id):
-                    line_partner = self.env['res.partner'].browse(partner_map[line.id])
+                    line_partner = partners.browse(partner_map[line.id])
 
                 if line_partner:
                     line_vals.update({
@@ -663,6 +666,26 @@ class AccountReconciliation(models.AbstractModel):
         '''
         return query, where_params
 
+    @api.model
+    def _prefetch_reconciliation_widget_move_lines(self, lines):
+        ''' Read at once the fields used by '_prepare_js_reconciliation_widget_move_line' for all the journal items.
+        :param lines: An account.move.line recordset.
+        '''
+        lines.mapped('move_id.name')
+        lines.mapped('account_id.display_name')
+        lines.mapped('journal_id.display_name')
+        lines.mapped('partner_id.name')
+
+    @api.model
+    def _prepare_js_reconciliation_widget_move_lines(self, statement_line, lines):
+        ''' Batch version of '_prepare_js_reconciliation_widget_move_line'.
+        :param statement_line:  An account.bank.statement.line record.
+        :param lines:           An account.move.line recordset.
+        :return:                A list of dictionaries, one per journal item.
+        '''
+        self._prefetch_reconciliation_widget_move_lines(lines)
+        return [self._prepare_js_reconciliation_widget_move_line(statement_line, line) for line in lines]
+
     @api.model
     def _prepare_js_reconciliation_widget_move_line(self, statement_line, line):
         def format_name(line):
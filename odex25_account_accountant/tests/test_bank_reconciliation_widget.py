@@ -34,3 +34,31 @@ class TestBankStatementReconciliation(AccountTestInvoicingCommon):
 
         self.assertEqual(len(prop), 1)
         self.assertEqual(prop[0]['id'], rcv_mv_line.id)
+
+    def test_reconciliation_proposition_multi_lines(self):
+        invoices = self.env['account.move'].create([{
+            'move_type': 'out_invoice',
+            'partner_id': partner.id,
+            'invoice_line_ids': [(0, 0, {
+                'quantity': 1,
+                'price_unit': amount,
+                'name': 'test invoice',
+            })],
+        } for partner, amount in ((self.partner_a, 100), (self.partner_b, 200))])
+        invoices.action_post()
+        rcv_mv_lines = invoices.line_ids.filtered(lambda line: line.account_id.user_type_id.type in ('receivable', 'payable'))
+
+        st_lines = self.env['account.bank.statement'].create({
+            'journal_id': self.company_data['default_journal_bank'].id,
+            'line_ids': [
+                (0, 0, {'payment_ref': '_', 'partner_id': self.partner_a.id, 'amount': 100}),
+                (0, 0, {'payment_ref': '_', 'partner_id': self.partner_b.id, 'amount': 200}),
+            ],
+        }).line_ids
+
+        # All the propositions are serialized at once, each one must still be attached to its statement line.
+        rec_prop = self.env['account.reconciliation.widget'].get_bank_statement_line_data(st_lines.ids)['lines']
+        props_by_st_line = {vals['st_line']['id']: vals['reconciliation_proposition'] for vals in rec_prop}
+
+        for st_line, rcv_mv_line in zip(st_lines, rcv_mv_lines.sorted(lambda line: line.partner_id == self.partner_b)):
+            self.assertEqual([prop['id'] for prop in props_by_st_line[st_line.id]], [rcv_mv_line.id])
@@ -15,14 +15,17 @@ Keeps track of depreciations, and creates corresponding journal entries.
     'website': 'http://www.exp-sa.com',
     'sequence': 32,
     'depends': ['odex25_account_reports','mrp' ],
+    'external_dependencies': {'python': ['numpy']},
     'data': [
         'security/account_asset_security.xml',
         'security/ir.model.access.csv',
+        'data/account_asset_cron.xml',
         'wizard/asset_modify_views.xml',
         'wizard/asset_pause_views.xml',
         'wizard/asset_sell_views.xml',
         'views/account_account_views.xml',
         'views/account_asset_views.xml',
+        'views/account_asset_depreciation_run_views.xml',
         'views/account_deferred_revenue.xml',
         'views/account_deferred_expense.xml',
         'views/account_move_views.xml',
@@ -4,6 +4,7 @@
 from . import account
 from . import account_asset
 from . import account_move
+from . import account_asset_depreciation_run
 from . import res_company
 from . import mrp
 from . import hr_expense
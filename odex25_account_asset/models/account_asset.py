@@ -2,12 +2,20 @@
 
 
 import calendar
+import logging
 from dateutil.relativedelta import relativedelta
 from math import copysign
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
-from odoo.tools import float_compare, float_is_zero, float_round
+from odoo.tools import float_compare, float_round
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except (ImportError, IOError) as err:
+    _logger.debug(err)
 
 
 class AccountAsset(models.Model):
@@ -355,118 +363,212 @@ class AccountAsset(models.Model):
                 line.move_id.message_post(body=body)
         return super(AccountAsset, self).unlink()
 
-    def _compute_board_amount(self, computation_sequence, residual_amount, total_amount_to_depr, max_depreciation_nb,
-                              starting_sequence, depreciation_date):
-        amount = 0
-        if computation_sequence == max_depreciation_nb:
-            # last depreciation always takes the asset residual amount
-            amount = residual_amount
-        else:
-            if self.method in ('degressive', 'degressive_then_linear'):
-                amount = residual_amount * self.method_progress_factor
-            if self.method in ('linear', 'degressive_then_linear'):
-                nb_depreciation = max_depreciation_nb - starting_sequence
-                if self.prorata:
-                    nb_depreciation -= 1
-                linear_amount = min(total_amount_to_depr / nb_depreciation, residual_amount)
-                if self.method == 'degressive_then_linear':
-                    amount = max(linear_amount, amount)
-                else:
-                    amount = linear_amount
-        return amount
+    def _get_depreciation_board_values(self):
+        ''' Collect the inputs of the depreciation board of each asset of self.
+        :return: A list of dictionaries, one per asset, holding the parameters of '_compute_depreciation_boards'.
+        '''
+        board_values = []
+        for asset in self:
+            amount_change_ids = asset.depreciation_move_ids.filtered(
+                lambda x: x.asset_value_change and not x.reversal_move_id).sorted(key=lambda l: l.date)
+            posted_depreciation_move_ids = asset.depreciation_move_ids.filtered(
+                lambda x: x.state == 'posted' and not x.asset_value_change and not x.reversal_move_id).sorted(
+                key=lambda l: l.date)
+            depreciation_number = asset.method_number
+            if asset.prorata:
+                depreciation_number += 1
+            depreciation_date = asset.first_depreciation_date
+            # if we already have some previous validated entries, starting date is last entry + method period
+            if posted_depreciation_move_ids and posted_depreciation_move_ids[-1].date:
+                last_depreciation_date = fields.Date.from_string(posted_depreciation_move_ids[-1].date)
+                if last_depreciation_date > depreciation_date:  # in case we unpause the asset
+                    depreciation_date = last_depreciation_date + relativedelta(months=+int(asset.method_period))
+            board_values.append({
+                'asset': asset,
+                'depreciation_number': depreciation_number,
+                'starting_sequence': 0,
+                'amount_to_depreciate': asset.value_residual + sum(amount_change_ids.mapped('amount_total')),
+                'depreciation_date': depreciation_date,
+                'already_depreciated_amount': sum(posted_depreciation_move_ids.mapped('amount_total')),
+                'amount_change_ids': amount_change_ids,
+            })
+        return board_values
 
     def compute_depreciation_board(self):
-        self.ensure_one()
-        amount_change_ids = self.depreciation_move_ids.filtered(
-            lambda x: x.asset_value_change and not x.reversal_move_id).sorted(key=lambda l: l.date)
-        # print(self.asset_value_change, 'x.asset_value_change')
-        posted_depreciation_move_ids = self.depreciation_move_ids.filtered(
-            lambda x: x.state == 'posted' and not x.asset_value_change and not x.reversal_move_id).sorted(
-            key=lambda l: l.date)
-        print(posted_depreciation_move_ids, 'posted_depreciation_move_ids')
-        already_depreciated_amount = sum([m.amount_total for m in posted_depreciation_move_ids])
-        depreciation_number = self.method_number
-        if self.prorata:
-            depreciation_number += 1
-        starting_sequence = 0
-        amount_to_depreciate = self.value_residual + sum([m.amount_total for m in amount_change_ids])
-        depreciation_date = self.first_depreciation_date
-        # if we already have some previous validated entries, starting date is last entry + method period
-        if posted_depreciation_move_ids and posted_depreciation_move_ids[-1].date:
-            last_depreciation_date = fields.Date.from_string(posted_depreciation_move_ids[-1].date)
-            if last_depreciation_date > depreciation_date:  # in case we unpause the asset
-                depreciation_date = last_depreciation_date + relativedelta(months=+int(self.method_period))
-        commands = [(2, line_id.id, False) for line_id in
-                    self.depreciation_move_ids.filtered(lambda x: x.state == 'draft')]
-        newlines = self._recompute_board(depreciation_number, starting_sequence, amount_to_depreciate,
-                                         depreciation_date, already_depreciated_amount, amount_change_ids)
+        board_values = self._get_depreciation_board_values()
+        draft_moves = self.depreciation_move_ids.filtered(lambda x: x.state == 'draft')
+        depreciation_values, amount_change_values = self._compute_depreciation_boards(board_values)
+        self._write_amount_change_values(amount_change_values)
+        draft_moves.unlink()
+
+        AccountMove = self.env['account.move']
         newline_vals_list = []
-        for newline_vals in newlines:
-            if 'period_id' in newline_vals:
-                del newline_vals['period_id']
-            del (newline_vals['amount_total'])
+        for vals in depreciation_values:
+            newline_vals = AccountMove._prepare_move_for_asset_depreciation(vals)
+            newline_vals.pop('period_id', None)
+            del newline_vals['amount_total']
             newline_vals_list.append(newline_vals)
-        new_moves = self.env['account.move'].sudo().create(newline_vals_list)
-        for move in new_moves:
-            commands.append((4, move.id))
-
-        return self.write({'depreciation_move_ids': commands})
+        AccountMove.sudo().create(newline_vals_list)
+        return True
 
     def _recompute_board(self, depreciation_number, starting_sequence, amount_to_depreciate, depreciation_date,
                          already_depreciated_amount, amount_change_ids):
         self.ensure_one()
-        residual_amount = amount_to_depreciate
-        # Remove old unposted depreciation lines. We cannot use unlink() with One2many field
-        move_vals = []
-        prorata = self.prorata and not self.env.context.get("ignore_prorata")
-        if amount_to_depreciate != 0.0:
-            for asset_sequence in range(starting_sequence + 1, depreciation_number + 1):
-                while amount_change_ids and amount_change_ids[0].date <= depreciation_date:
-                    if not amount_change_ids[0].reversal_move_id:
-                        residual_amount -= amount_change_ids[0].amount_total
-                        amount_to_depreciate -= amount_change_ids[0].amount_total
-                        already_depreciated_amount += amount_change_ids[0].amount_total
-                    amount_change_ids[0].write({
-                        'asset_remaining_value': float_round(residual_amount,
-                                                             precision_rounding=self.currency_id.rounding),
-                        'asset_depreciated_value': amount_to_depreciate - residual_amount + already_depreciated_amount,
-                    })
-                    amount_change_ids -= amount_change_ids[0]
-                amount = self._compute_board_amount(asset_sequence, residual_amount, amount_to_depreciate,
-                                                    depreciation_number, starting_sequence, depreciation_date)
-                prorata_factor = 1
-                move_ref = self.name + ' (%s/%s)' % (
-                    prorata and asset_sequence - 1 or asset_sequence, self.method_number)
-                if prorata and asset_sequence == 1:
-                    move_ref = self.name + ' ' + _('(prorata entry)')
-                    first_date = self.prorata_date
-                    if int(self.method_period) % 12 != 0:
-                        month_days = calendar.monthrange(first_date.year, first_date.month)[1]
-                        days = month_days - first_date.day + 1
-                        prorata_factor = days / month_days
-                    else:
-                        total_days = (depreciation_date.year % 4) and 365 or 366
-                        days = (self.company_id.compute_fiscalyear_dates(first_date)['date_to'] - first_date).days + 1
-                        prorata_factor = days / total_days
-                amount = self.currency_id.round(amount * prorata_factor)
-                if float_is_zero(amount, precision_rounding=self.currency_id.rounding):
-                    continue
-                residual_amount -= amount
-                move_vals.append(self.env['account.move']._prepare_move_for_asset_depreciation({
-                    'amount': amount,
-                    'asset_id': self,
+        depreciation_values, amount_change_values = self._compute_depreciation_boards([{
+            'asset': self,
+            'depreciation_number': depreciation_number,
+            'starting_sequence': starting_sequence,
+            'amount_to_depreciate': amount_to_depreciate,
+            'depreciation_date': depreciation_date,
+            'already_depreciated_amount': already_depreciated_amount,
+            'amount_change_ids': amount_change_ids,
+        }])
+        self._write_amount_change_values(amount_change_values)
+        AccountMove = self.env['account.move']
+        return [AccountMove._prepare_move_for_asset_depreciation(vals) for vals in depreciation_values]
+
+    @api.model
+    def _round_amounts(self, amounts, roundings):
+        ''' Vectorized version of float_round (HALF-UP) using a different precision_rounding per amount. '''
+        normalized = amounts / roundings
+        with np.errstate(divide='ignore'):
+            epsilon = np.exp2(np.log2(np.abs(normalized)) - 52)
+        return np.round(normalized + np.copysign(epsilon, normalized)) * roundings
+
+    def _get_prorata_factor(self, depreciation_date):
+        ''' Ratio of the first period to depreciate when the asset is computed prorata temporis. '''
+        self.ensure_one()
+        first_date = self.prorata_date
+        if int(self.method_period) % 12 != 0:
+            month_days = calendar.monthrange(first_date.year, first_date.month)[1]
+            days = month_days - first_date.day + 1
+            return days / month_days
+        total_days = (depreciation_date.year % 4) and 365 or 366
+        days = (self.company_id.compute_fiscalyear_dates(first_date)['date_to'] - first_date).days + 1
+        return days / total_days
+
+    @api.model
+    def _compute_depreciation_boards(self, board_values):
+        ''' Compute the depreciation boards of many assets at once.
+
+        The boards are computed period by period: at each step, the amounts of all the assets still having a
+        depreciation to compute are evaluated together using numpy arrays. Only the value changes and the
+        creation of the resulting values are handled asset by asset.
+
+        :param board_values:    A list of dictionaries as returned by '_get_depreciation_board_values'.
+        :return:                A tuple (depreciation_values, amount_change_values) where depreciation_values is the
+                                list of values to pass to '_prepare_move_for_asset_depreciation' and
+                                amount_change_values is a list of (move, asset_remaining_value,
+                                asset_depreciated_value) to apply on the value changes.
+        '''
+        depreciation_values = []
+        amount_change_values = []
+        if not board_values:
+            return depreciation_values, amount_change_values
+
+        ignore_prorata = self.env.context.get('ignore_prorata')
+        assets = [values['asset'] for values in board_values]
+        dates = [values['depreciation_date'] for values in board_values]
+        amount_changes = [list(values['amount_change_ids']) for values in board_values]
+        move_refs = [[] for dummy in assets]
+
+        depreciation_number = np.array([values['depreciation_number'] for values in board_values], dtype=int)
+        starting_sequence = np.array([values['starting_sequence'] for values in board_values], dtype=int)
+        amount_to_depreciate = np.array([values['amount_to_depreciate'] for values in board_values], dtype=float)
+        already_depreciated = np.array([values['already_depreciated_amount'] for values in board_values], dtype=float)
+        residual = amount_to_depreciate.copy()
+        roundings = np.array([asset.currency_id.rounding for asset in assets], dtype=float)
+        progress_factor = np.array([asset.method_progress_factor for asset in assets], dtype=float)
+        degressive = np.array([asset.method in ('degressive', 'degressive_then_linear') for asset in assets])
+        linear = np.array([asset.method in ('linear', 'degressive_then_linear') for asset in assets])
+        degressive_then_linear = degressive & linear
+        # The number of linear depreciations doesn't depend on the 'ignore_prorata' context key.
+        nb_depreciation = depreciation_number - starting_sequence - np.array([bool(a.prorata) for a in assets])
+        prorata = np.array([bool(asset.prorata) and not ignore_prorata for asset in assets])
+        prorata_factor = np.ones(len(assets))
+        for i in np.flatnonzero(prorata & (starting_sequence < 1) & (depreciation_number >= 1)):
+            prorata_factor[i] = assets[i]._get_prorata_factor(dates[i])
+        computed = amount_to_depreciate != 0.0
+
+        for asset_sequence in range(int(starting_sequence.min()) + 1, int(depreciation_number.max()) + 1):
+            active = computed & (asset_sequence > starting_sequence) & (asset_sequence <= depreciation_number)
+            if not active.any():
+                continue
+
+            for i in np.flatnonzero(active):
+                changes = amount_changes[i]
+                while changes and changes[0].date <= dates[i]:
+                    residual[i] -= changes[0].amount_total
+                    amount_to_depreciate[i] -= changes[0].amount_total
+                    already_depreciated[i] += changes[0].amount_total
+                    amount_change_values.append((
+                        changes.pop(0),
+                        float_round(residual[i], precision_rounding=roundings[i]),
+                        amount_to_depreciate[i] - residual[i] + already_depreciated[i],
+                    ))
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                linear_amount = np.minimum(amount_to_depreciate / nb_depreciation, residual)
+            degressive_amount = residual * progress_factor
+            amount = np.where(degressive, degressive_amount, 0.0)
+            amount = np.where(linear, linear_amount, amount)
+            amount = np.where(degressive_then_linear, np.maximum(linear_amount, degressive_amount), amount)
+            # last depreciation always takes the asset residual amount
+            amount = np.where(asset_sequence == depreciation_number, residual, amount)
+            if asset_sequence == 1:
+                amount = amount * prorata_factor
+            amount = self._round_amounts(amount, roundings)
+
+            emitted = active & ~(np.abs(amount) < roundings)
+            residual = np.where(emitted, residual - amount, residual)
+            remaining_value = self._round_amounts(residual, roundings)
+            depreciated_value = amount_to_depreciate - residual + already_depreciated
+
+            for i in np.flatnonzero(emitted):
+                asset = assets[i]
+                move_ref = asset.name + ' (%s/%s)' % (
+                    prorata[i] and asset_sequence - 1 or asset_sequence, asset.method_number)
+                if prorata[i] and asset_sequence == 1:
+                    move_ref = asset.name + ' ' + _('(prorata entry)')
+                depreciation_values.append({
+                    'amount': float(amount[i]),
+                    'asset_id': asset,
                     'move_ref': move_ref,
-                    'date': depreciation_date,
-                    'asset_remaining_value': float_round(residual_amount, precision_rounding=self.currency_id.rounding),
-                    'asset_depreciated_value': amount_to_depreciate - residual_amount + already_depreciated_amount,
-                }))
+                    'date': dates[i],
+                    'asset_remaining_value': float(remaining_value[i]),
+                    'asset_depreciated_value': float(depreciated_value[i]),
+                })
 
-                depreciation_date = depreciation_date + relativedelta(months=+int(self.method_period))
+                depreciation_date = dates[i] + relativedelta(months=+int(asset.method_period))
                 # datetime doesn't take into account that the number of days is not the same for each month
-                if int(self.method_period) % 12 != 0:
+                if int(asset.method_period) % 12 != 0:
                     max_day_in_month = calendar.monthrange(depreciation_date.year, depreciation_date.month)[1]
                     depreciation_date = depreciation_date.replace(day=max_day_in_month)
-        return move_vals
+                dates[i] = depreciation_date
+        return depreciation_values, amount_change_values
+
+    @api.model
+    def _write_amount_change_values(self, amount_change_values):
+        ''' Update the remaining and depreciated values of the value changes in a single query.
+        :param amount_change_values: A list of (move, asset_remaining_value, asset_depreciated_value).
+        '''
+        if not amount_change_values:
+            return
+        moves = self.env['account.move'].concat(*[move for move, dummy, dummy in amount_change_values])
+        moves.flush(['asset_remaining_value', 'asset_depreciated_value'])
+        self._cr.execute('''
+            UPDATE account_move move
+            SET asset_remaining_value = value.asset_remaining_value,
+                asset_depreciated_value = value.asset_depreciated_value
+            FROM UNNEST(%s::integer[], %s::numeric[], %s::numeric[])
+                AS value(id, asset_remaining_value, asset_depreciated_value)
+            WHERE move.id = value.id
+        ''', [
+            [move.id for move, dummy, dummy in amount_change_values],
+            [float(remaining) for dummy, remaining, dummy in amount_change_values],
+            [float(depreciated) for dummy, dummy, depreciated in amount_change_values],
+        ])
+        moves.invalidate_cache(['asset_remaining_value', 'asset_depreciated_value'])
 
     @api.model
     def _get_views(self, type):
@@ -613,10 +715,9 @@ class AccountAsset(models.Model):
             asset.message_post(body=asset_name[0], tracking_value_ids=tracking_value_ids)
             for move_id in asset.original_move_line_ids.mapped('move_id'):
                 move_id.message_post(body=msg)
-            if not asset.depreciation_move_ids:
-                asset.compute_depreciation_board()
-            asset._check_depreciations()
-            asset.depreciation_move_ids._post()
+        self.filtered(lambda asset: not asset.depreciation_move_ids).compute_depreciation_board()
+        self._check_depreciations()
+        self.depreciation_move_ids._post()
 
     def _return_disposal_view(self, move_ids):
         name = _('Disposal Move')
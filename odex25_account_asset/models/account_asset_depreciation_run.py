@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+from odoo import api, fields, models, _
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountAssetDepreciationRun(models.Model):
+    _name = 'account.asset.depreciation.run'
+    _description = 'Depreciation Posting Run'
+    _order = 'date desc, id desc'
+
+    name = fields.Char(compute='_compute_name', store=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, readonly=True,
+                                 states={'draft': [('readonly', False)]}, default=lambda self: self.env.company)
+    date = fields.Date(string='Closing Date', required=True, readonly=True, states={'draft': [('readonly', False)]},
+                       default=fields.Date.context_today,
+                       help='All the draft depreciation entries dated up to this date are posted.')
+    chunk_size = fields.Integer(string='Chunk Size', required=True, default=500,
+                                help='Number of depreciation entries posted and committed together.')
+    state = fields.Selection([('draft', 'Draft'), ('running', 'Running'), ('done', 'Done')], string='Status',
+                             required=True, readonly=True, copy=False, default='draft')
+    date_start = fields.Datetime(string='Started on', readonly=True, copy=False)
+    date_end = fields.Datetime(string='Ended on', readonly=True, copy=False)
+    chunk_count = fields.Integer(string='# Chunks', readonly=True, copy=False)
+    posted_count = fields.Integer(string='# Posted Entries', readonly=True, copy=False)
+    failed_count = fields.Integer(string='# Failed Entries', readonly=True, copy=False)
+    duration = fields.Float(string='Duration (s)', readonly=True, copy=False,
+                            help='Time spent posting the entries, summed over all the executions of the run.')
+    throughput = fields.Float(string='Entries per Second', compute='_compute_throughput')
+    failed_move_ids = fields.Many2many('account.move', string='Failed Entries', readonly=True, copy=False)
+    failure_log = fields.Text(string='Failures', readonly=True, copy=False)
+
+    @api.depends('date')
+    def _compute_name(self):
+        for run in self:
+            run.name = _('Depreciation Posting %s') % (run.date or '')
+
+    @api.depends('posted_count', 'duration')
+    def _compute_throughput(self):
+        for run in self:
+            run.throughput = run.duration and run.posted_count / run.duration or 0.0
+
+    def _lock_run(self):
+        ''' Lock the run so that a single process posts its entries at a time.
+        :return: True if the lock has been acquired, False if another transaction is processing the run.
+        '''
+        self.ensure_one()
+        self._cr.execute('SELECT id FROM account_asset_depreciation_run WHERE id = %s FOR UPDATE SKIP LOCKED',
+                         [self.id])
+        return bool(self._cr.fetchone())
+
+    def _get_due_moves(self, limit):
+        ''' Lock and retrieve the next draft depreciation entries to post, skipping the entries already locked by
+        another transaction and the ones that failed during a previous chunk.
+        :param limit:   The maximum number of entries to return.
+        :return:        An account.move recordset.
+        '''
+        self.ensure_one()
+        self.env['account.move'].flush(['asset_id', 'state', 'date', 'company_id'])
+        self.env['account.asset'].flush(['state'])
+        self._cr.execute('''
+            SELECT move.id
+            FROM account_move move
+            JOIN account_asset asset ON asset.id = move.asset_id
+            WHERE move.asset_id IS NOT NULL
+            AND move.state = 'draft'
+            AND move.company_id = %s
+            AND move.date <= %s
+            AND asset.state = 'open'
+            AND move.id != ALL(%s)
+            ORDER BY move.date, move.id
+            LIMIT %s
+            FOR UPDATE OF move SKIP LOCKED
+        ''', [self.company_id.id, self.date, self.failed_move_ids.ids, limit])
+        return self.env['account.move'].browse([row[0] for row in self._cr.fetchall()])
+
+    def _post_chunk(self, moves):
+        ''' Post a chunk of depreciation entries. If the chunk can't be posted as a whole, the entries are posted
+        one by one to isolate the failing ones.
+        :param moves:   The account.move to post.
+        :return:        A tuple (posted_moves, failures) where failures is a list of (move, error message).
+        '''
+        try:
+            with self.env.cr.savepoint():
+                moves._post(soft=False)
+            return moves, []
+        except Exception:
+            _logger.info('Depreciation posting run %s: a chunk failed, posting its entries one by one.', self.id)
+
+        posted_moves = self.env['account.move']
+        failures = []
+        for move in moves:
+            try:
+                with self.env.cr.savepoint():
+                    move._post(soft=False)
+                posted_moves |= move
+            except Exception as e:
+                failures.append((move, str(e)))
+        return posted_moves, failures
+
+    def _process(self, commit=True):
+        ''' Post the due depreciation entries of the run chunk by chunk.
+
+        The entries are selected again before each chunk so that an interrupted run can be resumed: the entries
+        already posted are no longer in draft and the failing ones are recorded on the run.
+
+        :param commit: Flag indicating a commit should be made after each chunk.
+        '''
+        self.ensure_one()
+        commit = commit and not self.pool.in_test_mode()
+        while self._lock_run():
+            start = time.time()
+            moves = self._get_due_moves(max(self.chunk_size, 1))
+            if not moves:
+                self.write({'state': 'done', 'date_end': fields.Datetime.now()})
+                break
+
+            posted_moves, failures = self._post_chunk(moves)
+            # Entries left in draft without error would be selected again forever.
+            not_posted_moves = posted_moves.filtered(lambda m: m.state != 'posted')
+            posted_moves -= not_posted_moves
+            failures += [(move, _('The entry has not been posted.')) for move in not_posted_moves]
+            vals = {
+                'chunk_count': self.chunk_count + 1,
+                'posted_count': self.posted_count + len(posted_moves),
+                'duration': self.duration + time.time() - start,
+            }
+            if failures:
+                vals.update({
+                    'failed_count': self.failed_count + len(failures),
+                    'failed_move_ids': [(4, move.id) for move, dummy in failures],
+                    'failure_log': '\n'.join(
+                        [self.failure_log or ''] + ['%s: %s' % (move.display_name, msg) for move, msg in failures]
+                    ).strip(),
+                })
+            self.write(vals)
+            _logger.info('Depreciation posting run %s: %s entries posted, %s failed (%.1f entries/s).',
+                         self.id, self.posted_count, self.failed_count, self.throughput)
+            if commit:
+                self.env.cr.commit()
+
+    def action_run(self):
+        for run in self.filtered(lambda r: r.state != 'done'):
+            vals = {'state': 'running'}
+            if not run.date_start:
+                vals['date_start'] = fields.Datetime.now()
+            run.write(vals)
+            run._process()
+
+    def action_open_failed_moves(self):
+        self.ensure_one()
+        return {
+            'name': _('Failed Entries'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', self.failed_move_ids.ids)],
+        }
+
+    @api.model
+    def _cron_resume_runs(self):
+        ''' Resume the runs that have been interrupted. '''
+        for run in self.search([('state', '=', 'running')]):
+            run._process()
@@ -43,6 +43,15 @@ class AccountMove(models.Model):
                                       help="The type of the journal, used to determine the type of the move. "
                                            "This is used to determine the type of the move, e.g. 'sale', 'purchase', 'general', etc.")
 
+    def init(self):
+        super().init()
+        # Used to select the depreciation entries to post at the closing of a period.
+        self._cr.execute('''
+            CREATE INDEX IF NOT EXISTS account_move_asset_draft_date_idx
+            ON account_move (company_id, date)
+            WHERE asset_id IS NOT NULL AND state = 'draft'
+        ''')
+
     @api.onchange('amount_total')
     def _onchange_amount(self):
         self.asset_manually_modified = True
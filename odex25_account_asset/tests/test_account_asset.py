@@ -222,6 +222,67 @@ class TestAccountAsset(TestAccountReportsCommon):
         self.update_form_values(asset_form)
         asset_form.save()
 
+    def test_asset_compute_depreciation_board_multi(self):
+        """Test that the boards of several assets are computed at once"""
+        assets = self.env['account.asset'].create([{
+            'account_asset_id': self.company_data['default_account_expense'].id,
+            'account_depreciation_id': self.company_data['default_account_assets'].id,
+            'account_depreciation_expense_id': self.company_data['default_account_expense'].id,
+            'journal_id': self.company_data['default_journal_misc'].id,
+            'asset_type': 'purchase',
+            'name': name,
+            'acquisition_date': fields.Date.today() + relativedelta(years=1, month=1, day=1),
+            'original_value': 10000,
+            'method_number': 5,
+            'method_period': '12',
+            'method': method,
+            'method_progress_factor': 0.3,
+        } for name, method in (('linear asset', 'linear'), ('degressive asset', 'degressive'))])
+        assets.compute_depreciation_board()
+
+        linear_asset, degressive_asset = assets
+        self.assertEqual(linear_asset.depreciation_move_ids.sorted('date').mapped('amount_total'),
+                         [2000.0, 2000.0, 2000.0, 2000.0, 2000.0])
+        self.assertEqual(degressive_asset.depreciation_move_ids.sorted('date').mapped('amount_total'),
+                         [3000.0, 2100.0, 1470.0, 1029.0, 2401.0])
+        self.assertEqual(degressive_asset.depreciation_move_ids.sorted('date').mapped('asset_remaining_value'),
+                         [7000.0, 4900.0, 3430.0, 2401.0, 0.0])
+
+        # Computing the boards again replaces the draft entries
+        assets.compute_depreciation_board()
+        self.assertEqual(len(assets.depreciation_move_ids), 10)
+
+    def test_asset_depreciation_run(self):
+        """Test the posting of the due depreciation entries by chunks"""
+        assets = self.env['account.asset'].create([{
+            'account_asset_id': self.company_data['default_account_expense'].id,
+            'account_depreciation_id': self.company_data['default_account_assets'].id,
+            'account_depreciation_expense_id': self.company_data['default_account_expense'].id,
+            'journal_id': self.company_data['default_journal_misc'].id,
+            'asset_type': 'purchase',
+            'name': 'asset %s' % i,
+            'acquisition_date': fields.Date.today() + relativedelta(years=1, month=1, day=1),
+            'original_value': 10000,
+            'method_number': 5,
+            'method_period': '12',
+            'method': 'linear',
+        } for i in range(3)])
+        assets.validate()
+        closing_date = fields.Date.today() + relativedelta(years=3, month=12, day=31)
+        due_moves = assets.depreciation_move_ids.filtered(lambda m: m.date <= closing_date)
+        self.assertEqual(len(due_moves), 9)
+        self.assertEqual(set(due_moves.mapped('state')), {'draft'})
+
+        run = self.env['account.asset.depreciation.run'].create({'date': closing_date, 'chunk_size': 4})
+        run.action_run()
+
+        self.assertEqual(run.state, 'done')
+        self.assertEqual(run.chunk_count, 3)
+        self.assertEqual(run.posted_count, 9)
+        self.assertEqual(run.failed_count, 0)
+        self.assertEqual(set(due_moves.mapped('state')), {'posted'})
+        self.assertEqual(set((assets.depreciation_move_ids - due_moves).mapped('state')), {'draft'})
+
     def test_asset_from_move_line_form(self):
         """Test that the asset is correcly created from a move line"""
 
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from . import account_move
+from . import account_transfer_change
 from . import transfer_model
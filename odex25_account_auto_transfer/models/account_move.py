@@ -7,3 +7,29 @@ class AccountMove(models.Model):
     _inherit = 'account.move'
 
     transfer_model_id = fields.Many2one('account.transfer.model', string="Originating Model")
+
+    def _post(self, soft=True):
+        posted = super(AccountMove, self)._post(soft)
+        self.env['account.transfer.change']._log_move_lines(posted.line_ids)
+        return posted
+
+    def button_draft(self):
+        self.env['account.transfer.change']._log_move_lines(self.filtered(lambda m: m.state == 'posted').line_ids)
+        return super(AccountMove, self).button_draft()
+
+
+class AccountMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    # Fields of the posted journal items the automatic transfers depend on.
+    _transfer_change_fields = {'account_id', 'date', 'analytic_account_id', 'partner_id', 'debit', 'credit', 'balance'}
+
+    def write(self, vals):
+        if not self._transfer_change_fields.intersection(vals):
+            return super(AccountMoveLine, self).write(vals)
+        posted_lines = self.filtered(lambda l: l.parent_state == 'posted')
+        # Log both the old and the new (account, date) of the journal items.
+        self.env['account.transfer.change']._log_move_lines(posted_lines)
+        res = super(AccountMoveLine, self).write(vals)
+        self.env['account.transfer.change']._log_move_lines(posted_lines)
+        return res
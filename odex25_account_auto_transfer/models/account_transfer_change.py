@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, fields, models
+
+
+class AccountTransferChange(models.Model):
+    """ Log of the changes of the posted journal items on the origin accounts of the incremental transfer models.
+
+    A row is added for each (transfer model, account, date) of the journal items being posted, reset to draft or
+    modified once posted. Each incremental transfer model consumes its own rows when it is computed and only recomputes
+    the periods containing their dates (see account.transfer.model._get_incremental_periods).
+    """
+    _name = 'account.transfer.change'
+    _description = 'Automatic Transfer Change'
+    _log_access = False
+    _order = 'id'
+
+    transfer_model_id = fields.Many2one('account.transfer.model', required=True, readonly=True, index=True,
+                                        ondelete='cascade')
+    account_id = fields.Many2one('account.account', required=True, readonly=True, ondelete='cascade')
+    date = fields.Date(required=True, readonly=True)
+
+    @api.model
+    def _log_move_lines(self, move_lines):
+        """ Log the changes of some journal items. Only the ones on an origin account of a running incremental transfer
+        model are kept: a disabled model recomputes all its periods once activated again.
+        :param move_lines: An account.move.line recordset.
+        """
+        move_line_ids = [line_id for line_id in move_lines.ids if line_id]
+        if not move_line_ids:
+            return
+        self.env['account.move.line'].flush(['account_id', 'date'])
+        self.env['account.transfer.model'].flush(['account_ids', 'incremental', 'state'])
+        self._cr.execute('''
+            INSERT INTO account_transfer_change (transfer_model_id, account_id, date)
+            SELECT DISTINCT transfer_model.id, line.account_id, line.date
+            FROM account_move_line line
+            JOIN account_model_rel rel ON rel.account_account_id = line.account_id
+            JOIN account_transfer_model transfer_model ON transfer_model.id = rel.account_transfer_model_id
+            WHERE line.id IN %s
+            AND transfer_model.incremental
+            AND transfer_model.state = 'in_progress'
+        ''', [tuple(move_line_ids)])
+
+    @api.model
+    def _consume_changed_dates(self, transfer_model):
+        """ Remove the changes logged for a transfer model and return their dates.
+
+        Only the changes visible to the current transaction are removed: the ones logged by transactions not committed
+        yet are kept for the next computation, as the journal items they refer to are not visible either.
+        :param transfer_model:  An account.transfer.model record.
+        :return:                A list of dates.
+        """
+        self._cr.execute('''
+            DELETE FROM account_transfer_change
+            WHERE transfer_model_id = %s
+            RETURNING date
+        ''', [transfer_model.id])
+        return list({row[0] for row in self._cr.fetchall()})
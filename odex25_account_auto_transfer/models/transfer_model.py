@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 from dateutil.relativedelta import relativedelta
@@ -9,6 +11,8 @@ from odoo.exceptions import ValidationError
 from odoo.osv import expression
 from odoo.tools.float_utils import float_compare, float_is_zero
 
+_logger = logging.getLogger(__name__)
+
 
 class TransferModel(models.Model):
     _name = "account.transfer.model"
@@ -32,6 +36,26 @@ class TransferModel(models.Model):
     move_ids_count = fields.Integer(compute="_compute_move_ids_count")
     total_percent = fields.Float(compute="_compute_total_percent", string="Total Percent", readonly=True)
     state = fields.Selection([('disabled', 'Disabled'), ('in_progress', 'Running')], default='disabled', required=True)
+    incremental = fields.Boolean(string="Incremental",
+                                 help="Only recompute the periods containing journal entries posted, reset to draft or "
+                                      "modified since the last computation.")
+    incremental_ready = fields.Boolean(string="Incremental Computation Ready", readonly=True, copy=False,
+                                       help="Technical field set once all the periods have been computed. Until then, "
+                                            "the incremental computation recomputes all the periods.")
+
+    # Fields whose modification requires all the periods to be recomputed.
+    _full_recompute_fields = {
+        'journal_id', 'date_start', 'date_stop', 'frequency', 'account_ids', 'line_ids', 'state', 'incremental',
+    }
+
+    def write(self, vals):
+        if self._full_recompute_fields.intersection(vals) and 'incremental_ready' not in vals:
+            vals = dict(vals, incremental_ready=False)
+        return super(TransferModel, self).write(vals)
+
+    def _reset_incremental_ready(self):
+        """ Make the next incremental computation recompute all the periods. """
+        self.filtered('incremental_ready').sudo().write({'incremental_ready': False})
 
     def copy(self, default=None):
         default = default or {}
@@ -108,7 +132,33 @@ class TransferModel(models.Model):
     @api.model
     def action_cron_auto_transfer(self):
         """ Perform the automatic transfer for the all active move models. """
-        self.search([('state', '=', 'in_progress')]).action_perform_auto_transfer()
+        transfer_models = self.search([('state', '=', 'in_progress')])
+        workers = int(self.env['ir.config_parameter'].sudo().get_param('odex25_account_auto_transfer.cron_workers', 1))
+        if workers > 1 and len(transfer_models) > 1 and not self.pool.in_test_mode():
+            transfer_models._perform_auto_transfer_in_workers(workers)
+        else:
+            transfer_models.action_perform_auto_transfer()
+
+    def _perform_auto_transfer_in_workers(self, workers):
+        """ Perform the automatic transfer of the models in parallel threads. Each model is processed with its own
+        cursor, committed once the model is done, so that a failing model doesn't prevent the others to be processed.
+        :param workers: The number of threads to use.
+        """
+        self.flush()
+        uid = self.env.uid
+        context = self.env.context
+
+        def perform_auto_transfer(transfer_model_id):
+            with api.Environment.manage(), self.pool.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                try:
+                    env['account.transfer.model'].browse(transfer_model_id).action_perform_auto_transfer()
+                except Exception:
+                    cr.rollback()
+                    _logger.exception('Automatic transfer of the model %s failed.', transfer_model_id)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(perform_auto_transfer, self.ids))
 
     def action_perform_auto_transfer(self):
         """ Perform the automatic transfer for the current recordset of models  """
@@ -122,18 +172,48 @@ class TransferModel(models.Model):
 
                 # (Re)Generate moves in draft untill today
                 # Journal entries will be recomputed everyday untill posted.
+                periods = []
                 while next_move_date <= max_date:
-                    record._create_or_update_move_for_period(start_date, next_move_date)
+                    periods.append((start_date, next_move_date))
                     start_date = next_move_date
                     next_move_date = record._get_next_move_date(start_date)
 
                 # (Re)Generate move for one more period if needed
                 if not record.date_stop:
-                    record._create_or_update_move_for_period(start_date, next_move_date)
+                    periods.append((start_date, next_move_date))
                 elif today < record.date_stop:
-                    record._create_or_update_move_for_period(start_date, min(next_move_date, record.date_stop))
+                    periods.append((start_date, min(next_move_date, record.date_stop)))
+
+                if record.incremental:
+                    periods = record._get_incremental_periods(periods)
+                for period_start_date, period_end_date in periods:
+                    record._create_or_update_move_for_period(period_start_date, period_end_date)
         return False
 
+    def _get_incremental_periods(self, periods):
+        """
+        Filter the periods to recompute incrementally: the ones not generated yet and the ones containing changes of
+        the origin accounts logged since the last computation. The logged changes are consumed.
+        :param periods: a list of (start_date, end_date) tuples
+        :return: the periods to recompute, as a list of (start_date, end_date) tuples
+        :rtype: list
+        """
+        self.ensure_one()
+        changed_dates = self.env['account.transfer.change']._consume_changed_dates(self)
+        if not self.incremental_ready:
+            # Nothing has been computed since the model changed: recompute all the periods.
+            self.incremental_ready = True
+            return periods
+
+        generated_dates = set(self.env['account.move'].search([
+            ('transfer_model_id', '=', self.id),
+            ('state', '=', 'draft'),
+        ]).mapped('date'))
+        return [
+            (start_date, end_date) for start_date, end_date in periods
+            if end_date not in generated_dates or any(start_date <= d < end_date for d in changed_dates)
+        ]
+
     def _get_move_lines_base_domain(self, start_date, end_date):
         """
         Determine the domain to get all account move lines posted in a given period, for an account in origin accounts
@@ -340,6 +420,24 @@ class TransferModelLine(models.Model):
             'Only one account occurrence by transfer model')
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(TransferModelLine, self).create(vals_list)
+        lines.transfer_model_id._reset_incremental_ready()
+        return lines
+
+    def write(self, vals):
+        transfer_models = self.transfer_model_id
+        res = super(TransferModelLine, self).write(vals)
+        (transfer_models | self.transfer_model_id)._reset_incremental_ready()
+        return res
+
+    def unlink(self):
+        transfer_models = self.transfer_model_id
+        res = super(TransferModelLine, self).unlink()
+        transfer_models._reset_incremental_ready()
+        return res
+
     @api.onchange('analytic_account_ids', 'partner_ids')
     def set_percent_if_analytic_account_ids(self):
         """
@@ -359,13 +457,19 @@ class TransferModelLine(models.Model):
         :rtype: list
         """
         transfer_values = []
-        # Avoid to transfer two times the same entry
-        already_handled_move_line_ids = []
+        # Avoid to transfer two times the same entry: the entries matching the filters of the previous lines are
+        # excluded, instead of collecting their ids.
+        already_handled_domains = []
         for transfer_model_line in self:
-            domain = transfer_model_line._get_move_lines_domain(start_date, end_date, already_handled_move_line_ids)
-            total_balances_by_account = self.env['account.move.line'].read_group(domain, ['ids:array_agg(id)', 'balance', 'account_id'], ['account_id'])
+            domain = transfer_model_line._get_move_lines_domain(start_date, end_date)
+            domain = expression.AND([domain] + already_handled_domains)
+            filter_domain = transfer_model_line._get_move_lines_filter_domain()
+            if filter_domain:
+                already_handled_domains.append(['!'] + expression.normalize_domain(filter_domain))
+            else:
+                already_handled_domains.append([expression.FALSE_LEAF])
+            total_balances_by_account = self.env['account.move.line'].read_group(domain, ['balance', 'account_id'], ['account_id'])
             for total_balance_account in total_balances_by_account:
-                already_handled_move_line_ids += total_balance_account['ids']
                 balance = total_balance_account['balance']
                 if not float_is_zero(balance, precision_digits=9):
                     amount = abs(balance)
@@ -390,11 +494,21 @@ class TransferModelLine(models.Model):
         move_lines_domain = self.transfer_model_id._get_move_lines_base_domain(start_date, end_date)
         if avoid_move_line_ids:
             move_lines_domain.append(('id', 'not in', avoid_move_line_ids))
+        return move_lines_domain + self._get_move_lines_filter_domain()
+
+    def _get_move_lines_filter_domain(self):
+        """
+        Determine the domain matching the account move lines filtered by self move model line.
+        :return: the computed domain, empty if the line has no filter
+        :rtype: list
+        """
+        self.ensure_one()
+        filter_domain = []
         if self.analytic_account_ids:
-            move_lines_domain.append(('analytic_account_id', 'in', self.analytic_account_ids.ids))
+            filter_domain.append(('analytic_account_id', 'in', self.analytic_account_ids.ids))
         if self.partner_ids:
-            move_lines_domain.append(('partner_id', 'in', self.partner_ids.ids))
-        return move_lines_domain
+            filter_domain.append(('partner_id', 'in', self.partner_ids.ids))
+        return filter_domain
 
     def _get_transfer_values(self, account, amount, is_debit, write_date):
         """
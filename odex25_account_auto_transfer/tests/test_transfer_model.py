@@ -5,6 +5,7 @@ from functools import reduce
 from itertools import chain
 
 from dateutil.relativedelta import relativedelta
+from odoo.addons.odex25_account_auto_transfer.models.transfer_model import TransferModel
 from odoo.addons.odex25_account_auto_transfer.tests.odex25_account_auto_transfer_test_classes import AccountAutoTransferTestCase
 
 from odoo import fields
@@ -85,6 +86,32 @@ class TransferModelTestFunctionalCase(AccountAutoTransferTestCase):
         self.assertEqual(sum(self.env['account.move.line'].search([('account_id', '=', self.destination_accounts[2].id)]).mapped('balance')), 800)
         self.assertEqual(sum(self.env['account.move.line'].search([('account_id', '=', self.destination_accounts[3].id)]).mapped('balance')), 800)
 
+    def test_incremental(self):
+        self.functional_transfer.write({'incremental': True, 'state': 'in_progress'})
+        self.functional_transfer.action_perform_auto_transfer()
+        neutral_account = self.env['account.account'].search([('code', '=', 'NEUT')])
+        create_or_update_move_for_period = TransferModel._create_or_update_move_for_period
+        with patch.object(TransferModel, '_create_or_update_move_for_period', autospec=True,
+                          side_effect=create_or_update_move_for_period) as patched:
+            # Nothing changed since the last computation
+            self.functional_transfer.action_perform_auto_transfer()
+            patched.assert_not_called()
+
+            # Only the period of the new entry is recomputed
+            self._create_basic_move(
+                deb_account=self.origin_accounts[0].id,
+                cred_account=neutral_account.id,
+                amount=1000,
+                date_str='2019-02-15',
+            )
+            self.functional_transfer.action_perform_auto_transfer()
+            patched.assert_called_once()
+            self.assertEqual(patched.call_args[0][1:], (fields.Date.to_date('2019-02-01'), fields.Date.to_date('2019-03-01')))
+
+        # 20% of the new entry has been transfered in each destination account
+        for account in self.destination_accounts:
+            self.assertEqual(sum(self.env['account.move.line'].search([('account_id', '=', account.id)]).mapped('balance')), 3400)
+
 
 # ############################################################################ #
 #                                UNIT TESTS                                    #
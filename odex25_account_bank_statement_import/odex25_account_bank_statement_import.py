@@ -218,6 +218,22 @@ class AccountBankStatementImport(models.TransientModel):
         return currency, journal
 
     def _complete_stmts_vals(self, stmts_vals, journal, account_number):
+        sanitized_account_number = sanitize_account_number(account_number)
+        unique_import_prefix = (sanitized_account_number and sanitized_account_number + '-' or '') + str(journal.id) + '-'
+
+        # Find the partner and his bank account of all the transactions at once. The partner selected during the
+        # reconciliation process will be linked to the bank when the statement is closed.
+        identifying_strings = {
+            line_vals['account_number']
+            for st_vals in stmts_vals
+            for line_vals in st_vals['transactions']
+            if not line_vals.get('partner_bank_id') and line_vals.get('account_number')
+        }
+        partner_bank_per_acc_number = {}
+        if identifying_strings:
+            for partner_bank in self.env['res.partner.bank'].search([('acc_number', 'in', list(identifying_strings))]):
+                partner_bank_per_acc_number.setdefault(partner_bank.acc_number, partner_bank)
+
         for st_vals in stmts_vals:
             st_vals['journal_id'] = journal.id
             if not st_vals.get('reference'):
@@ -225,28 +241,40 @@ class AccountBankStatementImport(models.TransientModel):
             for line_vals in st_vals['transactions']:
                 unique_import_id = line_vals.get('unique_import_id')
                 if unique_import_id:
-                    sanitized_account_number = sanitize_account_number(account_number)
-                    line_vals['unique_import_id'] = (sanitized_account_number and sanitized_account_number + '-' or '') + str(journal.id) + '-' + unique_import_id
+                    line_vals['unique_import_id'] = unique_import_prefix + unique_import_id
 
                 if not line_vals.get('partner_bank_id'):
-                    # Find the partner and his bank account or create the bank account. The partner selected during the
-                    # reconciliation process will be linked to the bank when the statement is closed.
-                    identifying_string = line_vals.get('account_number')
-                    if identifying_string:
-                        partner_bank = self.env['res.partner.bank'].search([('acc_number', '=', identifying_string)], limit=1)
-                        if partner_bank:
-                            line_vals['partner_bank_id'] = partner_bank.id
-                            line_vals['partner_id'] = partner_bank.partner_id.id
+                    partner_bank = partner_bank_per_acc_number.get(line_vals.get('account_number'))
+                    if partner_bank:
+                        line_vals['partner_bank_id'] = partner_bank.id
+                        line_vals['partner_id'] = partner_bank.partner_id.id
         return stmts_vals
 
+    def _get_imported_unique_import_ids(self, unique_import_ids):
+        """ Return the subset of the given unique import ids already used by a bank statement line. """
+        if not unique_import_ids:
+            return set()
+        self.env['account.bank.statement.line'].flush(['unique_import_id'])
+        self.env.cr.execute(
+            "SELECT unique_import_id FROM account_bank_statement_line WHERE unique_import_id = ANY(%s)",
+            [list(unique_import_ids)],
+        )
+        return {row[0] for row in self.env.cr.fetchall()}
+
     def _create_bank_statements(self, stmts_vals):
         """ Create new bank statements from imported values, filtering out already imported transactions, and returns data used by the reconciliation widget """
         BankStatement = self.env['account.bank.statement']
         BankStatementLine = self.env['account.bank.statement.line']
 
-        # Filter out already imported transactions and create statements
-        statement_ids = []
-        statement_line_ids = []
+        # Filter out already imported transactions
+        imported_unique_import_ids = self._get_imported_unique_import_ids({
+            line_vals['unique_import_id']
+            for st_vals in stmts_vals
+            for line_vals in st_vals['transactions']
+            if line_vals.get('unique_import_id')
+        })
+        statement_vals_list = []
+        numbers = []
         ignored_statement_lines_import_ids = []
         for st_vals in stmts_vals:
             filtered_st_lines = []
@@ -254,8 +282,11 @@ class AccountBankStatementImport(models.TransientModel):
                 if (line_vals['amount'] != 0
                    and ('unique_import_id' not in line_vals
                    or not line_vals['unique_import_id']
-                   or not bool(BankStatementLine.sudo().search([('unique_import_id', '=', line_vals['unique_import_id'])], limit=1)))):
+                   or line_vals['unique_import_id'] not in imported_unique_import_ids)):
                     filtered_st_lines.append(line_vals)
+                    if line_vals.get('unique_import_id'):
+                        # The same transaction may appear in several statements of the file.
+                        imported_unique_import_ids.add(line_vals['unique_import_id'])
                 else:
                     ignored_statement_lines_import_ids.append(line_vals['unique_import_id'])
                     if 'balance_start' in st_vals:
@@ -264,20 +295,25 @@ class AccountBankStatementImport(models.TransientModel):
             if len(filtered_st_lines) > 0:
                 # Remove values that won't be used to create records
                 st_vals.pop('transactions', None)
-                number = st_vals.pop('number', None)
-                # Create the statement
+                numbers.append(st_vals.pop('number', None))
                 st_vals['line_ids'] = [[0, False, line] for line in filtered_st_lines]
-                statement = BankStatement.create(st_vals)
-                statement_ids.append(statement.id)
-                if number and number.isdecimal():
-                    statement._set_next_sequence()
-                    format, format_values = statement._get_sequence_format_param(statement.name)
-                    format_values['seq'] = int(number)
-                    #build the full name like BNK/2016/00135 by just giving the number '135'
-                    statement.name = format.format(**format_values)
-                if statement.balance_end == statement.balance_end_real:
-                    statement.button_post()
-                statement_line_ids.extend(statement.line_ids.ids)
+                statement_vals_list.append(st_vals)
+
+        # Create the statements
+        statement_ids = []
+        statement_line_ids = []
+        statements = BankStatement.create(statement_vals_list) if statement_vals_list else BankStatement
+        for statement, number in zip(statements, numbers):
+            statement_ids.append(statement.id)
+            if number and number.isdecimal():
+                statement._set_next_sequence()
+                format, format_values = statement._get_sequence_format_param(statement.name)
+                format_values['seq'] = int(number)
+                #build the full name like BNK/2016/00135 by just giving the number '135'
+                statement.name = format.format(**format_values)
+            if statement.balance_end == statement.balance_end_real:
+                statement.button_post()
+            statement_line_ids.extend(statement.line_ids.ids)
         if len(statement_line_ids) == 0:
             raise UserError(_('You already have imported that file.'))
 
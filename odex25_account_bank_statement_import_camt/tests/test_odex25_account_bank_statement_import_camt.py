@@ -187,3 +187,33 @@ class TestAccountBankStatementImportCamt(AccountTestInvoicingCommon):
             "Please set the IBAN account on your bank journal.\n\n"
             "This CAMT file is targeting several IBAN accounts but none match the current journal."
         ))
+
+    def test_overlapping_statements_camt_file_import(self):
+        # The transaction of the first statement is repeated in the second one: it must only be imported once.
+        bank_journal = self.env['account.journal'].create({
+            'name': "Bank 112233",
+            'code': 'BNK68',
+            'type': 'bank',
+            'bank_acc_number': '112233',
+            'currency_id': self.env.ref('base.USD').id,
+        })
+
+        camt_file_path = get_module_resource(
+            'odex25_account_bank_statement_import_camt',
+            'test_camt_file',
+            'camt_053_overlapping.xml',
+        )
+        camt_file = base64.b64encode(open(camt_file_path, 'rb').read())
+
+        self.env['account.bank.statement.import']\
+            .with_context(journal_id=bank_journal.id)\
+            .create({'attachment_ids': [(0, 0, {'name': 'test file', 'datas': camt_file})]})\
+            .import_file()
+
+        imported_statements = self.env['account.bank.statement'].search([('company_id', '=', self.env.company.id)]).sorted('name')
+        self.assertRecordValues(imported_statements, [
+            {'name': '2514988305.2019-02-13', 'balance_start': 1000.00, 'balance_end_real': 1500.00},
+            {'name': '2514988305.2019-02-14', 'balance_start': 1500.00, 'balance_end_real': 1800.00},
+        ])
+        self.assertRecordValues(imported_statements[0].line_ids, [{'amount': 500.00}])
+        self.assertRecordValues(imported_statements[1].line_ids, [{'amount': 300.00}])
@@ -5,7 +5,6 @@ import io
 import logging
 import math
 import re
-from functools import partial
 
 from lxml import etree
 
@@ -485,88 +484,144 @@ codes = {
 }
 
 
-def _generic_get(*nodes, xpath, namespaces, placeholder=None):
-    if placeholder is not None:
-        xpath = xpath.format(placeholder=placeholder)
+# XPath expressions used to read the statements, compiled once per file by '_get_xpaths'. The expressions
+# containing a {placeholder} are compiled for each counter party ('Dbtr' and 'Cdtr').
+_xpath_expressions = {
+    # Statement
+    'statement_name': 'ns:Id/text()',
+    'statement_clbd_date': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:Dt/ns:Dt/text()",
+    'statement_clav_date': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:Dt/ns:Dt/text()",
+    'statement_currency': 'ns:Acct/ns:Ccy/text() | ns:Bal/ns:Amt/@Ccy',
+    'statement_start_amount': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='OPBD' or ns:Cd='PRCD' or ns:Cd='ITBD' or ns:Cd='OPAV']/../../ns:Amt/text()",
+    'statement_start_sign': 'ns:Bal/ns:CdtDbtInd/text()',
+    'statement_clbd_amount': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:Amt/text()",
+    'statement_clav_amount': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:Amt/text()",
+    'statement_clbd_sign': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:CdtDbtInd/text()",
+    'statement_clav_sign': "ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:CdtDbtInd/text()",
+    'statement_account_number': 'ns:Acct/ns:Id/ns:IBAN/text() | ns:Acct/ns:Id/ns:Othr/ns:Id/text()',
+    # Entry
+    'transaction_details': './/ns:TxDtls',
+    'bank_transaction_code': 'ns:BkTxCd',
+    'amount': 'ns:Amt/text() | ns:AmtDtls/ns:TxAmt/ns:Amt/text()',
+    'rate': 'ns:XchgRate/text() | ns:AmtDtls/ns:TxAmt/ns:CcyXchg/ns:XchgRate/text()',
+    'credit_debit_indicator': 'ns:CdtDbtInd/text()',
+    'transaction_date': ('ns:ValDt/ns:Dt/text()'
+                         '| ns:BookgDt/ns:Dt/text()'
+                         '| ns:BookgDt/ns:DtTm/text()'),
+    'partner_name': './/ns:RltdPties/ns:{placeholder}/ns:Nm/text()',
+    'account_number': ('.//ns:RltdPties/ns:{placeholder}Acct/ns:Id/ns:IBAN/text()'
+                       '| (.//ns:{placeholder}Acct/ns:Id/ns:Othr/ns:Id)[1]/text()'),
+    'main_ref': './/ns:RmtInf/ns:Strd/ns:{placeholder}RefInf/ns:Ref/text()',
+    'other_ref': ('ns:AcctSvcrRef/text()'
+                  '| ns:Refs/ns:TxId/text()'
+                  '| ns:Refs/ns:InstrId/text()'
+                  '| ns:Refs/ns:EndToEndId/text()'
+                  '| ns:Refs/ns:MndtId/text()'
+                  '| ns:Refs/ns:ChqNb/text()'),
+    'additional_entry_info': 'ns:AddtlNtryInf/text()',
+    'instructed_amount': 'ns:AmtDtls/ns:InstdAmt/ns:Amt/text()',
+    'instructed_amount_currency': 'ns:AmtDtls/ns:InstdAmt/ns:Amt/@Ccy',
+    'entry_instructed_amount': 'ns:NtryDtls/ns:TxDtls/ns:AmtDtls/ns:InstdAmt/ns:Amt/text()',
+    'entry_instructed_amount_currency': 'ns:NtryDtls/ns:TxDtls/ns:AmtDtls/ns:InstdAmt/ns:Amt/@Ccy',
+    'transaction_name_unstructured': './/ns:RmtInf/ns:Ustrd/text()',
+    'transaction_name_structured': './/ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref/text()',
+    'account_servicer_ref': 'ns:AcctSvcrRef/text()',
+    'entry_ref': 'ns:NtryRef/text()',
+    'domain_code': 'ns:Domn/ns:Cd/text()',
+    'family_code': 'ns:Domn/ns:Fmly/ns:Cd/text()',
+    'subfamily_code': 'ns:Domn/ns:Fmly/ns:SubFmlyCd/text()',
+    'street_name': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:StrtNm/text()',
+    'building_number': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:BldgNb/text()',
+    'post_code': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:PstCd/text()',
+    'town_name': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:TwnNm/text()',
+    'country': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:Ctry/text()',
+    'address_line': 'ns:RltdPties/ns:{placeholder}/ns:PstlAdr/ns:AdrLine/text()',
+}
+
+def _get_xpaths(namespaces):
+    """ Compile the XPath expressions of '_xpath_expressions'.
+
+    :param namespaces:  The namespaces of the document.
+    :return:            A dictionary of etree.XPath indexed by name, or by (name, counter party) for the expressions
+                        depending on the counter party.
+    """
+    xpaths = {}
+    for name, expression in _xpath_expressions.items():
+        if '{placeholder}' in expression:
+            for placeholder in ('Dbtr', 'Cdtr'):
+                xpaths[name, placeholder] = etree.XPath(expression.format(placeholder=placeholder), namespaces=namespaces)
+        else:
+            xpaths[name] = etree.XPath(expression, namespaces=namespaces)
+    return xpaths
+
+def _generic_get(*nodes, xpath):
     for node in nodes:
-        item = node.xpath(xpath, namespaces=namespaces)
+        item = xpath(node)
         if item:
             return item[0]
     return False
 
-_get_amount = partial(_generic_get,
-    xpath='ns:Amt/text() | ns:AmtDtls/ns:TxAmt/ns:Amt/text()')
+def _xpath_getter(name):
+    def getter(*nodes, xpaths, placeholder=None):
+        return _generic_get(*nodes, xpath=xpaths[name] if placeholder is None else xpaths[name, placeholder])
+    return getter
+
+_get_amount = _xpath_getter('amount')
 
-_get_rate = partial(_generic_get,
-    xpath='ns:XchgRate/text() | ns:AmtDtls/ns:TxAmt/ns:CcyXchg/ns:XchgRate/text()')
+_get_rate = _xpath_getter('rate')
 
-_get_credit_debit_indicator = partial(_generic_get,
-    xpath='ns:CdtDbtInd/text()')
+_get_credit_debit_indicator = _xpath_getter('credit_debit_indicator')
 
-_get_transaction_date = partial(_generic_get,
-    xpath=('ns:ValDt/ns:Dt/text()'
-           '| ns:BookgDt/ns:Dt/text()'
-           '| ns:BookgDt/ns:DtTm/text()'))
+_get_transaction_date = _xpath_getter('transaction_date')
 
-_get_partner_name = partial(_generic_get,
-    xpath='.//ns:RltdPties/ns:{placeholder}/ns:Nm/text()')
+_get_partner_name = _xpath_getter('partner_name')
 
-_get_account_number = partial(_generic_get,
-    xpath=('.//ns:RltdPties/ns:{placeholder}Acct/ns:Id/ns:IBAN/text()'
-           '| (.//ns:{placeholder}Acct/ns:Id/ns:Othr/ns:Id)[1]/text()'))
+_get_account_number = _xpath_getter('account_number')
 
-_get_main_ref = partial(_generic_get,
-    xpath='.//ns:RmtInf/ns:Strd/ns:{placeholder}RefInf/ns:Ref/text()')
+_get_main_ref = _xpath_getter('main_ref')
 
-_get_other_ref = partial(_generic_get,
-    xpath=('ns:AcctSvcrRef/text()'
-           '| {placeholder}ns:Refs/ns:TxId/text()'
-           '| {placeholder}ns:Refs/ns:InstrId/text()'
-           '| {placeholder}ns:Refs/ns:EndToEndId/text()'
-           '| {placeholder}ns:Refs/ns:MndtId/text()'
-           '| {placeholder}ns:Refs/ns:ChqNb/text()'))
+_get_other_ref = _xpath_getter('other_ref')
 
-_get_additional_entry_info = partial(_generic_get,
-    xpath='ns:AddtlNtryInf/text()')
+_get_additional_entry_info = _xpath_getter('additional_entry_info')
 
-def _get_signed_amount(*nodes, namespaces):
-    amount = float(_get_amount(*nodes, namespaces=namespaces))
-    rate = float(_get_rate(*nodes, namespaces=namespaces)) or 1.0
-    sign = _get_credit_debit_indicator(*nodes, namespaces=namespaces)
+def _get_signed_amount(*nodes, xpaths):
+    amount = float(_get_amount(*nodes, xpaths=xpaths))
+    rate = float(_get_rate(*nodes, xpaths=xpaths)) or 1.0
+    sign = _get_credit_debit_indicator(*nodes, xpaths=xpaths)
     return amount * rate if sign == 'CRDT' else -amount * rate
 
-def _get_counter_party(*nodes, namespaces):
-    ind = _get_credit_debit_indicator(*nodes, namespaces=namespaces)
+def _get_counter_party(*nodes, xpaths):
+    ind = _get_credit_debit_indicator(*nodes, xpaths=xpaths)
     return 'Dbtr' if ind == 'CRDT' else 'Cdtr'
 
-def _set_amount_currency_and_currency_id(node, path, entry_vals, currency, curr_cache, has_multi_currency, namespaces):
-    instruc_amount = node.xpath('%s/text()' % path, namespaces=namespaces)
-    instruc_curr = node.xpath('%s/@Ccy' % path, namespaces=namespaces)
+def _set_amount_currency_and_currency_id(node, path, entry_vals, currency, curr_cache, has_multi_currency, xpaths):
+    instruc_amount = xpaths[path](node)
+    instruc_curr = xpaths[path + '_currency'](node)
     if (has_multi_currency and instruc_amount and instruc_curr and
             instruc_curr[0] != currency and instruc_curr[0] in curr_cache):
         entry_vals['amount_currency'] = math.copysign(abs(sum(map(float, instruc_amount))), entry_vals['amount'])
         entry_vals['currency_id'] = curr_cache[instruc_curr[0]]
 
-def _get_transaction_name(node, namespaces):
-    xpaths = ('.//ns:RmtInf/ns:Ustrd/text()',
-              './/ns:RmtInf/ns:Strd/ns:CdtrRefInf/ns:Ref/text()',
-               'ns:AddtlNtryInf/text()')
-    for xpath in xpaths:
-        transaction_name = node.xpath(xpath, namespaces=namespaces)
+def _get_transaction_name(node, xpaths):
+    names = ('transaction_name_unstructured',
+             'transaction_name_structured',
+             'additional_entry_info')
+    for name in names:
+        transaction_name = xpaths[name](node)
         if transaction_name:
             return ' '.join(transaction_name)
     return '/'
 
-def _get_ref(node, counter_party, prefix, namespaces):
-    ref = _get_main_ref(node, placeholder=counter_party, namespaces=namespaces)
+def _get_ref(node, counter_party, xpaths):
+    ref = _get_main_ref(node, placeholder=counter_party, xpaths=xpaths)
     if ref is False:  # Explicitely match False, not a falsy value
-        ref = _get_other_ref(node, placeholder=prefix, namespaces=namespaces)
+        ref = _get_other_ref(node, xpaths=xpaths)
     return ref
 
-def _get_unique_import_id(entry, sequence, name, date, unique_import_set, namespaces):
-    unique_import_ref = entry.xpath('ns:AcctSvcrRef/text()', namespaces=namespaces)
+def _get_unique_import_id(entry, sequence, name, date, unique_import_set, xpaths):
+    unique_import_ref = xpaths['account_servicer_ref'](entry)
     if unique_import_ref and not _is_full_of_zeros(unique_import_ref[0]) and unique_import_ref[0] != 'NOTPROVIDED':
-        entry_ref = entry.xpath('ns:NtryRef/text()', namespaces=namespaces)
+        entry_ref = xpaths['entry_ref'](entry)
         if entry_ref:
             return '{}-{}'.format(unique_import_ref[0], entry_ref[0])
         elif not entry_ref and unique_import_ref[0] not in unique_import_set:
@@ -576,10 +631,10 @@ def _get_unique_import_id(entry, sequence, name, date, unique_import_set, namesp
     else:
         return '{}-{}-{}'.format(name, date, sequence)
 
-def _get_transaction_type(node, namespaces):
-    code = node.xpath('ns:Domn/ns:Cd/text()', namespaces=namespaces)
-    family = node.xpath('ns:Domn/ns:Fmly/ns:Cd/text()', namespaces=namespaces)
-    subfamily = node.xpath('ns:Domn/ns:Fmly/ns:SubFmlyCd/text()', namespaces=namespaces)
+def _get_transaction_type(node, xpaths):
+    code = xpaths['domain_code'](node)
+    family = xpaths['family_code'](node)
+    subfamily = xpaths['subfamily_code'](node)
     if code:
         return {'transaction_type': "{code}: {family} ({subfamily})".format(
             code=codes[code[0]],
@@ -588,13 +643,13 @@ def _get_transaction_type(node, namespaces):
         )}
     return {}
 
-def _get_partner_address(node, ns, ph):
-    StrtNm = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:StrtNm/text()'.format(ph), namespaces=ns)
-    BldgNb = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:BldgNb/text()'.format(ph), namespaces=ns)
-    PstCd = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:PstCd/text()'.format(ph), namespaces=ns)
-    TwnNm = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:TwnNm/text()'.format(ph), namespaces=ns)
-    Ctry = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:Ctry/text()'.format(ph), namespaces=ns)
-    AdrLine = node.xpath('ns:RltdPties/ns:{}/ns:PstlAdr/ns:AdrLine/text()'.format(ph), namespaces=ns)
+def _get_partner_address(node, xpaths, ph):
+    StrtNm = xpaths['street_name', ph](node)
+    BldgNb = xpaths['building_number', ph](node)
+    PstCd = xpaths['post_code', ph](node)
+    TwnNm = xpaths['town_name', ph](node)
+    Ctry = xpaths['country', ph](node)
+    AdrLine = xpaths['address_line', ph](node)
     address = "\n".join(AdrLine)
     if StrtNm:
         address = "\n".join([address, ", ".join(StrtNm + BldgNb)])
@@ -604,6 +659,58 @@ def _get_partner_address(node, ns, ph):
         address = "\n".join([address, Ctry[0]])
     return address
 
+def _get_statement_vals(statement, xpaths):
+    """ Read the header of a statement, i.e. everything but its entries.
+
+    :param statement:   The Stmt node. Only its children preceding the entries have to be parsed.
+    :param xpaths:      The compiled XPath expressions, see '_get_xpaths'.
+    :return:            A tuple (statement_vals, currency, account_no).
+    """
+    statement_vals = {}
+    statement_vals['name'] = xpaths['statement_name'](statement)[0]
+    statement_vals['date'] = (xpaths['statement_clbd_date'](statement) or xpaths['statement_clav_date'](statement))[0]
+
+    # Currency 0..1
+    currency = xpaths['statement_currency'](statement)[0]
+
+    # Start Balance
+    # any (OPBD, PRCD, ITBD):
+    #   OPBD : Opening Balance
+    #   PRCD : Previous Closing Balance
+    #   ITBD : Interim Balance (in the case of preceeding pagination)
+    start_amount = float(xpaths['statement_start_amount'](statement)[0])
+    # Credit Or Debit Indicator 1..1
+    sign = xpaths['statement_start_sign'](statement)[0]
+    if sign == 'DBIT':
+        start_amount *= -1
+    statement_vals['balance_start'] = start_amount
+    # Ending Balance
+    # Statement Date
+    # 'CLBD', otherwise 'CLAV'
+    #   CLBD : Closing Balance
+    #   CLAV : Closing Available
+    end_amount = float((xpaths['statement_clbd_amount'](statement) or xpaths['statement_clav_amount'](statement))[0])
+    sign = (xpaths['statement_clbd_sign'](statement) or xpaths['statement_clav_sign'](statement))[0]
+    if sign == 'DBIT':
+        end_amount *= -1
+    statement_vals['balance_end_real'] = end_amount
+
+    # Account Number    1..1
+    # if not IBAN value then... <Othr><Id> would have.
+    account_no = xpaths['statement_account_number'](statement)[0]
+
+    # Transaction Entries 0..n
+    statement_vals['transactions'] = []
+    return statement_vals, currency, account_no
+
+def _free_previous_siblings(node):
+    """ Free a node already processed by the streaming parser, as well as its previous siblings having the same tag. """
+    node.clear()
+    previous = node.getprevious()
+    while previous is not None and previous.tag == node.tag:
+        node.getparent().remove(previous)
+        previous = node.getprevious()
+
 def _is_full_of_zeros(strg):
     pattern_zero = re.compile('^0+$')
     return bool(pattern_zero.match(strg))
@@ -612,22 +719,28 @@ class AccountBankStatementImport(models.TransientModel):
     _inherit = 'account.bank.statement.import'
 
     def _check_camt(self, data_file):
+        """ Return the namespaces of the file if it is a CAMT.053 file, None otherwise. Only the root node is parsed. """
         try:
-            root = etree.parse(io.BytesIO(data_file)).getroot()
+            dummy, root = next(etree.iterparse(io.BytesIO(data_file), events=('start',)))
         except:
             return None
         if root.tag.find('camt.053') != -1:
-            return root
+            return {k or 'ns': v for k, v in root.nsmap.items()}
         return None
 
     def _parse_file(self, data_file):
-        root = self._check_camt(data_file)
-        if root is not None:
-            return self._parse_file_camt(root)
+        ns = self._check_camt(data_file)
+        if ns is not None:
+            return self._parse_file_camt(data_file, ns)
         return super(AccountBankStatementImport, self)._parse_file(data_file)
 
-    def _parse_file_camt(self, root):
-        ns = {k or 'ns': v for k, v in root.nsmap.items()}
+    def _parse_file_camt(self, data_file, ns):
+        """ Parse a CAMT.053 file. The file is streamed: each entry is freed once read so the memory used by the XML
+        tree does not grow with the number of transactions.
+        """
+        xpaths = _get_xpaths(ns)
+        statement_tag = '{%s}Stmt' % ns['ns']
+        entry_tag = '{%s}Ntry' % ns['ns']
 
         curr_cache = {c['name']: c['id'] for c in self.env['res.currency'].search_read([], ['id', 'name'])}
         statements_per_iban = {}
@@ -635,35 +748,45 @@ class AccountBankStatementImport(models.TransientModel):
         unique_import_set = set([])
         currency = account_no = False
         has_multi_currency = self.env.user.user_has_groups('base.group_multi_currency')
-        for statement in root[0].findall('ns:Stmt', ns):
-            statement_vals = {}
-            statement_vals['name'] = statement.xpath('ns:Id/text()', namespaces=ns)[0]
-            statement_vals['date'] = (statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:Dt/ns:Dt/text()", namespaces=ns) or statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:Dt/ns:Dt/text()", namespaces=ns))[0]
-
-            # Transaction Entries 0..n
-            transactions = []
-            sequence = 0
-
-            # Currency 0..1
-            currency = statement.xpath('ns:Acct/ns:Ccy/text() | ns:Bal/ns:Amt/@Ccy', namespaces=ns)[0]
+        statement_vals = None
+        sequence = 0
+        try:
+            for dummy, node in etree.iterparse(io.BytesIO(data_file), events=('end',), tag=(statement_tag, entry_tag)):
+                if node.tag == statement_tag:
+                    if statement_vals is None:
+                        statement_vals, currency, account_no = _get_statement_vals(node, xpaths)
+
+                    # Save statements and currency
+                    statements_per_iban.setdefault(account_no, []).append(statement_vals)
+                    currency_per_iban[account_no] = currency
+
+                    statement_vals = None
+                    sequence = 0
+                    _free_previous_siblings(node)
+                    continue
+
+                entry = node
+                if statement_vals is None:
+                    # The header of the statement precedes its entries.
+                    statement_vals, currency, account_no = _get_statement_vals(entry.getparent(), xpaths)
+                transactions = statement_vals['transactions']
 
-            for entry in statement.findall('ns:Ntry', ns):
                 # Date 0..1
-                date = _get_transaction_date(entry, namespaces=ns) or statement_vals['date']
+                date = _get_transaction_date(entry, xpaths=xpaths) or statement_vals['date']
 
-                transaction_details = entry.xpath('.//ns:TxDtls', namespaces=ns)
+                transaction_details = xpaths['transaction_details'](entry)
                 for entry_details in transaction_details or [entry]:
                     sequence += 1
-                    counter_party = _get_counter_party(entry_details, entry, namespaces=ns)
-                    partner_name = _get_partner_name(entry_details, placeholder=counter_party, namespaces=ns)
+                    counter_party = _get_counter_party(entry_details, entry, xpaths=xpaths)
+                    partner_name = _get_partner_name(entry_details, placeholder=counter_party, xpaths=xpaths)
                     entry_vals = {
                         'sequence': sequence,
                         'date': date,
-                        'amount': _get_signed_amount(entry_details, entry, namespaces=ns),
-                        'payment_ref': _get_transaction_name(entry_details, namespaces=ns),
+                        'amount': _get_signed_amount(entry_details, entry, xpaths=xpaths),
+                        'payment_ref': _get_transaction_name(entry_details, xpaths=xpaths),
                         'partner_name': partner_name,
-                        'account_number': _get_account_number(entry_details, placeholder=counter_party, namespaces=ns),
-                        'ref': _get_ref(entry_details, counter_party=counter_party, prefix='', namespaces=ns),
+                        'account_number': _get_account_number(entry_details, placeholder=counter_party, xpaths=xpaths),
+                        'ref': _get_ref(entry_details, counter_party=counter_party, xpaths=xpaths),
                     }
 
                     entry_vals['unique_import_id'] = _get_unique_import_id(
@@ -672,21 +795,21 @@ class AccountBankStatementImport(models.TransientModel):
                         name=statement_vals['name'],
                         date=entry_vals['date'],
                         unique_import_set=unique_import_set,
-                        namespaces=ns)
+                        xpaths=xpaths)
 
                     _set_amount_currency_and_currency_id(
                         node=entry_details,
-                        path=transaction_details and 'ns:AmtDtls/ns:InstdAmt/ns:Amt' or 'ns:NtryDtls/ns:TxDtls/ns:AmtDtls/ns:InstdAmt/ns:Amt',
+                        path=transaction_details and 'instructed_amount' or 'entry_instructed_amount',
                         entry_vals=entry_vals,
                         currency=currency,
                         curr_cache=curr_cache,
                         has_multi_currency=has_multi_currency,
-                        namespaces=ns)
+                        xpaths=xpaths)
 
-                    BkTxCd = entry.xpath('ns:BkTxCd', namespaces=ns)[0]
-                    entry_vals.update(_get_transaction_type(BkTxCd, namespaces=ns))
-                    notes = [_get_additional_entry_info(entry, namespaces=ns) or ""]
-                    partner_address = _get_partner_address(entry_details, ns, counter_party)
+                    BkTxCd = xpaths['bank_transaction_code'](entry)[0]
+                    entry_vals.update(_get_transaction_type(BkTxCd, xpaths=xpaths))
+                    notes = [_get_additional_entry_info(entry, xpaths=xpaths) or ""]
+                    partner_address = _get_partner_address(entry_details, xpaths, counter_party)
                     if partner_name:
                         notes.append(_('Counter Party: %(partner)s', partner=partner_name))
                     if partner_address:
@@ -696,38 +819,9 @@ class AccountBankStatementImport(models.TransientModel):
                     unique_import_set.add(entry_vals['unique_import_id'])
                     transactions.append(entry_vals)
 
-            statement_vals['transactions'] = transactions
-
-            # Start Balance
-            # any (OPBD, PRCD, ITBD):
-            #   OPBD : Opening Balance
-            #   PRCD : Previous Closing Balance
-            #   ITBD : Interim Balance (in the case of preceeding pagination)
-            start_amount = float(statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='OPBD' or ns:Cd='PRCD' or ns:Cd='ITBD' or ns:Cd='OPAV']/../../ns:Amt/text()",
-                                                              namespaces=ns)[0])
-            # Credit Or Debit Indicator 1..1
-            sign = statement.xpath('ns:Bal/ns:CdtDbtInd/text()', namespaces=ns)[0]
-            if sign == 'DBIT':
-                start_amount *= -1
-            statement_vals['balance_start'] = start_amount
-            # Ending Balance
-            # Statement Date
-            # 'CLBD', otherwise 'CLAV'
-            #   CLBD : Closing Balance
-            #   CLAV : Closing Available
-            end_amount = float((statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:Amt/text()", namespaces=ns) or statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:Amt/text()", namespaces=ns))[0])
-            sign = (statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLBD']/../../ns:CdtDbtInd/text()", namespaces=ns) or statement.xpath("ns:Bal/ns:Tp/ns:CdOrPrtry[ns:Cd='CLAV']/../../ns:CdtDbtInd/text()", namespaces=ns))[0]
-            if sign == 'DBIT':
-                end_amount *= -1
-            statement_vals['balance_end_real'] = end_amount
-
-            # Account Number    1..1
-            # if not IBAN value then... <Othr><Id> would have.
-            account_no = statement.xpath('ns:Acct/ns:Id/ns:IBAN/text() | ns:Acct/ns:Id/ns:Othr/ns:Id/text()', namespaces=ns)[0]
-
-            # Save statements and currency
-            statements_per_iban.setdefault(account_no, []).append(statement_vals)
-            currency_per_iban[account_no] = currency
+                _free_previous_siblings(entry)
+        except etree.XMLSyntaxError as e:
+            raise UserError(_("The CAMT file could not be parsed: %s", e))
 
         # If statements target multiple journals, returns thoses targeting the current journal
         if len(statements_per_iban) > 1:
@@ -1,9 +1,10 @@
 # -*- coding: utf-8 -*-
 
 
+from collections import defaultdict
 from datetime import timedelta
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
 
 
@@ -43,7 +44,9 @@ class AccountBudgetPost(models.Model):
         for budget in self:
             if self.env['crossovered.budget.lines'].search_count([('general_budget_id', '=', budget.id)]):
                 raise ValidationError(_('You cannot delete a budget that is used in a budget line.'))
-        return super(AccountBudgetPost, self).unlink()
+        res = super(AccountBudgetPost, self).unlink()
+        self.clear_caches()
+        return res
     @api.constrains('account_ids')
     def check_account_only_exist_in_one_budget(self):
         for budget in self.search([]):
@@ -55,12 +58,42 @@ class AccountBudgetPost(models.Model):
     @api.model
     def create(self, vals):
         self._check_account_ids(vals)
-        return super(AccountBudgetPost, self).create(vals)
+        res = super(AccountBudgetPost, self).create(vals)
+        self.clear_caches()
+        return res
 
     def write(self, vals):
         self._check_account_ids(vals)
         # self.check_account()
-        return super(AccountBudgetPost, self).write(vals)
+        res = super(AccountBudgetPost, self).write(vals)
+        if 'account_ids' in vals:
+            self.clear_caches()
+        return res
+
+    @tools.ormcache()
+    def _get_account_budget_post_map(self):
+        """ Index the budgetary positions by account. The cache is cleared each time a budgetary position is created,
+        deleted or its accounts are changed.
+        :return: A dictionary mapping the id of each account to the tuple of ids of the budgetary positions using it.
+        """
+        self.flush(['account_ids'])
+        self._cr.execute('''
+            SELECT account_id, ARRAY_AGG(budget_id ORDER BY budget_id)
+            FROM account_budget_rel
+            GROUP BY account_id
+        ''')
+        return {account_id: tuple(budget_ids) for account_id, budget_ids in self._cr.fetchall()}
+
+    @api.model
+    def _get_budget_posts(self, accounts):
+        """ Retrieve the budgetary positions using some accounts.
+        :param accounts:    An account.account recordset.
+        :return:            An account.budget.post recordset.
+        """
+        post_map = self._get_account_budget_post_map()
+        post_ids = {post_id for account in accounts for post_id in post_map.get(account.id, ())}
+        # Search to apply the access rules of the current user, as it was done when looking up all the positions.
+        return self.search([('id', 'in', list(post_ids))]) if post_ids else self.browse()
 
 
 class CrossoveredBudget(models.Model):
@@ -155,7 +188,15 @@ class CrossoveredBudgetLines(models.Model):
 
         # Populate result with fields_list values
         if fields & fields_list:
-            for group_line in result:
+            # Compute the fields of the budget lines of all the groups at once.
+            lines_by_group = [self.search(group_line.get('__domain') or domain) for group_line in result]
+            all_lines = self.browse({line_id for lines in lines_by_group for line_id in lines.ids})
+            if 'practical_amount' in fields or 'percentage' in fields:
+                all_lines.mapped('practical_amount')
+            if 'theoritical_amount' in fields or 'percentage' in fields:
+                all_lines.mapped('theoritical_amount')
+
+            for group_line, all_budget_lines_that_compose_group in zip(result, lines_by_group):
 
                 # initialise fields to compute to 0 if they are requested
                 if 'practical_amount' in fields:
@@ -167,9 +208,6 @@ class CrossoveredBudgetLines(models.Model):
                     group_line['practical_amount'] = 0
                     group_line['theoritical_amount'] = 0
 
-                domain = group_line.get('__domain') or domain
-                all_budget_lines_that_compose_group = self.search(domain)
-
                 for budget_line_of_group in all_budget_lines_that_compose_group:
                     if 'practical_amount' in fields or 'percentage' in fields:
                         group_line['practical_amount'] += budget_line_of_group.practical_amount
@@ -203,40 +241,149 @@ class CrossoveredBudgetLines(models.Model):
                 computed_name += ' - ' + record.analytic_account_id.name
             record.name = computed_name
 
+    @api.model
+    def _get_done_budget_lines(self, keys, date):
+        """ Resolve at once the lines of the done budgets matching several (analytic account, account) pairs.
+
+        A budget line matches a pair when it has the same analytic account, its budgetary position contains the account
+        and its period contains the date.
+
+        :param keys:    An iterable of (analytic_account_id, account_id) tuples.
+        :param date:    The date the period of the budget lines must contain.
+        :return:        A dictionary mapping each key to a crossovered.budget.lines recordset.
+        """
+        keys = set(keys)
+        post_map = self.env['account.budget.post']._get_account_budget_post_map()
+        post_ids = {post_id for dummy, account_id in keys for post_id in post_map.get(account_id, ())}
+        analytic_account_ids = {analytic_account_id for analytic_account_id, dummy in keys if analytic_account_id}
+        lines_by_post = defaultdict(list)
+        if post_ids and analytic_account_ids and date:
+            budget_lines = self.search([
+                ('analytic_account_id', 'in', list(analytic_account_ids)),
+                ('general_budget_id', 'in', list(post_ids)),
+                ('crossovered_budget_state', '=', 'done'),
+                ('date_from', '<=', date),
+                ('date_to', '>=', date),
+            ])
+            for line in budget_lines:
+                lines_by_post[line.analytic_account_id.id, line.general_budget_id.id].append(line.id)
+        return {
+            (analytic_account_id, account_id): self.browse(sorted(
+                line_id
+                for post_id in post_map.get(account_id, ())
+                for line_id in lines_by_post[analytic_account_id, post_id]
+            ))
+            for analytic_account_id, account_id in keys
+        }
+
+    def _get_practical_amount_dates(self):
+        """ Return the (date_from, date_to) period on which the practical amount of the line is computed. """
+        self.ensure_one()
+        return self.date_from, self.date_to
+
+    @api.model
+    def _get_practical_amount_move_line_domain(self):
+        """ Return the domain of the journal items summed into the practical amount of the lines having no
+        analytic account. """
+        return [('move_id.state', '=', 'posted')]
+
+    @api.model
+    def _get_practical_amounts(self, model, base_domain, amount_select, join_clause, keys):
+        """ Sum the amounts of the analytic or journal items for several budget lines in a single query.
+
+        :param model:           The account.analytic.line or account.move.line model.
+        :param base_domain:     A domain matching all the items to sum (ir.rules are applied on top of it).
+        :param amount_select:   The SQL expression of the amount to sum.
+        :param join_clause:     The SQL joins matching the items with the 'budget_key' (idx, analytic_account_id,
+                                date_from, date_to, all_accounts) and 'budget_account' (idx, account_id) tables.
+        :param keys:            A list of (analytic_account_id, account_ids, date_from, date_to) tuples.
+        :return:                A dictionary mapping the index of each key to its amount.
+        """
+        key_params = [[], [], [], [], []]
+        account_params = [[], []]
+        for idx, (analytic_account_id, account_ids, date_from, date_to) in enumerate(keys):
+            for values, value in zip(key_params, (idx, analytic_account_id or None, date_from, date_to, not account_ids)):
+                values.append(value)
+            account_params[0] += [idx] * len(account_ids)
+            account_params[1] += list(account_ids)
+
+        where_query = model._where_calc(base_domain)
+        model._apply_ir_rules(where_query, 'read')
+        from_clause, where_clause, where_clause_params = where_query.get_sql()
+        self.env.cr.execute('''
+            WITH budget_key AS (
+                SELECT * FROM UNNEST(%s::integer[], %s::integer[], %s::date[], %s::date[], %s::boolean[])
+                    AS budget_key(idx, analytic_account_id, date_from, date_to, all_accounts)
+            ),
+            budget_account AS (
+                SELECT * FROM UNNEST(%s::integer[], %s::integer[]) AS budget_account(idx, account_id)
+            )
+            SELECT budget_key.idx, ''' + amount_select + '''
+            FROM ''' + from_clause + '''
+            ''' + join_clause + '''
+            WHERE ''' + (where_clause or 'TRUE') + '''
+            GROUP BY budget_key.idx
+        ''', key_params + account_params + where_clause_params)
+        return dict(self.env.cr.fetchall())
+
     def _compute_practical_amount(self):
+        # Budget lines sharing the same analytic account, accounts and period share the same amount: gather them
+        # by source and compute each source with a single query.
+        analytic_keys = defaultdict(list)
+        move_keys = defaultdict(list)
         for line in self:
-            acc_ids = line.general_budget_id.account_ids.ids
-            date_to = line.date_to
-            date_from = line.date_from
-            if line.analytic_account_id.id:
-                analytic_line_obj = self.env['account.analytic.line']
-                domain = [('account_id', '=', line.analytic_account_id.id),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to),
-                          ]
-                if acc_ids:
-                    domain += [('general_account_id', 'in', acc_ids)]
-
-                where_query = analytic_line_obj._where_calc(domain)
-                analytic_line_obj._apply_ir_rules(where_query, 'read')
-                from_clause, where_clause, where_clause_params = where_query.get_sql()
-                select = "SELECT SUM(amount) from " + from_clause + " where " + where_clause
-
-            else:
-                aml_obj = self.env['account.move.line']
-                domain = [('account_id', 'in',
-                           line.general_budget_id.account_ids.ids),
-                          ('date', '>=', date_from),
-                          ('date', '<=', date_to),
-                          ('move_id.state', '=', 'posted')
-                          ]
-                where_query = aml_obj._where_calc(domain)
-                aml_obj._apply_ir_rules(where_query, 'read')
-                from_clause, where_clause, where_clause_params = where_query.get_sql()
-                select = "SELECT sum(credit)-sum(debit) from " + from_clause + " where " + where_clause
-
-            self.env.cr.execute(select, where_clause_params)
-            line.practical_amount = self.env.cr.fetchone()[0] or 0.0
+            date_from, date_to = line._get_practical_amount_dates()
+            date_from, date_to = fields.Date.to_date(date_from), fields.Date.to_date(date_to)
+            line.practical_amount = 0.0
+            if not date_from or not date_to:
+                continue
+            key = (line.analytic_account_id.id, tuple(sorted(line.general_budget_id.account_ids.ids)), date_from, date_to)
+            if line.analytic_account_id:
+                analytic_keys[key].append(line)
+            elif key[1]:
+                move_keys[key].append(line)
+
+        if analytic_keys:
+            analytic_keys_list = list(analytic_keys)
+            amounts = self._get_practical_amounts(
+                self.env['account.analytic.line'],
+                [('account_id', 'in', list({key[0] for key in analytic_keys_list}))],
+                'SUM(account_analytic_line.amount)',
+                '''
+                    JOIN budget_key ON budget_key.analytic_account_id = account_analytic_line.account_id
+                    AND account_analytic_line.date BETWEEN budget_key.date_from AND budget_key.date_to
+                    AND (
+                        budget_key.all_accounts
+                        OR EXISTS(
+                            SELECT 1 FROM budget_account
+                            WHERE budget_account.idx = budget_key.idx
+                            AND budget_account.account_id = account_analytic_line.general_account_id
+                        )
+                    )
+                ''',
+                analytic_keys_list,
+            )
+            for idx, key in enumerate(analytic_keys_list):
+                for line in analytic_keys[key]:
+                    line.practical_amount = amounts.get(idx) or 0.0
+
+        if move_keys:
+            move_keys_list = list(move_keys)
+            amounts = self._get_practical_amounts(
+                self.env['account.move.line'],
+                [('account_id', 'in', list({account_id for key in move_keys_list for account_id in key[1]}))]
+                + self._get_practical_amount_move_line_domain(),
+                'SUM(account_move_line.credit) - SUM(account_move_line.debit)',
+                '''
+                    JOIN budget_account ON budget_account.account_id = account_move_line.account_id
+                    JOIN budget_key ON budget_key.idx = budget_account.idx
+                    AND account_move_line.date BETWEEN budget_key.date_from AND budget_key.date_to
+                ''',
+                move_keys_list,
+            )
+            for idx, key in enumerate(move_keys_list):
+                for line in move_keys[key]:
+                    line.practical_amount = amounts.get(idx) or 0.0
 
     @api.depends('date_from', 'date_to')
     def _compute_theoritical_amount(self):
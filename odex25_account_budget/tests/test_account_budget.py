@@ -2,6 +2,7 @@
 
 
 from .common import TestAccountBudgetCommon
+from odoo import fields
 from odoo.tests import tagged
 
 
@@ -59,3 +60,73 @@ class TestAccountBudget(TestAccountBudgetCommon):
 
         # I check that budget is in "done" state
         self.assertRecordValues(budget, [{'state': 'done'}])
+
+    def test_practical_amount_multi_lines(self):
+        budget_year, budget_september = self.env['crossovered.budget'].create([{
+            'date_from': date_from,
+            'date_to': date_to,
+            'name': name,
+        } for name, date_from, date_to in (('Budget 2019', '2019-01-01', '2019-12-31'), ('Budget 09/2019', '2019-09-01', '2019-09-30'))])
+        budget_lines = self.env['crossovered.budget.lines'].create([{
+            'crossovered_budget_id': budget.id,
+            'analytic_account_id': analytic_account.id,
+            'general_budget_id': self.account_budget_post_sales0.id,
+            'planned_amount': 1000.0,
+        } for budget, analytic_account in (
+            (budget_year, self.analytic_account_partner_a_1),
+            (budget_september, self.analytic_account_partner_a_1),
+            (budget_year, self.analytic_account_partner_a_2),
+            (budget_year, self.env['account.analytic.account']),
+        )])
+
+        for date, state in (('2019-09-15', 'posted'), ('2019-10-15', 'posted'), ('2019-11-15', 'draft')):
+            move = self.env['account.move'].create({
+                'date': date,
+                'line_ids': [
+                    (0, 0, {
+                        'account_id': self.company_data['default_account_revenue'].id,
+                        'analytic_account_id': self.analytic_account_partner_a_1.id,
+                        'credit': 100.0,
+                    }),
+                    (0, 0, {
+                        'account_id': self.company_data['default_account_receivable'].id,
+                        'debit': 100.0,
+                    }),
+                ],
+            })
+            if state == 'posted':
+                move.action_post()
+
+        # The practical amounts of all the lines are computed together.
+        budget_lines.invalidate_cache(['practical_amount'])
+        self.assertEqual(budget_lines.mapped('practical_amount'), [200.0, 100.0, 0.0, 200.0])
+
+    def test_budget_post_account_index(self):
+        account = self.company_data['default_account_assets']
+        budget_post = self.account_budget_post_purchase0
+        self.assertEqual(budget_post._get_budget_posts(self.company_data['default_account_expense']), budget_post)
+        self.assertFalse(budget_post._get_budget_posts(account))
+
+        # The index is refreshed when the accounts of a budgetary position change.
+        budget_post.write({'account_ids': [(4, account.id)]})
+        self.assertEqual(budget_post._get_budget_posts(account), budget_post)
+
+        budget = self.env['crossovered.budget'].create({
+            'date_from': '2019-01-01',
+            'date_to': '2019-12-31',
+            'name': 'Budget 2019',
+            'state': 'done',
+        })
+        budget_line = self.env['crossovered.budget.lines'].create({
+            'crossovered_budget_id': budget.id,
+            'analytic_account_id': self.analytic_account_partner_a_1.id,
+            'general_budget_id': budget_post.id,
+            'planned_amount': 1000.0,
+        })
+        analytic_account_id = self.analytic_account_partner_a_1.id
+        keys = [(analytic_account_id, account.id), (analytic_account_id, self.company_data['default_account_revenue'].id)]
+        budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(keys, fields.Date.from_string('2019-06-01'))
+        self.assertEqual(budget_lines_by_key[keys[0]], budget_line)
+        self.assertFalse(budget_lines_by_key[keys[1]])
+        budget_lines_by_key = self.env['crossovered.budget.lines']._get_done_budget_lines(keys, fields.Date.from_string('2020-06-01'))
+        self.assertFalse(budget_lines_by_key[keys[0]])
@@ -113,7 +113,45 @@ class ConsolidationJournal(models.Model):
             record.line_ids.with_context(allow_unlink=True).unlink()
             origin = record.company_period_id or record.composition_id
             journal_line_values = origin.get_journal_lines_values()
-            record.write({'line_ids': [(0, 0, value) for value in journal_line_values]})
+            record._create_lines(journal_line_values)
+
+    def _create_lines(self, journal_lines_values):
+        """
+        Create the lines of this journal. The audit move lines given as (6, 0, ids) commands are linked to the created
+        lines with a single bulk insert instead of being written line by line by the ORM.
+        :param journal_lines_values: a list of dict containing values for journal lines creation, as returned by
+        get_journal_lines_values
+        :return: the created journal lines
+        """
+        self.ensure_one()
+        vals_list = []
+        audit_move_line_ids = []
+        for values in journal_lines_values:
+            values = dict(values, journal_id=self.id)
+            commands = values.get('move_line_ids') or []
+            if all(command[0] == 6 for command in commands):
+                values.pop('move_line_ids', None)
+                audit_move_line_ids.append([move_line_id for command in commands for move_line_id in command[2]])
+            else:
+                audit_move_line_ids.append([])
+            vals_list.append(values)
+        lines = self.env['consolidation.journal.line'].create(vals_list)
+
+        line_ids = []
+        move_line_ids = []
+        for line, line_move_line_ids in zip(lines, audit_move_line_ids):
+            line_ids += [line.id] * len(line_move_line_ids)
+            move_line_ids += line_move_line_ids
+        if line_ids:
+            field = lines._fields['move_line_ids']
+            self.env.cr.execute('''
+                INSERT INTO {relation} ({line}, {move_line})
+                SELECT * FROM UNNEST(%s::integer[], %s::integer[])
+                ON CONFLICT DO NOTHING
+            '''.format(relation=field.relation, line=field.column1, move_line=field.column2), [line_ids, move_line_ids])
+            lines.invalidate_cache(['move_line_ids'])
+            self.env['account.move.line'].invalidate_cache(['consolidation_journal_line_ids'], move_line_ids)
+        return lines
 
 
 class ConsolidationJournalLine(models.Model):
@@ -452,14 +452,14 @@ class ConsolidationPeriodComposition(models.Model):
         # update composed analysis period journals (recursive)
         self.composed_period_id.action_generate_journals()
         journal_lines_values = self.get_journal_lines_values()
-        self.env['consolidation.journal'].create({
+        journal = self.env['consolidation.journal'].create({
             'name': self.composed_period_id.chart_name,
             'auto_generated': True,
             'composition_id': self.id,
             'period_id': self.using_period_id.id,
             'chart_id': self.using_period_id.chart_id.id,
-            'line_ids': [(0, 0, value) for value in journal_lines_values]
         })
+        journal._create_lines(journal_lines_values)
 
     def get_journal_lines_values(self):
         """
@@ -468,8 +468,10 @@ class ConsolidationPeriodComposition(models.Model):
         """
         self.ensure_one()
         journal_lines_values = []
-        for consolidation_account in self.using_period_id.chart_id.account_ids:
-            amount = self._get_total_amount(consolidation_account)
+        consolidation_accounts = self.using_period_id.chart_id.account_ids
+        amounts = self._get_total_amounts(consolidation_accounts)
+        for consolidation_account in consolidation_accounts:
+            amount = amounts[consolidation_account.id]
             journal_lines_values.append({
                 "account_id": consolidation_account.id,
                 "amount": amount
@@ -489,13 +491,35 @@ class ConsolidationPeriodComposition(models.Model):
         :rtype: float
         """
         self.ensure_one()
-        domain = [
-            ('account_id.used_in_ids', '=', consolidation_account.id),
-            ('period_id.id', '=', self.composed_period_id.id)
-        ]
-        amounts = self.env['consolidation.journal.line'].sudo().read_group(domain, ['amount:sum(amount)'], [])
-        amount = amounts[0]['amount'] or 0.0
-        return (self.rate_consolidation / 100.0) * (amount * self.currency_rate)
+        return self._get_total_amounts(consolidation_account)[consolidation_account.id]
+
+    def _get_total_amounts(self, consolidation_accounts):
+        """
+        Get the total amounts of several consolidation accounts for this composition in a single query, see
+        _get_total_amount.
+        :param consolidation_accounts: the consolidation accounts
+        :return: a dict mapping each consolidation account id to its total amount, with all rates applied
+        :rtype: dict
+        """
+        self.ensure_one()
+        amounts = dict.fromkeys(consolidation_accounts.ids, 0.0)
+        if not consolidation_accounts:
+            return amounts
+        self.env['consolidation.journal.line'].flush(['account_id', 'amount', 'period_id'])
+        # The lines of the composed period are written in the accounts "using" the consolidation accounts
+        field = self.env['consolidation.account']._fields['used_in_ids']
+        self.env.cr.execute('''
+            SELECT rel.{used_in}, SUM(line.amount)
+            FROM consolidation_journal_line line
+            JOIN {relation} rel ON rel.{using} = line.account_id
+            WHERE line.period_id = %s
+            AND rel.{used_in} IN %s
+            GROUP BY rel.{used_in}
+        '''.format(relation=field.relation, using=field.column1, used_in=field.column2),
+            [self.composed_period_id.id, tuple(consolidation_accounts.ids)])
+        for account_id, amount in self.env.cr.fetchall():
+            amounts[account_id] = (self.rate_consolidation / 100.0) * ((amount or 0.0) * self.currency_rate)
+        return amounts
 
     # COMPUTEDS
 
@@ -586,14 +610,14 @@ class ConsolidationCompanyPeriod(models.Model):
         """
         self.ensure_one()
         journal_lines_values = self.get_journal_lines_values()
-        self.env['consolidation.journal'].create({
+        journal = self.env['consolidation.journal'].create({
             'name': _("%s Consolidated Accounting", self.company_name),
             'auto_generated': True,
             'company_period_id': self.id,
             'period_id': self.period_id.id,
-            'line_ids': [(0, 0, value) for value in journal_lines_values],
             'chart_id': self.chart_id.id,
         })
+        journal._create_lines(journal_lines_values)
 
     def get_journal_lines_values(self):
         """
@@ -605,12 +629,11 @@ class ConsolidationCompanyPeriod(models.Model):
         journal_lines_values = []
         historical_account_ids = self.period_id.chart_id.account_ids.filtered(lambda x: x.currency_mode == 'hist')
         non_hist_account_ids = self.period_id.chart_id.account_ids - historical_account_ids
-        for consolidation_account in historical_account_ids:
-            journal_lines_values += self._get_historical_journal_lines_values(consolidation_account)
+        journal_lines_values += self._get_historical_journal_lines_values(historical_account_ids)
 
+        total_balances_and_audit_lines = self._get_total_balances_and_audit_lines(non_hist_account_ids)
         for consolidation_account in non_hist_account_ids:
-            # Maybe there is a better way to group all move line ids and total balance by consolidation account
-            currency_amount, move_lines_ids = self._get_total_balance_and_audit_lines(consolidation_account)
+            currency_amount, move_lines_ids = total_balances_and_audit_lines[consolidation_account.id]
             amount = self._apply_rates(currency_amount, consolidation_account)
             journal_lines_values.append({
                 "account_id": consolidation_account.id,
@@ -630,9 +653,71 @@ class ConsolidationCompanyPeriod(models.Model):
         :rtype: tuple
         """
         self.ensure_one()
-        domain = self._get_move_lines_domain(consolidation_account)
-        res = self.env['account.move.line'].read_group(domain, ['balance:sum', 'id:array_agg'], [])
-        return res[0]['balance'] or 0.0, res[0]['id'] or []
+        return self._get_total_balances_and_audit_lines(consolidation_account)[consolidation_account.id]
+
+    def _get_total_balances_and_audit_lines(self, consolidation_accounts):
+        """
+        Get the total balance and the move lines "linked" to this company for several consolidation accounts in a
+        single grouped query, see _get_total_balance_and_audit_lines.
+        :param consolidation_accounts: the consolidation accounts
+        :return: a dict mapping each consolidation account id to a tuple (total balance, move line ids)
+        :rtype: dict
+        """
+        self.ensure_one()
+        res = {account_id: (0.0, []) for account_id in consolidation_accounts.ids}
+        if not consolidation_accounts:
+            return res
+        query, params = self._get_move_lines_query(
+            consolidation_accounts,
+            'SUM("account_move_line".balance), ARRAY_AGG("account_move_line".id)',
+            group_by=True,
+        )
+        self.env.cr.execute(query, params)
+        for account_id, balance, move_line_ids in self.env.cr.fetchall():
+            res[account_id] = (balance or 0.0, move_line_ids)
+        return res
+
+    def _get_move_lines_query(self, consolidation_accounts, select, join='', group_by=False, order_by=None):
+        """
+        Build a query on the move lines "linked" to this company period and some consolidation accounts (see
+        _get_move_lines_domain). Each move line is mapped to the given consolidation accounts of its account, the first
+        selected column being the consolidation account id.
+        :param consolidation_accounts: the consolidation accounts
+        :param select: the other columns to select, "account_move_line" being the move lines table
+        :param join: an optional join clause
+        :param group_by: True to group the rows by consolidation account
+        :param order_by: an optional ORDER BY clause
+        :return: a tuple (query, params), the params of the join clause having to be prepended to params
+        :rtype: tuple
+        """
+        self.ensure_one()
+        AccountMoveLine = self.env['account.move.line']
+        AccountMoveLine.flush()
+        query = AccountMoveLine._where_calc(self._get_move_lines_domain(consolidation_accounts))
+        AccountMoveLine._apply_ir_rules(query, 'read')
+        from_clause, where_clause, where_params = query.get_sql()
+        field = self.env['account.account']._fields['consolidation_account_ids']
+        query_str = '''
+            SELECT rel.{consolidation_account}, {select}
+            FROM {from_clause}
+            JOIN {relation} rel ON rel.{account} = "account_move_line".account_id
+            {join}
+            WHERE {where_clause}
+            AND rel.{consolidation_account} IN %s
+        '''.format(
+            select=select,
+            from_clause=from_clause,
+            relation=field.relation,
+            account=field.column1,
+            consolidation_account=field.column2,
+            join=join,
+            where_clause=where_clause,
+        )
+        if group_by:
+            query_str += ' GROUP BY rel.%s' % field.column2
+        if order_by:
+            query_str += ' ORDER BY %s' % order_by
+        return query_str, where_params + [tuple(consolidation_accounts.ids)]
 
     def _apply_rates(self, amount, consolidation_account):
         """
@@ -672,30 +757,71 @@ class ConsolidationCompanyPeriod(models.Model):
                 amount = currency._convert(amount, self.currency_chart_id, self.company_id, move_line.date)
         return self._apply_consolidation_rate(amount)
 
-    def _get_historical_journal_lines_values(self, consolidation_account):
+    def _get_historical_journal_lines_values(self, consolidation_accounts):
         """
-        Get all the journal line values for a given consolidation account when using historical currency mode.
-        :param consolidation_account: the consolidation account
+        Get all the journal line values for given consolidation accounts when using historical currency mode. The rates
+        are the ones of _apply_historical_rates, but the consolidation rates are joined in the move lines query and the
+        currency rates are only computed once per currency and date.
+        :param consolidation_accounts: the consolidation accounts
         :return: a list of dict containing values for journal lines creation
         :rtype: list
         """
         self.ensure_one()
-        domain = self._get_move_lines_domain(consolidation_account)
-        move_lines = self.env['account.move.line'].search(domain)
-        return [{"account_id": consolidation_account.id,
-                 "currency_amount": move_line.balance,
-                 "amount": self._apply_historical_rates(move_line),
-                 'move_line_ids': [(6, 0, [move_line.id])]} for move_line in move_lines]
+        if not consolidation_accounts:
+            return []
+        self.env['consolidation.rate'].flush(['company_id', 'chart_id', 'date_start', 'date_end', 'rate'])
+        # Same rate as consolidation.rate.get_rate_for
+        join = '''
+            LEFT JOIN LATERAL (
+                SELECT rate.rate
+                FROM consolidation_rate rate
+                WHERE rate.company_id = %s
+                AND rate.chart_id = %s
+                AND rate.date_start <= "account_move_line".date
+                AND rate.date_end >= "account_move_line".date
+                ORDER BY rate.date_end DESC
+                LIMIT 1
+            ) consolidation_rate ON TRUE
+        '''
+        query, params = self._get_move_lines_query(
+            consolidation_accounts,
+            '''"account_move_line".id, "account_move_line".balance, "account_move_line".date,
+            "account_move_line".company_currency_id, consolidation_rate.rate''',
+            join=join,
+            order_by='"account_move_line".date DESC, "account_move_line".move_name DESC, "account_move_line".id',
+        )
+        self.env.cr.execute(query, [self.company_id.id, self.chart_id.id] + params)
+
+        Currency = self.env['res.currency']
+        currency_rates = {}
+        values_per_account = {account_id: [] for account_id in consolidation_accounts.ids}
+        for account_id, move_line_id, balance, date, currency_id, rate in self.env.cr.fetchall():
+            if rate:
+                amount = balance * rate
+            elif currency_id != self.currency_chart_id.id:
+                if (currency_id, date) not in currency_rates:
+                    currency_rates[currency_id, date] = Currency._get_conversion_rate(
+                        Currency.browse(currency_id), self.currency_chart_id, self.company_id, date)
+                amount = self.currency_chart_id.round(balance * currency_rates[currency_id, date])
+            else:
+                amount = balance
+            values_per_account[account_id].append({
+                "account_id": account_id,
+                "currency_amount": balance,
+                "amount": self._apply_consolidation_rate(amount),
+                'move_line_ids': [(6, 0, [move_line_id])],
+            })
+        return [values for account_id in consolidation_accounts.ids for values in values_per_account[account_id]]
 
     def _get_move_lines_domain(self, consolidation_account):
         """
-        Get the domain definition to get all the move lines "linked" to this company period and a given consolidation
-        account. That means all the move lines that :
+        Get the domain definition to get all the move lines "linked" to this company period and given consolidation
+        accounts. That means all the move lines that :
         - are in the right company,
         - are not in excluded journals,
-        - are linked to a account.account which is mapped in the given consolidation account
+        - are linked to a account.account which is mapped in one of the given consolidation accounts
         - have a date contained in the company period start and company period end.
-        :param consolidation_account: the consolidation account
+        :param consolidation_account: the consolidation account(s)
         :return: a domain definition to be use in search ORM method.
         """
         self.ensure_one()
@@ -703,7 +829,7 @@ class ConsolidationCompanyPeriod(models.Model):
             ('move_id.state', '=', 'posted'),
             ('company_id', '=', self.company_id.id),
             ('journal_id', 'not in', self.mapped('exclude_journal_ids.id')),
-            ('account_id.consolidation_account_ids', '=', consolidation_account.id),
+            ('account_id.consolidation_account_ids', 'in', consolidation_account.ids),
             ('date', '<=', self.date_company_end),
             '|',
             ('date', '>=', self.date_company_begin),
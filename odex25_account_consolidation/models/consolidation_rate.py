@@ -13,6 +13,13 @@ class ConsolidationRate(models.Model):
     date_start = fields.Date(string="Start Date", required=True)
     date_end = fields.Date(string="End Date", required=True)
 
+    def init(self):
+        # Rates are looked up by date for each move line of historical rate accounts
+        self.env.cr.execute('''
+            CREATE INDEX IF NOT EXISTS consolidation_rate_company_chart_date_idx
+            ON consolidation_rate (company_id, chart_id, date_start, date_end DESC)
+        ''')
+
     def get_rate_for(self, date, company_id=False, chart_id=False):
         """
         Get the potential rate for a given company and a given chart at a given date
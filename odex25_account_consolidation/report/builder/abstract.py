@@ -14,6 +14,7 @@ class AbstractBuilder(ABC):
         """
         self.env = env
         self.value_formatter = value_formatter
+        self._amounts_matrices = {}
 
     def get_lines(self, period_ids: list, options: dict, line_id: str = None) -> list:
         """
@@ -243,6 +244,59 @@ class AbstractBuilder(ABC):
             domain.append(('chart_id', 'in', kwargs['chart_ids']))
         return self.env['consolidation.account'].search(domain)
 
+    def _get_matrix_columns(self, **kwargs) -> tuple:
+        """
+        Get the columns of the amounts matrix, see _get_amounts_matrix.
+        :return: a tuple (field, ids) where field is the name of the consolidation.journal.line field the columns are
+        based on and ids the list of the ids of the columns, in the order of the report columns
+        :rtype: tuple
+        """
+        return None, []
+
+    def _get_amounts_matrix(self, **kwargs) -> tuple:
+        """
+        Get the amounts of all the accounts for all the columns of the report. They are fetched with a single grouped
+        query the first time this method is called, and kept for the lifetime of the builder.
+        :return: a tuple (row_index, amounts, counts) where :
+            - row_index maps the id of each account having journal lines to its row index
+            - amounts is a dense matrix (list of rows) of the sum of the journal lines amounts, rows are indexed by
+            row_index and columns follow the order of the report columns
+            - counts is a matrix of the same shape as amounts, giving the number of journal lines of each cell
+        :rtype: tuple
+        """
+        column_field, column_ids = self._get_matrix_columns(**kwargs)
+        key = (column_field, tuple(column_ids))
+        if key not in self._amounts_matrices:
+            row_index = {}
+            amounts = []
+            counts = []
+            if column_field and column_ids:
+                column_index = {column_id: index for index, column_id in enumerate(column_ids)}
+                JournalLine = self.env['consolidation.journal.line']
+                JournalLine.flush(['account_id', 'amount', column_field])
+                query = JournalLine._where_calc([(column_field, 'in', list(column_ids))])
+                JournalLine._apply_ir_rules(query, 'read')
+                from_clause, where_clause, where_params = query.get_sql()
+                self.env.cr.execute('''
+                    SELECT "consolidation_journal_line".account_id,
+                           "consolidation_journal_line".{column},
+                           SUM("consolidation_journal_line".amount),
+                           COUNT(*)
+                    FROM {from_clause}
+                    WHERE {where_clause}
+                    GROUP BY "consolidation_journal_line".account_id, "consolidation_journal_line".{column}
+                '''.format(column=column_field, from_clause=from_clause, where_clause=where_clause), where_params)
+                for account_id, column_id, amount, count in self.env.cr.fetchall():
+                    if account_id not in row_index:
+                        row_index[account_id] = len(amounts)
+                        amounts.append([0.0] * len(column_ids))
+                        counts.append([0] * len(column_ids))
+                    row = row_index[account_id]
+                    amounts[row][column_index[column_id]] = amount or 0.0
+                    counts[row][column_index[column_id]] = count
+            self._amounts_matrices[key] = (row_index, amounts, counts)
+        return self._amounts_matrices[key]
+
     def _compute_account_totals(self, account_id: int, **kwargs) -> list:
         """
         Compute the totals for a given consolidation account and given periods
@@ -22,21 +22,16 @@ class ComparisonBuilder(AbstractBuilder):
     def _output_will_be_empty(self, period_ids: list, options: dict, line_id: str = None) -> bool:
         return len(period_ids) == 0
 
+    def _get_matrix_columns(self, **kwargs) -> tuple:
+        # Need to keep the order of periods as nothing in DB can order them
+        return 'period_id', kwargs.get('period_ids', [])
+
     def _compute_account_totals(self, account_id: int, **kwargs) -> list:
-        domain = [
-            ('account_id', '=', account_id),
-            ('period_id', 'in', kwargs.get('period_ids', []))
-        ]
-        groupby = ('period_id',)
-        total_lines = self.env['consolidation.journal.line'].read_group(domain, ('total:sum(amount)',), groupby)
-        if len(total_lines) == 0:
+        row_index, amounts, counts = self._get_amounts_matrix(**kwargs)
+        row = row_index.get(account_id)
+        if row is None:
             return []
-        totals = []
-        total_dict = {line['period_id'][0]: line['total'] for line in total_lines}
-        # Need to keep the order of periods as nothing in DB can order them
-        for period_id in kwargs.get('period_ids', []):
-            totals.append(total_dict[period_id])
-        return totals
+        return list(amounts[row])
 
     def _get_default_line_totals(self, options: dict, **kwargs) -> list:
         return kwargs.get('cols_amount', len(kwargs.get('period_ids', []))) * [0.0]
@@ -24,32 +24,25 @@ class DefaultBuilder(AbstractBuilder):
         })
         return params
 
-    def _compute_account_totals(self, account_id: int, **kwargs) -> list:
-        totals = []
-        line_total = 0
-        JournalLine = self.env['consolidation.journal.line']
+    def _get_matrix_columns(self, **kwargs) -> tuple:
+        return 'journal_id', self.journals.ids
 
+    def _compute_account_totals(self, account_id: int, **kwargs) -> list:
+        row_index, amounts, counts = self._get_amounts_matrix(**kwargs)
+        row = row_index.get(account_id)
         # Computing columns
-        for journal in self.journals:
-            # Check if a journal line exists
-            domain = [('account_id', '=', account_id), ('journal_id', '=', journal.id)]
-            groupby_res = JournalLine.read_group(domain, ['amount:sum', 'journal_id'], ['journal_id'])
-            journal_total_balance = groupby_res[0]['amount'] if len(groupby_res) > 0 else 0
-
-            # Update totals
-            totals.append(journal_total_balance)
-            line_total += journal_total_balance
-
-        totals.append(line_total)
+        totals = list(amounts[row]) if row is not None else [0.0] * len(self.journals)
+        totals.append(sum(totals))
         return totals
 
     def _format_account_line(self, account, level: int, totals: list, options: dict, **kwargs) -> dict:
         line = super()._format_account_line(account, level, totals, options, **kwargs)
-        for col, journal in zip(line['columns'], self.journals):
-            domain = [('account_id', '=', account.id), ('journal_id', '=', journal.id)]
-            journal_lines_amount = self.env['consolidation.journal.line'].search_count(domain)
-            if journal_lines_amount > 0:
-                col['journal_id'] = journal.id if journal.company_period_id else False
+        row_index, amounts, counts = self._get_amounts_matrix(**kwargs)
+        row = row_index.get(account.id)
+        if row is not None:
+            for col, journal, journal_lines_amount in zip(line['columns'], self.journals, counts[row]):
+                if journal_lines_amount > 0:
+                    col['journal_id'] = journal.id if journal.company_period_id else False
         return line
 
     def _get_default_line_totals(self, options: dict, **kwargs) -> list:
@@ -465,12 +465,12 @@ class TestConsolidationCompanyPeriod(AccountConsolidationTestCase):
         self.assertEqual(expected_str, cp._get_display_name())
 
     @patch(
-        'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._get_total_balance_and_audit_lines',
-        return_value=(42.0, []))
+        'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._get_total_balances_and_audit_lines',
+        side_effect=lambda accounts: {account.id: (42.0, []) for account in accounts})
     @patch(
         'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._apply_rates',
         return_value=191289.0)
-    def test_generate_journal(self, patch_apply_rates, patched_get_total_balance):
+    def test_generate_journal(self, patch_apply_rates, patched_get_total_balances):
         Journal = self.env['consolidation.journal']
         JournalLine = self.env['consolidation.journal.line']
         self._create_consolidation_account('First', 'end')
@@ -489,18 +489,18 @@ class TestConsolidationCompanyPeriod(AccountConsolidationTestCase):
         self.assertNotEqual(journal_lines[0].account_id, journal_lines[1].account_id,
                             'Generated journals lines should be linked to different accounts')
         for journal_line in journal_lines:
-            self.assertAlmostEqual(journal_line.currency_amount, patched_get_total_balance.return_value[0],
+            self.assertAlmostEqual(journal_line.currency_amount, 42.0,
                                    msg='Generated journals should have the right currency amount')
             self.assertAlmostEqual(journal_line.amount, patch_apply_rates.return_value,
                                    msg='Generated journals should have the right amount')
 
     @patch(
-        'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._get_total_balance_and_audit_lines',
-        return_value=(420.0, []))
+        'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._get_total_balances_and_audit_lines',
+        side_effect=lambda accounts: {account.id: (420.0, []) for account in accounts})
     @patch(
         'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._apply_rates',
         return_value=191289.0)
-    def test_get_journal_lines_values(self, patch_apply_rates, patch_get_total_balance):
+    def test_get_journal_lines_values(self, patch_apply_rates, patch_get_total_balances):
         accounts = (
             self._create_consolidation_account('First', 'end'),
             self._create_consolidation_account('Second', 'avg')
@@ -511,13 +511,13 @@ class TestConsolidationCompanyPeriod(AccountConsolidationTestCase):
         expected = [{
             'account_id': accounts[0].id,
             'amount': patch_apply_rates.return_value,
-            'currency_amount': patch_get_total_balance.return_value[0],
-            'move_line_ids': [(6, 0, patch_get_total_balance.return_value[1])]
+            'currency_amount': 420.0,
+            'move_line_ids': [(6, 0, [])]
         }, {
             'account_id': accounts[1].id,
             'amount': patch_apply_rates.return_value,
-            'currency_amount': patch_get_total_balance.return_value[0],
-            'move_line_ids': [(6, 0, patch_get_total_balance.return_value[1])]}
+            'currency_amount': 420.0,
+            'move_line_ids': [(6, 0, [])]}
         ]
         for cp in cps:
             result = cp.get_journal_lines_values()
@@ -604,6 +604,49 @@ class TestConsolidationCompanyPeriod(AccountConsolidationTestCase):
         expected_amount = 0.75 * move_line.balance
         self.assertAlmostEqual(cp._apply_historical_rates(move_line), expected_amount)
 
+    def test__get_historical_journal_lines_values(self):
+        ap = self._create_analysis_period()
+        cp = self._create_company_period(period=ap, rate_consolidation=50, company=self.us_company,
+                                         start_date='2010-01-01', end_date='2024-12-31')
+        self.env['consolidation.rate'].create({
+            'date_start': '2014-01-01',
+            'date_end': '2014-12-31',
+            'rate': 1.5,
+            'company_id': self.us_company.id,
+            'chart_id': cp.chart_id.id
+        })
+        self.env['res.currency.rate'].create({
+            'name': '2013-01-31',
+            'company_id': self.us_company.id,
+            'currency_id': self.us_company.currency_id.id,
+            'rate': 1.25
+        })
+        account_credit = self._create_account('111', 'Credit account', company=self.us_company)
+        account_debit = self._create_account('112', 'Debit account', company=self.us_company)
+        journal = self._create_journal(company=self.us_company)
+        consolidation_account = self._create_consolidation_account(currency_mode='hist')
+        consolidation_account.write({'account_ids': [(4, account_credit.id)]})
+        # One move with a consolidation rate, one converted with the currency rate
+        moves = self._create_basic_move(1000, company=self.us_company, move_date='2014-01-31', journal=journal,
+                                        account_credit=account_credit, account_debit=account_debit)
+        moves += self._create_basic_move(800, company=self.us_company, move_date='2013-06-30', journal=journal,
+                                         account_credit=account_credit, account_debit=account_debit)
+        move_lines = moves.line_ids.filtered(lambda l: l.account_id == account_credit)
+
+        values = cp._get_historical_journal_lines_values(consolidation_account)
+        self.assertEqual(len(values), 2)
+        for move_line in move_lines:
+            line_values = next(v for v in values if v['move_line_ids'] == [(6, 0, [move_line.id])])
+            self.assertEqual(line_values['account_id'], consolidation_account.id)
+            self.assertAlmostEqual(line_values['currency_amount'], move_line.balance)
+            self.assertAlmostEqual(line_values['amount'], cp._apply_historical_rates(move_line))
+
+        cp.generate_journal()
+        journal = self.env['consolidation.journal'].search([('company_period_id', '=', cp.id)])
+        self.assertEqual(journal.line_ids.move_line_ids, move_lines)
+        self.assertEqual(move_lines.consolidation_journal_line_ids,
+                         journal.line_ids.filtered(lambda l: l.account_id == consolidation_account))
+
     @patch(
         'odoo.addons.odex25_account_consolidation.models.consolidation_period.ConsolidationCompanyPeriod._convert')
     @patch(
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from odoo import api, fields, models, _
 from odoo.tools.misc import format_date
 from odoo.osv import expression
@@ -74,14 +78,19 @@ class ResPartner(models.Model):
                 record.followup_level = first_followup_level
 
     def _compute_unpaid_invoices(self):
-        for record in self:
-            record.unpaid_invoices = self.env['account.move'].search([
+        invoice_ids_by_partner = defaultdict(list)
+        if self.ids:
+            invoices = self.env['account.move'].search([
                 ('company_id', '=', self.env.company.id),
-                ('commercial_partner_id', '=', record.id),
+                ('commercial_partner_id', 'in', self.ids),
                 ('state', '=', 'posted'),
                 ('payment_state', 'not in', ('paid', 'in_payment')),
                 ('move_type', 'in', self.env['account.move'].get_sale_types())
             ])
+            for invoice in invoices:
+                invoice_ids_by_partner[invoice.commercial_partner_id.id].append(invoice.id)
+        for record in self:
+            record.unpaid_invoices = self.env['account.move'].browse(invoice_ids_by_partner[record.id])
 
     def get_next_action(self, followup_line):
         """
@@ -284,14 +293,93 @@ class ResPartner(models.Model):
             return
         return self.env['account.followup.report'].print_followups(to_print)
 
-    def _cron_execute_followup(self):
-        followup_data = self._query_followup_level(all_partners=True)
-        in_need_of_action = self.env['res.partner'].browse([d['partner_id'] for d in followup_data.values() if d['followup_status'] == 'in_need_of_action'])
-        in_need_of_action_auto = in_need_of_action.filtered(lambda p: p.followup_level.auto_execute)
-        for partner in in_need_of_action_auto:
+    @api.model
+    def _execute_followup_batch(self, partner_ids, counters, lock):
+        """
+        Execute the automatic followup of a batch of partners in the current transaction.
+        The emails are queued instead of being sent while posting the messages.
+
+        :param partner_ids: The ids of the partners to process.
+        :param counters:    The counters of the run, see '_execute_followup_pool'.
+        :param lock:        The lock protecting the counters.
+        """
+        partners = self.with_context(mail_notify_force_send=False).browse(partner_ids)
+        # Fetch the data of the whole batch at once instead of partner by partner.
+        partners.mapped('unreconciled_aml_ids')
+        partners.mapped('unpaid_invoices')
+        partners.mapped('followup_level')
+        for partner in partners:
+            # The partner may have been followed up in the meantime.
+            if partner.followup_status != 'in_need_of_action' or not partner.followup_level.auto_execute:
+                with lock:
+                    counters['skipped'] += 1
+                continue
             try:
-                partner._execute_followup_partner()
+                with self.env.cr.savepoint():
+                    partner._execute_followup_partner()
+                failed = False
             except UserError as e:
                 # followup may raise exception due to configuration issues
                 # i.e. partner missing email
                 _logger.exception(e)
+                failed = True
+            with lock:
+                counters['failed' if failed else 'sent'] += 1
+
+    @api.model
+    def _execute_followup_batch_in_worker(self, partner_ids, counters, lock):
+        """
+        Entry point of a thread of the followup pool: process a batch of partners with a dedicated cursor, committed at
+        the end of the batch.
+        """
+        with api.Environment.manage(), self.pool.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            env['res.partner']._execute_followup_batch(partner_ids, counters, lock)
+
+    def _execute_followup_pool(self, workers=1, batch_size=100):
+        """
+        Execute the automatic followup of the partners in self by batches. Each batch is committed at its end and, when
+        more than one worker is requested, the batches are dispatched across a pool of worker threads having their own
+        cursor, rendering the reports in parallel.
+
+        :param workers:     The number of worker threads.
+        :param batch_size:  The number of partners processed between two commits.
+        :return:            A dictionary giving the number of 'sent', 'skipped' and 'failed' partners and the 'duration'
+                            of the run in seconds.
+        """
+        batches = [self.ids[i:i + batch_size] for i in range(0, len(self.ids), batch_size)]
+        counters = {'sent': 0, 'skipped': 0, 'failed': 0}
+        lock = threading.Lock()
+        start = time.time()
+
+        if self.pool.in_test_mode() or workers <= 1:
+            for batch in batches:
+                self._execute_followup_batch(batch, counters, lock)
+                if not self.pool.in_test_mode():
+                    self.env.cr.commit()
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._execute_followup_batch_in_worker, batch, counters, lock)
+                    for batch in batches
+                ]
+                for future in futures:
+                    exception = future.exception()
+                    if exception:
+                        _logger.error('Followup: a batch of partners failed: %s', exception)
+
+        counters['duration'] = time.time() - start
+        _logger.info(
+            'Followup: %(sent)s partners followed up, %(skipped)s skipped, %(failed)s failed in %(duration).1fs.',
+            counters,
+        )
+        return counters
+
+    def _cron_execute_followup(self):
+        followup_data = self._query_followup_level(all_partners=True)
+        in_need_of_action = self.env['res.partner'].browse([d['partner_id'] for d in followup_data.values() if d['followup_status'] == 'in_need_of_action'])
+        in_need_of_action_auto = in_need_of_action.filtered(lambda p: p.followup_level.auto_execute)
+        ICP = self.env['ir.config_parameter'].sudo()
+        workers = int(ICP.get_param('odex25_account_followup.cron_workers', 1))
+        batch_size = int(ICP.get_param('odex25_account_followup.cron_batch_size', 100))
+        return in_need_of_action_auto._execute_followup_pool(workers=workers, batch_size=batch_size)
@@ -198,3 +198,23 @@ class TestAccountFollowupReports(TestAccountReportsCommon):
 
         with freeze_time('2016-01-20'):
             self.assertPartnerFollowup(self.partner_a, 'with_overdue_invoices', self.second_followup_level)
+
+    def test_followup_pool(self):
+        ''' Test the automatic followup of several partners by batches. '''
+        self.first_followup_level.write({'auto_execute': True, 'join_invoices': False})
+
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'invoice_date': '2016-01-01',
+            'partner_id': self.partner_a.id,
+            'invoice_line_ids': [(0, 0, {'quantity': 1, 'price_unit': 500})]
+        })
+        invoice.action_post()
+
+        with freeze_time('2016-01-15'):
+            self.assertPartnerFollowup(self.partner_a, 'in_need_of_action', self.first_followup_level)
+
+            counters = (self.partner_a + self.partner_b)._execute_followup_pool(batch_size=1)
+            self.assertEqual((counters['sent'], counters['skipped'], counters['failed']), (1, 1, 0))
+            self.assertTrue(self.env['mail.message'].search([('partner_ids', '=', self.partner_a.id)]))
+            self.assertPartnerFollowup(self.partner_a, 'with_overdue_invoices', self.second_followup_level)
@@ -5,9 +5,11 @@ from odoo.addons.iap.tools import iap_tools
 from odoo.exceptions import AccessError, ValidationError
 from odoo.tests.common import Form
 from odoo.tools.misc import clean_context
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import re
 import json
+import time
 
 _logger = logging.getLogger(__name__)
 
@@ -15,6 +17,11 @@ PARTNER_AUTOCOMPLETE_ENDPOINT = 'https://partner-autocomplete.odoo.com'
 EXTRACT_ENDPOINT = 'https://iap-extract.odoo.com'
 CLIENT_OCR_VERSION = 120
 
+# default values of the parameters of the status update cron, see 'check_all_status'
+STATUS_BATCH_SIZE = 50
+STATUS_WORKERS = 4
+STATUS_MAX_RUNTIME = 600
+
 # list of result id that can be sent by iap-extract
 SUCCESS = 0
 NOT_READY = 1
@@ -121,10 +128,46 @@ class AccountMove(models.Model):
     extract_can_show_send_button = fields.Boolean("Can show the ocr send button", compute=_compute_show_send_button)
 
     @api.model
-    def _contact_iap_extract(self, local_endpoint, params):
+    def _get_iap_extract_request(self, local_endpoint, params):
+        """Prepare a request to iap-extract.
+        :return: the url and the parameters of the request"""
         params['version'] = CLIENT_OCR_VERSION
         endpoint = self.env['ir.config_parameter'].sudo().get_param('odex25_account_invoice_extract_endpoint', EXTRACT_ENDPOINT)
-        return iap_tools.iap_jsonrpc(endpoint + local_endpoint, params=params)
+        return endpoint + local_endpoint, params
+
+    @api.model
+    def _contact_iap_extract(self, local_endpoint, params):
+        url, params = self._get_iap_extract_request(local_endpoint, params)
+        return iap_tools.iap_jsonrpc(url, params=params)
+
+    @api.model
+    def _contact_iap_extract_batch(self, local_endpoint, params_list):
+        """Send several requests to iap-extract, concurrently when the parameter
+        'odex25_account_invoice_extract.status_workers' allows more than one worker.
+        :return: the list of the results, in the same order as params_list. A request
+        that failed gives the raised exception instead of its result."""
+        workers = int(self.env['ir.config_parameter'].sudo().get_param('odex25_account_invoice_extract.status_workers', STATUS_WORKERS))
+        if workers <= 1 or len(params_list) <= 1 or self.pool.in_test_mode():
+            results = []
+            for params in params_list:
+                try:
+                    results.append(self._contact_iap_extract(local_endpoint, params))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        # the requests are prepared beforehand: the threads only do the http requests, they don't use the environment
+        requests = [self._get_iap_extract_request(local_endpoint, params) for params in params_list]
+
+        def contact_iap_extract(request):
+            url, params = request
+            try:
+                return iap_tools.iap_jsonrpc(url, params=params)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(contact_iap_extract, requests))
 
     @api.model
     def _contact_iap_partner_autocomplete(self, local_endpoint, params):
@@ -563,10 +606,35 @@ class AccountMove(models.Model):
 
     @api.model
     def check_all_status(self):
-        for record in self.search([('state', '=', 'draft'), ('extract_state', 'in', ['waiting_extraction', 'extract_not_ready'])]):
+        """Update the status of the invoices waiting for the OCR, by batches. The least recently
+        checked invoices come first and the cron stops after the runtime budget given by the
+        parameter 'odex25_account_invoice_extract.status_max_runtime' (in seconds); the
+        remaining invoices are checked by the next run."""
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        batch_size = int(get_param('odex25_account_invoice_extract.status_batch_size', STATUS_BATCH_SIZE)) or STATUS_BATCH_SIZE
+        max_runtime = float(get_param('odex25_account_invoice_extract.status_max_runtime', STATUS_MAX_RUNTIME))
+        start = time.time()
+        records = self.search([('state', '=', 'draft'), ('extract_state', 'in', ['waiting_extraction', 'extract_not_ready'])], order='write_date, id')
+        for index in range(0, len(records), batch_size):
+            if max_runtime and time.time() - start > max_runtime:
+                _logger.info("OCR status update stopped after %.0f seconds, %d invoices left.", time.time() - start, len(records) - index)
+                break
+            records[index:index + batch_size]._check_status_batch()
+            if not self.pool.in_test_mode():
+                self.env.cr.commit()
+
+    def _check_status_batch(self):
+        """Update the status of several invoices, requesting their results to iap at once."""
+        records = self.filtered(lambda inv: inv.state == 'draft')
+        params_list = [{'document_id': record.extract_remote_id} for record in records]
+        results = self._contact_iap_extract_batch('/iap/invoice_extract/get_result', params_list)
+        for record, result in zip(records, results):
+            if isinstance(result, Exception):
+                _logger.error("Couldn't check status of account.move with id %d: %s", record.id, str(result))
+                continue
             try:
                 with self.env.cr.savepoint():
-                    record._check_status()
+                    record._process_extract_result(result)
             except Exception as e:
                 _logger.error("Couldn't check status of account.move with id %d: %s", record.id, str(e))
 
@@ -580,12 +648,7 @@ class AccountMove(models.Model):
         limit = max(0, 20 - len(records_to_update))
         if limit > 0:
             records_to_preupdate = self.search([('extract_state', 'in', ['waiting_extraction', 'extract_not_ready']), ('id', 'not in', records_to_update.ids), ('state', '=', 'draft')], limit=limit)
-            for record in records_to_preupdate:
-                try:
-                    with self.env.cr.savepoint():
-                        record._check_status()
-                except Exception as e:
-                    _logger.error("Couldn't check status of account.move with id %d: %s", record.id, str(e))
+            records_to_preupdate._check_status_batch()
 
     def _check_status(self):
         self.ensure_one()
@@ -594,6 +657,12 @@ class AccountMove(models.Model):
                 'document_id': self.extract_remote_id
             }
             result = self._contact_iap_extract('/iap/invoice_extract/get_result', params=params)
+            self._process_extract_result(result)
+
+    def _process_extract_result(self, result):
+        """Update the invoice with the result of its OCR request."""
+        self.ensure_one()
+        if self.state == 'draft':
             self.extract_status_code = result['status_code']
             if result['status_code'] == SUCCESS:
                 self.extract_state = "waiting_validation"
@@ -612,12 +681,13 @@ class AccountMove(models.Model):
                     self.duplicated_vendor_ref = ocr_results['invoice_id']['selected_value']['content'] if 'invoice_id' in ocr_results else ""
 
                 fields_with_boxes = ['supplier', 'date', 'due_date', 'invoice_id', 'currency', 'VAT_Number']
+                data = []
                 for field in fields_with_boxes:
                     if field in ocr_results:
                         value = ocr_results[field]
-                        data = []
                         for word in value["words"]:
-                            data.append((0, 0, {
+                            data.append({
+                                "invoice_id": self.id,
                                 "field": field,
                                 "selected_status": 1 if value["selected_value"] == word else 0,
                                 "word_text": word['content'],
@@ -627,8 +697,8 @@ class AccountMove(models.Model):
                                 "word_box_width": word['coords'][2],
                                 "word_box_height": word['coords'][3],
                                 "word_box_angle": word['coords'][4],
-                            }))
-                        self.write({'extract_word_ids': data})
+                            })
+                self.env['account.invoice_extract.words'].create(data)
             elif result['status_code'] == NOT_READY:
                 self.extract_state = 'extract_not_ready'
             else:
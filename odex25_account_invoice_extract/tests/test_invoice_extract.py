@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 import base64
+from unittest.mock import patch
 
-from odoo import fields
+from odoo import exceptions, fields
 
-from odoo.addons.odex25_account_invoice_extract.models.account_invoice import SUCCESS, NOT_READY, ERROR_INTERNAL, WARNING_DUPLICATE_VENDOR_REFERENCE
+from odoo.addons.iap.tools import iap_tools
+from odoo.addons.odex25_account_invoice_extract.models.account_invoice import CLIENT_OCR_VERSION, SUCCESS, NOT_READY, ERROR_INTERNAL, WARNING_DUPLICATE_VENDOR_REFERENCE
 from odoo.addons.odex25_account_invoice_extract.tests import common as odex25_account_invoice_extract_common
 from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.modules.registry import Registry
 from odoo.tests import tagged
 from odoo.tests.common import Form
 
@@ -341,6 +344,50 @@ class TestInvoiceExtract(AccountTestInvoicingCommon, odex25_account_invoice_extr
         self.assertEqual(invoice.extract_state, 'waiting_validation')
         self.assertEqual(invoice2.extract_state, 'waiting_validation')
 
+    def test_check_all_status(self):
+        # test that the cron updates all the invoices waiting for extraction and saves the word boxes
+        invoices = self.env['account.move'].create([{'move_type': 'in_invoice', 'extract_state': 'waiting_extraction'} for i in range(3)])
+        extract_response = self.get_default_extract_response()
+        extract_response['results'][0]['invoice_id']['words'] = [
+            {'content': 'INV0001', 'page': 1, 'coords': [0.5, 0.2, 0.1, 0.02, 0]},
+            {'content': 'INV0002', 'page': 1, 'coords': [0.5, 0.4, 0.1, 0.02, 0]},
+        ]
+        extract_response['results'][0]['invoice_id']['selected_value'] = extract_response['results'][0]['invoice_id']['words'][0]
+        self.env['ir.config_parameter'].sudo().set_param('odex25_account_invoice_extract.status_batch_size', 2)
+
+        with self.mock_iap_extract(extract_response, {}):
+            self.env['account.move'].check_all_status()
+
+        for invoice in invoices:
+            self.assertEqual(invoice.extract_state, 'waiting_validation')
+            self.assertRecordValues(invoice.extract_word_ids, [
+                {'field': 'invoice_id', 'word_text': 'INV0001', 'selected_status': 1},
+                {'field': 'invoice_id', 'word_text': 'INV0002', 'selected_status': 0},
+            ])
+
+    def test_contact_iap_extract_batch_workers(self):
+        # test that the requests sent concurrently are the same as the ones sent one by one
+        self.env['ir.config_parameter'].sudo().set_param('odex25_account_invoice_extract.status_workers', 2)
+        self.env['ir.config_parameter'].sudo().set_param('odex25_account_invoice_extract_endpoint', 'https://extract.example.com')
+        extract_response = self.get_default_extract_response()
+
+        def iap_jsonrpc(url, params=None, **kwargs):
+            if params['document_id'] == 2:
+                raise exceptions.AccessError("Error")
+            return dict(extract_response, document_id=params['document_id'])
+
+        with patch.object(Registry, 'in_test_mode', return_value=False), \
+                patch.object(iap_tools, 'iap_jsonrpc', side_effect=iap_jsonrpc) as iap_jsonrpc_mock:
+            results = self.env['account.move']._contact_iap_extract_batch('/iap/invoice_extract/get_result', [{'document_id': i} for i in range(1, 4)])
+
+        self.assertEqual(iap_jsonrpc_mock.call_count, 3)
+        for call in iap_jsonrpc_mock.call_args_list:
+            self.assertEqual(call[0][0], 'https://extract.example.com/iap/invoice_extract/get_result')
+            self.assertEqual(call[1]['params']['version'], CLIENT_OCR_VERSION)
+        self.assertEqual(results[0]['document_id'], 1)
+        self.assertIsInstance(results[1], exceptions.AccessError)
+        self.assertEqual(results[2]['document_id'], 3)
+
     def test_no_overwrite_client_values(self):
         # test that we are not overwriting the values entered by the client
         partner = self.env['res.partner'].create({'name': 'Blabla', 'vat': 'BE0123456789'})
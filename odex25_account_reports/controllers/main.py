@@ -5,6 +5,7 @@ from odoo import http
 from odoo.http import content_disposition, request
 from odoo.addons.web.controllers.main import _serialize_exception
 from odoo.tools import html_escape
+from werkzeug.wsgi import wrap_file
 
 import json
 
@@ -25,13 +26,14 @@ class FinancialReportController(http.Controller):
         try:
             if output_format == 'xlsx':
                 response = request.make_response(
-                    None,
+                    wrap_file(request.httprequest.environ, report_obj.get_xlsx_file(options)),
                     headers=[
                         ('Content-Type', account_report_model.get_export_mime_type('xlsx')),
                         ('Content-Disposition', content_disposition(report_name + '.xlsx'))
                     ]
                 )
-                response.stream.write(report_obj.get_xlsx(options))
+                # The workbook is built in a temporary file which is streamed to the user then closed.
+                response.direct_passthrough = True
             if output_format == 'pdf':
                 response = request.make_response(
                     report_obj.get_pdf(options),
@@ -42,14 +44,25 @@ class FinancialReportController(http.Controller):
                 )
             if output_format == 'xml':
                 content = report_obj.get_xml(options)
-                response = request.make_response(
-                    content,
-                    headers=[
-                        ('Content-Type', account_report_model.get_export_mime_type('xml')),
-                        ('Content-Disposition', content_disposition(report_name + '.xml')),
-                        ('Content-Length', len(content))
-                    ]
-                )
+                if hasattr(content, 'read'):
+                    response = request.make_response(
+                        wrap_file(request.httprequest.environ, content),
+                        headers=[
+                            ('Content-Type', account_report_model.get_export_mime_type('xml')),
+                            ('Content-Disposition', content_disposition(report_name + '.xml'))
+                        ]
+                    )
+                    # Large files (e.g. the SAF-T) are written in a temporary file which is streamed to the user then closed.
+                    response.direct_passthrough = True
+                else:
+                    response = request.make_response(
+                        content,
+                        headers=[
+                            ('Content-Type', account_report_model.get_export_mime_type('xml')),
+                            ('Content-Disposition', content_disposition(report_name + '.xml')),
+                            ('Content-Length', len(content))
+                        ]
+                    )
             if output_format == 'xaf':
                 content = report_obj.get_xaf(options)
                 response = request.make_response(
@@ -5,7 +5,8 @@ import json
 
 from .formula import FormulaSolver, PROTECTED_KEYWORDS
 from odoo import models, fields, api, _
-from odoo.tools import float_is_zero, ustr
+from odoo.tools import float_is_zero, ormcache, ustr
+from odoo.tools.safe_eval import _SAFE_OPCODES, test_expr
 from dateutil.relativedelta import relativedelta
 from odoo.exceptions import UserError, ValidationError
 
@@ -596,6 +597,11 @@ class ReportAccountFinancialReport(models.Model):
 
         return headers, lines
 
+    def _get_table_chunks(self, options):
+        # OVERRIDE: the headers are dependent of the data, see '_get_table'.
+        headers, lines = self._get_table(options)
+        return headers, [lines]
+
     @api.model
     def _get_financial_line_report_line(self, options, financial_line, solver, groupby_keys):
         ''' Create the report line for an account.financial.html.report.line record.
@@ -946,6 +952,19 @@ class AccountFinancialReportLine(models.Model):
             domain.append(('tax_exigible', '=', True))
         return domain
 
+    @ormcache('self.formulas')
+    def _get_compiled_formula(self):
+        ''' Parse and compile the formula of the current line. The result is cached by formula so it is shared by all
+        the reports evaluating this line and computed again as soon as the formula changes.
+        :return: A tuple (names, code) where 'names' is the frozenset of names used by the formula and 'code' the
+                 compiled formula, ready to be evaluated, or None if the line has no formula.
+        '''
+        if not self.formulas:
+            return frozenset(), None
+        formula = self.formulas.strip()
+        names = frozenset(node.id for node in ast.walk(ast.parse(formula)) if isinstance(node, ast.Name))
+        return names, test_expr(formula, _SAFE_OPCODES, mode='eval')
+
     # -------------------------------------------------------------------------
     # QUERIES
     # -------------------------------------------------------------------------
@@ -981,13 +1000,16 @@ class AccountFinancialReportLine(models.Model):
         ct_query = self.env['res.currency']._get_query_currency_table(options_list[0])
         financial_report = self._get_financial_report()
 
+        # Totals grouped by columns stored in the balance snapshot can be read from it.
+        snapshot = set(groupby_list) <= self.env['account.report.balance.snapshot']._snapshot_columns
+
         # Prepare a query by period as the date is different for each comparison.
 
         for i, options in enumerate(options_list):
             new_options = self._get_options_financial_line(options)
             line_domain = self._get_domain(new_options, financial_report)
 
-            tables, where_clause, where_params = AccountFinancialReportHtml._query_get(new_options, domain=line_domain)
+            tables, where_clause, where_params = AccountFinancialReportHtml._query_get(new_options, domain=line_domain, snapshot=snapshot)
 
             queries.append('''
                 SELECT
@@ -1028,33 +1050,14 @@ class AccountFinancialReportLine(models.Model):
 
         return [(groupby_key, display_name, results[groupby_key]) for groupby_key, display_name in sorted_values]
 
-    def _compute_sum(self, options_list):
-        ''' Compute the values to be used inside the formula for the current line.
-        If called, it means the current line formula contains something making its line a leaf ('sum' or 'count_rows')
-        for example.
-
-        The results is something like:
-        {
-            'sum':          {key: <balance>...},
-            'sum_if_pos':   {key: <balance>...},
-            'sum_if_neg':   {key: <balance>...},
-            'count_rows':   {period_index: <number_of_rows_in_period>...},
-        }
-
-        ... where:
-        'period_index' is the number of the period, 0 being the current one, others being comparisons.
-
-        'key' is a composite key containing the period_index and the additional group by enabled on the financial report.
-        For example, suppose a group by 'partner_id':
-
-        The keys could be something like (0,1), (1,2), (1,3), meaning:
-        * (0,1): At the period 0, the results for 'partner_id = 1' are...
-        * (1,2): At the period 1 (first comparison), the results for 'partner_id = 2' are...
-        * (1,3): At the period 1 (first comparison), the results for 'partner_id = 3' are...
+    def _get_sum_query(self, options_list):
+        ''' Build the query computing the values of '_compute_sum' for the current line.
+        The query returns one row per period and additional group by, tagged with the id of the current line in the
+        'line_id' column so that the queries of multiple lines can be merged together (see '_compute_sums').
 
         :param options_list:        The report options list, first one being the current dates range, others being the
                                     comparisons.
-        :return:                    A python dictionary.
+        :return:                    A tuple (query, params).
         '''
         self.ensure_one()
         params = []
@@ -1066,17 +1069,26 @@ class AccountFinancialReportLine(models.Model):
         ct_query = self.env['res.currency']._get_query_currency_table(options_list[0])
         financial_report = self._get_financial_report()
 
+        # Totals grouped by columns stored in the balance snapshot can be read from it. However, the snapshot rows
+        # are aggregates so 'count_rows' must be computed on the journal items. The vertical groupby is referenced by
+        # 'count_rows' so it must be stored in the snapshot as well.
+        snapshot_columns = self.env['account.report.balance.snapshot']._snapshot_columns
+        snapshot = set(groupby_list) <= snapshot_columns \
+            and (not self.groupby or self.groupby in snapshot_columns) \
+            and 'count_rows' not in (self.formulas or '')
+
         # Prepare a query by period as the date is different for each comparison.
 
         for i, options in enumerate(options_list):
             new_options = self._get_options_financial_line(options)
             line_domain = self._get_domain(new_options, financial_report)
 
-            tables, where_clause, where_params = AccountFinancialReportHtml._query_get(new_options, domain=line_domain)
+            tables, where_clause, where_params = AccountFinancialReportHtml._query_get(new_options, domain=line_domain, snapshot=snapshot)
 
             queries.append('''
                 SELECT
                     ''' + (groupby_clause and '%s,' % groupby_clause) + '''
+                    %s AS line_id,
                     %s AS period_index,
                     COUNT(DISTINCT account_move_line.''' + (self.groupby or 'id') + ''') AS count_rows,
                     COALESCE(SUM(ROUND(account_move_line.balance * currency_table.rate, currency_table.precision)), 0.0) AS balance
@@ -1085,20 +1097,75 @@ class AccountFinancialReportLine(models.Model):
                 WHERE ''' + where_clause + '''
                 ''' + (groupby_clause and 'GROUP BY %s' % groupby_clause) + '''
             ''')
-            params.append(i)
+            params += [self.id, i]
             params += where_params
 
-        # Fetch the results.
+        return ' UNION ALL '.join(queries), params
+
+    def _compute_sum(self, options_list):
+        ''' Compute the values to be used inside the formula for the current line.
+        If called, it means the current line formula contains something making its line a leaf ('sum' or 'count_rows')
+        for example.
+
+        The results is something like:
+        {
+            'sum':          {key: <balance>...},
+            'sum_if_pos':   {key: <balance>...},
+            'sum_if_neg':   {key: <balance>...},
+            'count_rows':   {period_index: <number_of_rows_in_period>...},
+        }
+
+        ... where:
+        'period_index' is the number of the period, 0 being the current one, others being comparisons.
+
+        'key' is a composite key containing the period_index and the additional group by enabled on the financial report.
+        For example, suppose a group by 'partner_id':
+
+        The keys could be something like (0,1), (1,2), (1,3), meaning:
+        * (0,1): At the period 0, the results for 'partner_id = 1' are...
+        * (1,2): At the period 1 (first comparison), the results for 'partner_id = 2' are...
+        * (1,3): At the period 1 (first comparison), the results for 'partner_id = 3' are...
 
-        results = {
-            'sum': {},
-            'sum_if_pos': {},
-            'sum_if_neg': {},
-            'count_rows': {},
+        :param options_list:        The report options list, first one being the current dates range, others being the
+                                    comparisons.
+        :return:                    A python dictionary.
+        '''
+        self.ensure_one()
+        return self._compute_sums(options_list)[self.id]
+
+    def _compute_sums(self, options_list):
+        ''' Batched version of '_compute_sum': the values of all lines in self are fetched using a single query.
+        :param options_list:        The report options list, first one being the current dates range, others being the
+                                    comparisons.
+        :return:                    A python dictionary mapping each line id to its '_compute_sum' results.
+        '''
+        results_by_line = {
+            line.id: {
+                'sum': {},
+                'sum_if_pos': {},
+                'sum_if_neg': {},
+                'count_rows': {},
+            }
+            for line in self
         }
+        if not self:
+            return results_by_line
 
-        financial_report._cr_execute(options_list[0], ' UNION ALL '.join(queries), params)
+        params = []
+        queries = []
+        for line in self:
+            line_query, line_params = line._get_sum_query(options_list)
+            queries.append(line_query)
+            params += line_params
+
+        groupby_list = self.env['account.financial.html.report']._get_options_groupby_fields(options_list[0])
+
+        # Fetch the results.
+
+        self[0]._get_financial_report()._cr_execute(options_list[0], ' UNION ALL '.join(queries), params)
         for res in self._cr.dictfetchall():
+            results = results_by_line[res['line_id']]
+
             # Build the key.
             key = [res['period_index']]
             for gb in groupby_list:
@@ -1114,7 +1181,7 @@ class AccountFinancialReportLine(models.Model):
             if results['sum'][key] < 0:
                 results['sum_if_neg'][key] = results['sum'][key]
 
-        return results
+        return results_by_line
 
     # -------------------------------------------------------------------------
     # BUSINESS METHODS
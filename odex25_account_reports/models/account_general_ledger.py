@@ -5,6 +5,8 @@ from odoo import models, fields, api, _
 from odoo.tools.misc import format_date, DEFAULT_SERVER_DATE_FORMAT
 from datetime import timedelta
 
+import json
+
 
 class AccountGeneralLedgerReport(models.AbstractModel):
     _name = "account.general.ledger"
@@ -67,14 +69,30 @@ class AccountGeneralLedgerReport(models.AbstractModel):
         offset = int(options.get('lines_offset', 0))
         remaining = int(options.get('lines_remaining', 0))
         balance_progress = float(options.get('lines_progress', 0))
+        cursor = options.get('lines_cursor')
 
-        if offset > 0:
+        if offset > 0 or cursor:
             # Case a line is expanded using the load more.
-            return self._load_more_lines(options, line_id, offset, remaining, balance_progress)
+            return self._load_more_lines(options, line_id, offset, remaining, balance_progress, cursor=cursor)
         else:
             # Case the whole report is loaded or a line is expanded for the first time.
             return self._get_general_ledger_lines(options, line_id=line_id)
 
+    @api.model
+    def _is_printed_by_chunks(self, options, line_id=None):
+        ''' Whether '_get_lines_chunks' fetches the lines by itself instead of going through '_get_lines', i.e. when
+        printing the whole report.
+        '''
+        return not (line_id or int(options.get('lines_offset', 0)) or options.get('lines_cursor') or not self._context.get('print_mode') or self._context.get('aml_only'))
+
+    @api.model
+    def _get_lines_chunks(self, options, line_id=None):
+        # OVERRIDE
+        # When printing the whole report, don't load all the journal items at once.
+        if self._is_printed_by_chunks(options, line_id=line_id):
+            yield from self._get_general_ledger_lines_chunks(options)
+        else:
+            yield from super(AccountGeneralLedgerReport, self)._get_lines_chunks(options, line_id=line_id)
 
     @api.model
     def _get_general_ledger_lines(self, options, line_id=None):
@@ -82,15 +100,31 @@ class AccountGeneralLedgerReport(models.AbstractModel):
         :param options: The report options.
         :return:        A list of lines, each one represented by a dictionary.
         '''
+        aml_ids = []
+        lines = [line for chunk in self._get_general_ledger_lines_chunks(options, line_id=line_id, aml_ids=aml_ids) for line in chunk]
+        if self.env.context.get('aml_only'):
+            return aml_ids
+        return lines
+
+    @api.model
+    def _get_general_ledger_lines_chunks(self, options, line_id=None, aml_ids=None):
+        ''' Get lines for the whole report or for a specific line, yielded by lists of about EXPORT_CHUNK_SIZE lines.
+        When printing the whole report, the sums are computed first then the journal items of each unfolded account
+        are fetched slice by slice (see '_get_general_ledger_amls_slices').
+        :param options: The report options.
+        :param aml_ids: An optional list in which the ids of the displayed account.move.line are appended.
+        :return:        A generator of lists of lines, each one represented by a dictionary.
+        '''
         lines = []
-        aml_lines = []
         options_list = self._get_options_periods_list(options)
-        unfold_all = options.get('unfold_all') or (self._context.get('print_mode') and not options['unfolded_lines'])
+        print_mode = self._context.get('print_mode')
+        fetch_by_slices = print_mode and not line_id
+        unfold_all = options.get('unfold_all') or (print_mode and not options['unfolded_lines'])
         date_from = fields.Date.from_string(options['date']['date_from'])
         company_currency = self.env.company.currency_id
 
         expanded_account = line_id and self.env['account.account'].browse(int(line_id[8:]))
-        accounts_results, taxes_results = self._do_query(options_list, expanded_account=expanded_account)
+        accounts_results, taxes_results = self._do_query(options_list, expanded_account=expanded_account, fetch_lines=not fetch_by_slices)
 
         total_debit = total_credit = total_balance = 0.0
         for account, periods_results in accounts_results:
@@ -133,22 +167,28 @@ class AccountGeneralLedgerReport(models.AbstractModel):
                 ))
 
                 # account.move.line record lines.
-                amls = results.get('lines', [])
-
-                load_more_remaining = len(amls)
-                load_more_counter = self._context.get('print_mode') and load_more_remaining or self.MAX_LINES
-
-                for aml in amls:
+                load_more_remaining = 0
+                if fetch_by_slices:
+                    amls_slices = self._get_general_ledger_amls_slices(options, account, cumulated_balance)
+                else:
+                    amls = results.get('lines', [])
                     # Don't show more line than load_more_counter.
-                    if load_more_counter == 0:
-                        break
-
-                    cumulated_balance += aml['balance']
-                    lines.append(self._get_aml_line(options, account, aml, company_currency.round(cumulated_balance)))
-
-                    load_more_remaining -= 1
-                    load_more_counter -= 1
-                    aml_lines.append(aml['id'])
+                    load_more_counter = print_mode and len(amls) or self.MAX_LINES
+                    load_more_remaining = max(len(amls) - load_more_counter, 0)
+                    amls_slices = [amls[:load_more_counter]]
+
+                last_aml = None
+                for amls in amls_slices:
+                    for aml in amls:
+                        cumulated_balance += aml['balance']
+                        lines.append(self._get_aml_line(options, account, aml, company_currency.round(cumulated_balance)))
+                        last_aml = aml
+                        if aml_ids is not None:
+                            aml_ids.append(aml['id'])
+
+                    if len(lines) >= self.EXPORT_CHUNK_SIZE:
+                        yield lines
+                        lines = []
 
                 if load_more_remaining > 0:
                     # Load more line.
@@ -157,6 +197,7 @@ class AccountGeneralLedgerReport(models.AbstractModel):
                         self.MAX_LINES,
                         load_more_remaining,
                         cumulated_balance,
+                        cursor=self._get_lines_cursor(last_aml, cumulated_balance),
                     ))
 
                 if self.env.company.totals_below_sections:
@@ -169,6 +210,10 @@ class AccountGeneralLedgerReport(models.AbstractModel):
                         account_sum.get('balance', 0.0),
                     ))
 
+            if len(lines) >= self.EXPORT_CHUNK_SIZE:
+                yield lines
+                lines = []
+
         if not line_id:
             # Report total line.
             lines.append(self._get_total_line(
@@ -184,17 +229,39 @@ class AccountGeneralLedgerReport(models.AbstractModel):
                 lines += self._get_tax_declaration_lines(
                     options, journal_options[0]['type'], taxes_results
                 )
-        if self.env.context.get('aml_only'):
-            return aml_lines
-        return lines
+        yield lines
 
     @api.model
-    def _load_more_lines(self, options, line_id, offset, load_more_remaining, balance_progress):
+    def _get_general_ledger_amls_slices(self, options, account, cumulated_balance):
+        ''' Fetch the journal items of an account by slices of EXPORT_CHUNK_SIZE, each slice starting right after the
+        last journal item of the previous one (see '_get_lines_cursor').
+        :param options:             The report options.
+        :param account:             The account.account record.
+        :param cumulated_balance:   The balance of the account before its first journal item.
+        :return:                    A generator of lists of journal items values.
+        '''
+        cursor = None
+        while True:
+            amls_query, amls_params = self._get_query_amls(options, account, limit=self.EXPORT_CHUNK_SIZE, cursor=cursor)
+            self._cr_execute(options, amls_query, amls_params)
+            amls = self._cr.dictfetchall()
+            yield amls
+            if len(amls) < self.EXPORT_CHUNK_SIZE:
+                break
+            for aml in amls:
+                cumulated_balance += aml['balance']
+            cursor = self._get_lines_cursor(amls[-1], cumulated_balance)
+
+    @api.model
+    def _load_more_lines(self, options, line_id, offset, load_more_remaining, balance_progress, cursor=None):
         ''' Get lines for an expanded line using the load more.
         :param options: The report options.
         :param line_id: string representing the line to expand formed as 'loadmore_<ID>'
         :params offset, load_more_remaining: integers. Parameters that will be used to fetch the next aml slice
         :param balance_progress: float used to carry on with the cumulative balance of the account.move.line
+        :param cursor:  The token of the last displayed account.move.line (see '_get_lines_cursor'). When set, the next
+                        slice is fetched right after this line instead of using the offset and the cumulative balance
+                        is taken from the token.
         :return:        A list of lines, each one represented by a dictionary.
         '''
         lines = []
@@ -203,8 +270,13 @@ class AccountGeneralLedgerReport(models.AbstractModel):
         load_more_counter = self.MAX_LINES
 
         # Fetch the next batch of lines.
-        amls_query, amls_params = self._get_query_amls(options, expanded_account, offset=offset, limit=load_more_counter)
+        if cursor:
+            balance_progress = json.loads(cursor)[3]
+            amls_query, amls_params = self._get_query_amls(options, expanded_account, limit=load_more_counter, cursor=cursor)
+        else:
+            amls_query, amls_params = self._get_query_amls(options, expanded_account, offset=offset, limit=load_more_counter)
         self._cr_execute(options, amls_query, amls_params)
+        last_aml = None
         for aml in self._cr.dictfetchall():
             # Don't show more line than load_more_counter.
             if load_more_counter == 0:
@@ -218,6 +290,7 @@ class AccountGeneralLedgerReport(models.AbstractModel):
             offset += 1
             load_more_remaining -= 1
             load_more_counter -= 1
+            last_aml = aml
 
         if load_more_remaining > 0:
             # Load more line.
@@ -226,6 +299,7 @@ class AccountGeneralLedgerReport(models.AbstractModel):
                 offset,
                 load_more_remaining,
                 balance_progress,
+                cursor=last_aml and self._get_lines_cursor(last_aml, balance_progress),
             ))
         return lines
 
@@ -531,13 +605,15 @@ class AccountGeneralLedgerReport(models.AbstractModel):
         return ' UNION ALL '.join(queries), params
 
     @api.model
-    def _get_query_amls(self, options, expanded_account, offset=None, limit=None):
+    def _get_query_amls(self, options, expanded_account, offset=None, limit=None, cursor=None):
         ''' Construct a query retrieving the account.move.lines when expanding a report line with or without the load
         more.
         :param options:             The report options.
         :param expanded_account:    The account.account record corresponding to the expanded line.
         :param offset:              The offset of the query (used by the load more).
         :param limit:               The limit of the query (used by the load more).
+        :param cursor:              An optional token returned by '_get_lines_cursor'. Only the lines coming after the
+                                    one it has been built from are retrieved.
         :return:                    (query, params)
         '''
 
@@ -589,8 +665,13 @@ class AccountGeneralLedgerReport(models.AbstractModel):
             LEFT JOIN account_journal journal           ON journal.id = account_move_line.journal_id
             LEFT JOIN account_full_reconcile full_rec   ON full_rec.id = account_move_line.full_reconcile_id
             WHERE %s
-            ORDER BY account_move_line.date, account_move_line.id
         ''' % (ct_query, where_clause)
+        if cursor:
+            # Keyset pagination: seek directly after the last fetched line using the
+            # account_move_line_account_id_date_move_name_id_idx index.
+            query += ' AND (account_move_line.date, account_move_line.move_name, account_move_line.id) > (%s, %s, %s) '
+            where_params += json.loads(cursor)[:3]
+        query += ' ORDER BY account_move_line.date, account_move_line.move_name, account_move_line.id '
         if offset:
             query += ' OFFSET %s '
             where_params.append(offset)
@@ -804,12 +885,22 @@ class AccountGeneralLedgerReport(models.AbstractModel):
         }
 
     @api.model
-    def _get_load_more_line(self, options, account, offset, remaining, progress):
+    def _get_lines_cursor(self, aml, progress):
+        ''' Build the token allowing the load more to fetch the lines following the given one.
+        :param aml:         The values of the last displayed account.move.line, as fetched by '_get_query_amls'.
+        :param progress:    The cumulative balance at this line.
+        :return:            A string.
+        '''
+        return json.dumps([fields.Date.to_string(aml['date']), aml['move_name'], aml['id'], progress])
+
+    @api.model
+    def _get_load_more_line(self, options, account, offset, remaining, progress, cursor=None):
         return {
             'id': 'loadmore_%s' % account.id,
             'offset': offset,
             'progress': progress,
             'remaining': remaining,
+            'cursor': cursor,
             'class': 'o_account_reports_load_more text-center',
             'parent_id': 'account_%s' % account.id,
             'name': _('Load more... (%s remaining)', remaining),
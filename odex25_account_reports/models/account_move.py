@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = "account.move"
+
+    def _post(self, soft=True):
+        # OVERRIDE to add the newly posted journal items to the balance snapshot.
+        posted = super(AccountMove, self.with_context(skip_balance_snapshot=True))._post(soft)
+        self.env['account.report.balance.snapshot'].sudo()._apply_move_lines(posted.line_ids.ids, 1)
+        return posted.with_env(self.env)
+
+    def button_draft(self):
+        # OVERRIDE to remove the journal items reset to draft from the balance snapshot.
+        self.env['account.report.balance.snapshot'].sudo()._apply_move_lines(self.filtered(lambda m: m.state == 'posted').line_ids.ids, -1)
+        return super(AccountMove, self.with_context(skip_balance_snapshot=True)).button_draft()
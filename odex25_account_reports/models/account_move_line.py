@@ -12,6 +12,25 @@ class AccountMoveLine(models.Model):
     internal_note = fields.Text('Internal Note', help="Note you can set through the customer statement about a receivable journal item")
     next_action_date = fields.Date('Next Action Date', help="Date where the next action should be taken for a receivable item. Usually, automatically set when sending reminders through the customer statement.")
 
+    def init(self):
+        super().init()
+        # Backs the ordering and the keyset pagination of the general ledger (see account.general.ledger._get_query_amls).
+        self._cr.execute('''
+            CREATE INDEX IF NOT EXISTS account_move_line_account_id_date_move_name_id_idx
+            ON account_move_line (account_id, date, move_name, id)
+        ''')
+
+    def write(self, vals):
+        # OVERRIDE to keep the balance snapshot up-to-date when posted journal items are modified.
+        snapshot = self.env['account.report.balance.snapshot'].sudo()
+        if snapshot._snapshot_columns.isdisjoint(vals) or self._context.get('skip_balance_snapshot'):
+            return super().write(vals)
+        posted_line_ids = self.filtered(lambda line: line.parent_state == 'posted').ids
+        snapshot._apply_move_lines(posted_line_ids, -1)
+        res = super().write(vals)
+        snapshot._apply_move_lines(posted_line_ids, 1)
+        return res
+
     def write_blocked(self, blocked):
         """ This function is used to change the 'blocked' status of an aml.
             You need to be able to change it even if the aml is locked by the lock date
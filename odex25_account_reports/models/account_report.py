@@ -6,7 +6,9 @@ import json
 import io
 import logging
 import lxml.html
+import re
 import datetime
+import tempfile
 import ast
 from collections import defaultdict
 from math import copysign
@@ -51,6 +53,8 @@ class AccountReport(models.AbstractModel):
     _description = 'Account Report'
 
     MAX_LINES = 80
+    # Number of lines a report should produce at once when exported through '_get_lines_chunks'.
+    EXPORT_CHUNK_SIZE = 5000
     filter_multi_company = True
     filter_date = None
     filter_all_entries = None
@@ -660,7 +664,20 @@ class AccountReport(models.AbstractModel):
         return self._cr.execute(query, params)
 
     @api.model
-    def _query_get(self, options, domain=None):
+    def _query_get(self, options, domain=None, snapshot=False):
+        ''' Build the FROM/WHERE clauses to fetch the journal items matching the options and the domain.
+        :param options:     The report options.
+        :param domain:      An additional domain on account.move.line.
+        :param snapshot:    Allow reading the month-level totals of account.report.balance.snapshot instead of the
+                            journal items when the options and the domain permit it. Only callers aggregating the
+                            'debit', 'credit' and 'balance' columns should enable it.
+        :return:            A (tables, where_clause, where_params) triplet.
+        '''
+        if snapshot:
+            res = self._query_get_snapshot(options, domain=domain)
+            if res:
+                return res
+
         domain = self._get_options_domain(options) + (domain or [])
         self.env['account.move.line'].check_access_rights('read')
 
@@ -671,6 +688,55 @@ class AccountReport(models.AbstractModel):
 
         return query.get_sql()
 
+    @api.model
+    def _query_get_snapshot(self, options, domain=None):
+        ''' Same as '_query_get' but reading from account.report.balance.snapshot. The snapshot table is aliased as
+        "account_move_line" so the queries of the callers don't need to be adapted.
+
+        The snapshot can't be used when the options need draft entries, when the dates are not month boundaries or
+        when the domain (or a record rule) references a column not stored in the snapshot. In such cases, the journal
+        items are still read from account_move_line.
+
+        :param options: The report options.
+        :param domain:  An additional domain on account.move.line.
+        :return:        A (tables, where_clause, where_params) triplet or None if the snapshot can't be used.
+        '''
+        if self._context.get('no_balance_snapshot') or options.get('all_entries') or options.get('cash_basis'):
+            return None
+
+        options_date = options.get('date') or {}
+        if options_date.get('date_field', 'date') != 'date':
+            return None
+        if options_date.get('date_to'):
+            date_to = fields.Date.from_string(options_date['date_to'])
+            if date_to != date_utils.end_of(date_to, 'month'):
+                return None
+        if options_date.get('mode') == 'range' and options_date.get('date_from'):
+            if fields.Date.from_string(options_date['date_from']).day != 1:
+                return None
+
+        snapshot_domain = []
+        for leaf in self._get_options_domain(options) + (domain or []):
+            if expression.is_leaf(leaf) and leaf[0] == 'move_id.state':
+                leaf = ('parent_state', leaf[1], leaf[2])
+            elif expression.is_leaf(leaf) and leaf[0] == 'display_type':
+                # Sections and notes are never part of the snapshot.
+                leaf = expression.TRUE_LEAF
+            snapshot_domain.append(leaf)
+
+        AccountMoveLine = self.env['account.move.line']
+        AccountMoveLine.check_access_rights('read')
+        query = AccountMoveLine._where_calc(snapshot_domain)
+        AccountMoveLine._apply_ir_rules(query)
+        tables, where_clause, where_params = query.get_sql()
+
+        columns = set(re.findall(r'"account_move_line"\."(\w+)"', where_clause))
+        if tables != '"account_move_line"' \
+                or 'FROM "account_move_line"' in where_clause \
+                or not columns <= self.env['account.report.balance.snapshot']._snapshot_columns:
+            return None
+        return '"account_report_balance_snapshot" AS "account_move_line"', where_clause, where_params
+
     ####################################################
     # MISC
     ####################################################
@@ -695,10 +761,23 @@ class AccountReport(models.AbstractModel):
     def _get_lines(self, options, line_id=None):
         return []
 
+    #TO BE OVERWRITTEN
+    def _get_lines_chunks(self, options, line_id=None):
+        ''' Generator flavour of '_get_lines' used by the exports: the lines are yielded as successive lists of at most
+        EXPORT_CHUNK_SIZE lines (more or less) so that a report fetching its data piecewise never holds all of them in
+        memory. By default, the whole result of '_get_lines' is yielded at once.
+        '''
+        yield self._get_lines(options, line_id=line_id)
+
     #TO BE OVERWRITTEN
     def _get_table(self, options):
         return self.get_header(options), self._get_lines(options)
 
+    #TO BE OVERWRITTEN
+    def _get_table_chunks(self, options):
+        ''' Same as '_get_table' but the lines are returned as an iterable of lists of lines (see '_get_lines_chunks'). '''
+        return self.get_header(options), self._get_lines_chunks(options)
+
     #TO BE OVERWRITTEN
     def _get_templates(self):
         return {
@@ -1394,8 +1473,32 @@ class AccountReport(models.AbstractModel):
                 }
 
     def get_xlsx(self, options, response=None):
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+        with tempfile.TemporaryFile() as output:
+            self._write_xlsx(options, output)
+            output.seek(0)
+            return output.read()
+
+    def get_xlsx_file(self, options):
+        ''' Export the report to xlsx in a temporary file, ready to be streamed to the user.
+        :param options: The report options.
+        :return:        A file object positioned at its beginning. The caller is responsible for closing it.
+        '''
+        output = tempfile.TemporaryFile()
+        try:
+            self._write_xlsx(options, output)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return output
+
+    def _write_xlsx(self, options, output):
+        ''' Write the report as a xlsx workbook into the given file object.
+        The workbook is opened in 'constant_memory' mode: each row is flushed to disk as soon as the next one is
+        started and the lines are consumed chunk by chunk from '_get_table_chunks'. This keeps the memory bounded
+        whatever the size of the report, as long as the report is able to produce its lines piecewise.
+        '''
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
         sheet = workbook.add_worksheet(self._get_report_name()[:31])
 
         date_default_col1_style = workbook.add_format({'font_name': 'Arial', 'font_size': 12, 'font_color': '#666666', 'indent': 2, 'num_format': 'yyyy-mm-dd'})
@@ -1416,7 +1519,7 @@ class AccountReport(models.AbstractModel):
         sheet.set_column(0, 0, 50)
 
         y_offset = 0
-        headers, lines = self.with_context(no_format=True, print_mode=True, prefetch_fields=False)._get_table(options)
+        headers, lines_chunks = self.with_context(no_format=True, print_mode=True, prefetch_fields=False)._get_table_chunks(options)
 
         # Add headers.
         for header in headers:
@@ -1431,55 +1534,56 @@ class AccountReport(models.AbstractModel):
                 x_offset += colspan
             y_offset += 1
 
-        if options.get('hierarchy'):
-            lines = self._create_hierarchy(lines, options)
-        if options.get('selected_column'):
-            lines = self._sort_lines(lines, options)
+        if options.get('hierarchy') or options.get('selected_column'):
+            # Both the hierarchy and the sorting need the whole set of lines.
+            lines = [line for lines in lines_chunks for line in lines]
+            if options.get('hierarchy'):
+                lines = self._create_hierarchy(lines, options)
+            if options.get('selected_column'):
+                lines = self._sort_lines(lines, options)
+            lines_chunks = [lines]
 
         # Add lines.
-        for y in range(0, len(lines)):
-            level = lines[y].get('level')
-            if lines[y].get('caret_options'):
-                style = level_3_style
-                col1_style = level_3_col1_style
-            elif level == 0:
-                y_offset += 1
-                style = level_0_style
-                col1_style = style
-            elif level == 1:
-                style = level_1_style
-                col1_style = style
-            elif level == 2:
-                style = level_2_style
-                col1_style = 'total' in lines[y].get('class', '').split(' ') and level_2_col1_total_style or level_2_col1_style
-            elif level == 3:
-                style = level_3_style
-                col1_style = 'total' in lines[y].get('class', '').split(' ') and level_3_col1_total_style or level_3_col1_style
-            else:
-                style = default_style
-                col1_style = default_col1_style
-
-            #write the first column, with a specific style to manage the indentation
-            cell_type, cell_value = self._get_cell_type_value(lines[y])
-            if cell_type == 'date':
-                sheet.write_datetime(y + y_offset, 0, cell_value, date_default_col1_style)
-            else:
-                sheet.write(y + y_offset, 0, cell_value, col1_style)
+        for lines in lines_chunks:
+            for line in lines:
+                level = line.get('level')
+                if line.get('caret_options'):
+                    style = level_3_style
+                    col1_style = level_3_col1_style
+                elif level == 0:
+                    y_offset += 1
+                    style = level_0_style
+                    col1_style = style
+                elif level == 1:
+                    style = level_1_style
+                    col1_style = style
+                elif level == 2:
+                    style = level_2_style
+                    col1_style = 'total' in line.get('class', '').split(' ') and level_2_col1_total_style or level_2_col1_style
+                elif level == 3:
+                    style = level_3_style
+                    col1_style = 'total' in line.get('class', '').split(' ') and level_3_col1_total_style or level_3_col1_style
+                else:
+                    style = default_style
+                    col1_style = default_col1_style
 
-            #write all the remaining cells
-            for x in range(1, len(lines[y]['columns']) + 1):
-                cell_type, cell_value = self._get_cell_type_value(lines[y]['columns'][x - 1])
+                #write the first column, with a specific style to manage the indentation
+                cell_type, cell_value = self._get_cell_type_value(line)
                 if cell_type == 'date':
-                    sheet.write_datetime(y + y_offset, x + lines[y].get('colspan', 1) - 1, cell_value, date_default_style)
+                    sheet.write_datetime(y_offset, 0, cell_value, date_default_col1_style)
                 else:
-                    sheet.write(y + y_offset, x + lines[y].get('colspan', 1) - 1, cell_value, style)
+                    sheet.write(y_offset, 0, cell_value, col1_style)
 
-        workbook.close()
-        output.seek(0)
-        generated_file = output.read()
-        output.close()
+                #write all the remaining cells
+                for x in range(1, len(line['columns']) + 1):
+                    cell_type, cell_value = self._get_cell_type_value(line['columns'][x - 1])
+                    if cell_type == 'date':
+                        sheet.write_datetime(y_offset, x + line.get('colspan', 1) - 1, cell_value, date_default_style)
+                    else:
+                        sheet.write(y_offset, x + line.get('colspan', 1) - 1, cell_value, style)
+                y_offset += 1
 
-        return generated_file
+        workbook.close()
 
     def _get_cell_type_value(self, cell):
         if 'date' not in cell.get('class', '') or not cell.get('name'):
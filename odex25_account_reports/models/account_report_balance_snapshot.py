@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AccountReportBalanceSnapshot(models.Model):
+    ''' Month-level aggregate of the posted journal items.
+
+    Each row holds the totals of the posted account.move.line sharing the same company, account, journal, partner,
+    analytic account, tax exigibility and month. The columns are named like the ones of account_move_line so the
+    table can be aliased as "account_move_line" inside the report queries (see account.report._query_get) when the
+    report only needs totals.
+
+    The table is kept up-to-date incrementally: the amounts of the journal items are added to their row when they are
+    posted and subtracted when they are reset to draft. The journal items modified once posted are subtracted before
+    the modification and added back after it.
+    '''
+    _name = 'account.report.balance.snapshot'
+    _description = 'Accounting Report Balance Snapshot'
+    _log_access = False
+
+    company_id = fields.Many2one('res.company', required=True, readonly=True)
+    account_id = fields.Many2one('account.account', required=True, readonly=True)
+    journal_id = fields.Many2one('account.journal', readonly=True)
+    partner_id = fields.Many2one('res.partner', readonly=True)
+    analytic_account_id = fields.Many2one('account.analytic.account', readonly=True)
+    date = fields.Date(required=True, readonly=True, help="First day of the month the journal items belong to.")
+    parent_state = fields.Char(readonly=True)
+    tax_exigible = fields.Boolean(readonly=True)
+    debit = fields.Monetary(readonly=True, currency_field='company_currency_id')
+    credit = fields.Monetary(readonly=True, currency_field='company_currency_id')
+    balance = fields.Monetary(readonly=True, currency_field='company_currency_id')
+    company_currency_id = fields.Many2one('res.currency', readonly=True)
+    line_count = fields.Integer(readonly=True)
+
+    # Columns the report queries are allowed to reference when reading from the snapshot.
+    _snapshot_columns = {
+        'company_id', 'account_id', 'journal_id', 'partner_id', 'analytic_account_id', 'date', 'parent_state',
+        'tax_exigible', 'debit', 'credit', 'balance', 'company_currency_id',
+    }
+
+    # Expressions of the unique index identifying a row, used as the conflict target when adding journal items.
+    _snapshot_key = [
+        'company_id', 'account_id', 'date', 'COALESCE(journal_id, 0)', 'COALESCE(partner_id, 0)',
+        'COALESCE(analytic_account_id, 0)', 'COALESCE(tax_exigible, FALSE)', 'COALESCE(company_currency_id, 0)',
+    ]
+
+    def init(self):
+        self._cr.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS account_report_balance_snapshot_key_idx
+            ON account_report_balance_snapshot (%s)
+        ''' % ', '.join(self._snapshot_key))
+        self._cr.execute('SELECT 1 FROM account_report_balance_snapshot LIMIT 1')
+        if not self._cr.fetchone():
+            self._rebuild()
+
+    # -------------------------------------------------------------------------
+    # MAINTENANCE
+    # -------------------------------------------------------------------------
+
+    def _get_insert_query(self, where_clause):
+        ''' Build the query adding the amounts of the posted journal items to the snapshot rows, multiplied by the
+        %(sign)s parameter.
+        :param where_clause:    An additional SQL condition on "account_move_line".
+        :return:                The INSERT query as a string, returning the id and the line count of the rows.
+        '''
+        return '''
+            INSERT INTO account_report_balance_snapshot AS snapshot (
+                company_id, account_id, journal_id, partner_id, analytic_account_id, date, parent_state,
+                tax_exigible, debit, credit, balance, company_currency_id, line_count
+            )
+            SELECT
+                account_move_line.company_id,
+                account_move_line.account_id,
+                account_move_line.journal_id,
+                account_move_line.partner_id,
+                account_move_line.analytic_account_id,
+                DATE_TRUNC('month', account_move_line.date)::date,
+                'posted',
+                COALESCE(account_move_line.tax_exigible, FALSE),
+                %(sign)s * SUM(account_move_line.debit),
+                %(sign)s * SUM(account_move_line.credit),
+                %(sign)s * SUM(account_move_line.balance),
+                account_move_line.company_currency_id,
+                %(sign)s * COUNT(*)
+            FROM account_move_line
+            WHERE account_move_line.parent_state = 'posted'
+            AND account_move_line.account_id IS NOT NULL
+            AND ''' + where_clause + '''
+            GROUP BY
+                account_move_line.company_id,
+                account_move_line.account_id,
+                account_move_line.journal_id,
+                account_move_line.partner_id,
+                account_move_line.analytic_account_id,
+                DATE_TRUNC('month', account_move_line.date),
+                COALESCE(account_move_line.tax_exigible, FALSE),
+                account_move_line.company_currency_id
+            -- Lock the existing rows always in the same order to avoid deadlocks between concurrent postings.
+            ORDER BY
+                account_move_line.company_id,
+                account_move_line.account_id,
+                DATE_TRUNC('month', account_move_line.date),
+                COALESCE(account_move_line.journal_id, 0),
+                COALESCE(account_move_line.partner_id, 0),
+                COALESCE(account_move_line.analytic_account_id, 0),
+                COALESCE(account_move_line.tax_exigible, FALSE),
+                COALESCE(account_move_line.company_currency_id, 0)
+            ON CONFLICT (''' + ', '.join(self._snapshot_key) + ''')
+            DO UPDATE SET
+                debit = snapshot.debit + excluded.debit,
+                credit = snapshot.credit + excluded.credit,
+                balance = snapshot.balance + excluded.balance,
+                line_count = snapshot.line_count + excluded.line_count
+            RETURNING snapshot.id, snapshot.line_count
+        '''
+
+    @api.model
+    def _rebuild(self):
+        ''' Recompute the whole snapshot from account_move_line. '''
+        self.env['account.move.line'].flush()
+        self._cr.execute('TRUNCATE account_report_balance_snapshot')
+        self._cr.execute(self._get_insert_query('TRUE'), {'sign': 1})
+        _logger.info('Balance snapshot rebuilt: %s rows.', self._cr.rowcount)
+        self.invalidate_cache()
+
+    @api.model
+    def _apply_move_lines(self, move_line_ids, sign):
+        ''' Add the amounts of some posted journal items to the snapshot, or subtract them.
+        :param move_line_ids:   The ids of account.move.line records. The ones not posted are ignored.
+        :param sign:            1 to add the journal items, -1 to subtract them.
+        '''
+        if not move_line_ids:
+            return
+        self.env['account.move.line'].flush(['company_id', 'account_id', 'journal_id', 'partner_id', 'analytic_account_id', 'date', 'parent_state', 'tax_exigible', 'debit', 'credit', 'balance'])
+        self._cr.execute(self._get_insert_query('account_move_line.id IN %(move_line_ids)s'), {
+            'sign': sign,
+            'move_line_ids': tuple(move_line_ids),
+        })
+        empty_ids = [snapshot_id for snapshot_id, line_count in self._cr.fetchall() if not line_count]
+        if empty_ids:
+            self._cr.execute('DELETE FROM account_report_balance_snapshot WHERE id IN %s', [tuple(empty_ids)])
+        self.invalidate_cache()
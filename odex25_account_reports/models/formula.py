@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo.tools.safe_eval import safe_eval
+from odoo import _
+from odoo.exceptions import UserError
+from odoo.tools.safe_eval import _BUILTINS
 from odoo.tools import DEFAULT_SERVER_DATE_FORMAT
 
 from datetime import datetime
 import re
-import ast
 
 
 PROTECTED_KEYWORDS = (
@@ -14,6 +15,9 @@ PROTECTED_KEYWORDS = (
     '__builtins__'
 )
 
+# Keywords making a financial line a leaf, i.e. its formula is computed from the journal items.
+LEAF_KEYWORDS = ('sum', 'sum_if_pos', 'sum_if_neg')
+
 
 class FormulaLocals(dict):
     ''' Class to set as "locals" when evaluating the formula to compute all formula.
@@ -36,7 +40,7 @@ class FormulaLocals(dict):
         elif item in ('sum', 'sum_if_pos', 'sum_if_neg'):
             return self.solver._get_amls_results(self.financial_line)[item].get(self.key, 0.0)
         else:
-            financial_line = self.solver._get_line_by_code(item)
+            financial_line = self.solver.cache_line_by_code.get(item)
             if not financial_line:
                 return super().__getitem__(item)
             return self.solver._get_formula_results(financial_line).get(self.key, 0.0)
@@ -52,6 +56,9 @@ class FormulaSolver:
         # to avoid redundant search.
         self.cache_line_by_code = {}
 
+        # The names found in formulas not matching any financial.report.line's code, e.g. 'abs' or 'max'.
+        self.cache_unknown_codes = set()
+
         # A mapping of financial.report.line's id with a dictionary containing all gathered data during the evaluation
         # of the formulas. Such dictionaries looks like:
         # {
@@ -89,6 +96,14 @@ class FormulaSolver:
     # PRIVATE METHODS
     # -------------------------------------------------------------------------
 
+    def _get_formula(self, financial_line):
+        ''' Get the parsed and compiled formula of a financial report line (see '_get_compiled_formula').
+        :param financial_line:  A record of the account.financial.html.report.line model.
+        :return:                A tuple (names, code) where 'names' is the set of names used by the formula and 'code'
+                                the compiled formula, ready to be evaluated.
+        '''
+        return financial_line._get_compiled_formula()
+
     def _eval_formula(self, financial_line, key):
         ''' Evaluate the current formula using the custom object passed as parameter as locals.
         :param financial_line:  A record of the account.financial.html.report.line model.
@@ -96,51 +111,88 @@ class FormulaSolver:
                                 Suppose you are evaluating the formula for 'partner_id'=3 for the first comparison, the
                                 key will be (1, 3).
         '''
-        if not financial_line.formulas:
+        code = self._get_formula(financial_line)[1]
+        if not code:
             return 0.0
 
         try:
-            return safe_eval(financial_line.formulas, globals_dict=FormulaLocals(self, financial_line, key), nocopy=True)
+            # pylint: disable=eval-used,eval-referenced
+            return eval(code, {'__builtins__': _BUILTINS}, FormulaLocals(self, financial_line, key))
         except ZeroDivisionError:
             return 0.0
 
-    def _get_line_by_code(self, line_code):
-        ''' Retrieve an account.financial.html.report.line record from its code.
-        If the financial line is not already known, a search is made and its formula is directly evaluated to collect
-        all involved keys by this newly added line.
-        :param line_code:   The code that could be owned by the account.financial.html.report.line record.
-        :return:            An account.financial.html.report.line recordset having 0 or 1 as arity.
+    def _get_dependencies_order(self, financial_line):
+        ''' Sort the lines involved in the formula of the given line in a topological order, i.e. each line comes
+        after the lines used in its formula.
+        :param financial_line:  A record of the account.financial.html.report.line model.
+        :return:                A list of account.financial.html.report.line records, ending with the given line.
         '''
-        if line_code in self.cache_line_by_code:
-            # Line is already cached.
-            return self.cache_line_by_code[line_code]
-        else:
-            # Fetch line.
-            financial_line = self.env['account.financial.html.report.line'].search([('code', '=', line_code)], limit=1)
-
-            if financial_line:
-                self._prefetch_line(financial_line)
-
-            return financial_line
+        ordered_lines = []
+        visited_ids = set()
+        in_progress_ids = set()
+        stack = [(financial_line, False)]
+        while stack:
+            line, children_done = stack.pop()
+            if children_done:
+                in_progress_ids.discard(line.id)
+                ordered_lines.append(line)
+                continue
+            if line.id in visited_ids:
+                continue
+            if line.id in in_progress_ids:
+                raise UserError(_("The formula of the line '%s' references itself.") % line.name)
+            visited_ids.add(line.id)
+            in_progress_ids.add(line.id)
+            stack.append((line, True))
+            for code in self.cache_results_by_id.get(line.id, {}).get('sub_codes', ()):
+                sub_line = self.cache_line_by_code[code]
+                if sub_line.id in in_progress_ids:
+                    raise UserError(_("The formula of the line '%s' references itself.") % sub_line.name)
+                if sub_line.id not in visited_ids:
+                    stack.append((sub_line, False))
+        return ordered_lines
 
     def _get_formula_results(self, financial_line):
         ''' Get or compute the 'formula' results of a financial report line (see 'cache_results_by_id').
+        The lines used by the formula are evaluated first so that each formula is evaluated only once per key.
         :param financial_line:  A record of the account.financial.html.report.line model.
         :return: see 'cache_results_by_id', 'formula' key.
         '''
         self.cache_results_by_id.setdefault(financial_line.id, {})
 
         if 'formula' not in self.cache_results_by_id[financial_line.id]:
-            results = {}
-            if financial_line.formulas:
-                for key in self.encountered_keys:
-                    # Compute formula for each key.
-                    results[key] = self._eval_formula(financial_line, key)
-
-            self.cache_results_by_id[financial_line.id]['formula'] = results
+            for line in self._get_dependencies_order(financial_line):
+                line_cache = self.cache_results_by_id.setdefault(line.id, {})
+                if 'formula' in line_cache:
+                    continue
+                results = {}
+                if line.formulas:
+                    for key in self.encountered_keys:
+                        # Compute formula for each key.
+                        results[key] = self._eval_formula(line, key)
+                line_cache['formula'] = results
 
         return self.cache_results_by_id[financial_line.id]['formula']
 
+    def _set_amls_results(self, financial_line, results):
+        ''' Store the results of '_compute_sum' as the 'amls' results of a financial report line.
+        :param financial_line:  A record of the account.financial.html.report.line model.
+        :param results:         The results of '_compute_sum' for this line.
+        '''
+        for key in results['sum']:
+            self.encountered_keys.add(key)
+
+        # Detect the sign of the 'sum' formula. The sign is only negative when the formula is '-sum'.
+        # In this specific case, the balance of unfolded lines will be negate.
+
+        if financial_line.formulas and re.search(r'-\s*sum', financial_line.formulas):
+            results['sign'] = -1
+        else:
+            results['sign'] = 1
+
+        self.cache_results_by_id.setdefault(financial_line.id, {})
+        self.cache_results_by_id[financial_line.id]['amls'] = results
+
     def _get_amls_results(self, financial_line):
         ''' Get or compute the 'amls' results of a financial report line (see 'cache_results_by_id').
         :param financial_line:  A record of the account.financial.html.report.line model.
@@ -154,72 +206,65 @@ class FormulaSolver:
             # If this line is visited for the first time, trigger the computation of '_compute_sum' and
             # cache the results.
 
-            results = financial_line._compute_sum(self.options_list)
-            for key in results['sum']:
-                self.encountered_keys.add(key)
-
-            # Detect the sign of the 'sum' formula. The sign is only negative when the formula is '-sum'.
-            # In this specific case, the balance of unfolded lines will be negate.
-
-            if financial_line.formulas and re.search(r'-\s*sum', financial_line.formulas):
-                results['sign'] = -1
-            else:
-                results['sign'] = 1
-
-            self.cache_results_by_id[financial_line.id]['amls'] = results
+            self._set_amls_results(financial_line, financial_line._compute_sum(self.options_list))
 
         return self.cache_results_by_id[financial_line.id]['amls']
 
-    def _prefetch_line(self, financial_line):
-        ''' Ensure all leaves that depends of this line are evaluated.
+    def _prefetch_lines(self, financial_lines):
+        ''' Ensure all leaves that depends of these lines are evaluated.
         E.g. if the formula is 'A + B', make sure 'A' and 'B' are also fetch.
-        If 'A' is a leaf, its formula will be evaluated directly.
-        :param financial_line:  A record of the account.financial.html.report.line model.
-        '''
-        # 'code' is not a required field.
-        if financial_line.code:
-            self.cache_line_by_code[financial_line.code] = financial_line
-
-        self.cache_results_by_id.setdefault(financial_line.id, {})
-
-        if not financial_line.formulas:
-            return
-
-        class LeafResolver(ast.NodeTransformer):
-            # Helper class to iterate through the AST without evaluating the formulas, only leaves.
-            #
-            # Suppose you are dealing with a group by on the 'partner_id' field and the formula is "COS + OPINC" for
-            # the current line and "sum" for the COS & OPINC lines.
-            # Before evaluating "COS + OPINC", you need to know all the involved 'partner_id' by the formula
-            # recursively.
-            #
-            # E.g. "COS" involves partner_id=1 & partner=2, "OPINC" involves partner_id=3 & partner_id=4.
-            # It means you need to evaluate "COS" & "OPINC" before evaluating "COS + OPINC" to know the formulas will
-            # involve partner_id = 1,2,3,4.
-
-            def __init__(self, solver, financial_line):
-                self.solver = solver
-                self.financial_line = financial_line
-
-            def visit_Name(self, node):
-                if node.id in ('sum', 'sum_if_pos', 'sum_if_neg'):
-                    # The current line contains a 'sum' and then, must be evaluate directly.
-                    self.solver._get_amls_results(self.financial_line)
-                else:
 
-                    # Iterate sub-formula recursively. If the line is not already computed, it will trigger a new
-                    # '_prefetch_line'.
-                    financial_line = self.solver._get_line_by_code(node.id)
+        Suppose you are dealing with a group by on the 'partner_id' field and the formula is "COS + OPINC" for
+        the current line and "sum" for the COS & OPINC lines.
+        Before evaluating "COS + OPINC", you need to know all the involved 'partner_id' by the formula
+        recursively.
 
-                    # Track the involved codes inside the formula. Suppose a line 'A' having 'B + C' as formula.
-                    # We need to know 'B' and 'C' are used by the 'A' formula.
-                    if financial_line:
-                        self.solver.cache_results_by_id[self.financial_line.id].setdefault('sub_codes', set())
-                        self.solver.cache_results_by_id[self.financial_line.id]['sub_codes'].add(financial_line.code)
+        E.g. "COS" involves partner_id=1 & partner=2, "OPINC" involves partner_id=3 & partner_id=4.
+        It means you need to evaluate "COS" & "OPINC" before evaluating "COS + OPINC" to know the formulas will
+        involve partner_id = 1,2,3,4.
 
-                return node
+        The formulas are parsed once, the unknown codes are searched together level by level and the sums of all
+        the leaves are computed using a single query.
 
-        LeafResolver(self, financial_line).visit(ast.parse(financial_line.formulas))
+        :param financial_lines: An account.financial.html.report.line recordset.
+        '''
+        FinancialLine = self.env['account.financial.html.report.line']
+        visited_lines = FinancialLine
+        leaves = FinancialLine
+        while financial_lines:
+            unknown_codes = set()
+            for financial_line in financial_lines:
+                # 'code' is not a required field.
+                if financial_line.code:
+                    self.cache_line_by_code[financial_line.code] = financial_line
+                self.cache_results_by_id.setdefault(financial_line.id, {})
+
+                names = self._get_formula(financial_line)[0]
+                if names.intersection(LEAF_KEYWORDS) and 'amls' not in self.cache_results_by_id[financial_line.id]:
+                    # The current line contains a 'sum' and then, must be evaluate directly.
+                    leaves |= financial_line
+                unknown_codes |= names
+            visited_lines |= financial_lines
+
+            unknown_codes -= set(PROTECTED_KEYWORDS)
+            unknown_codes -= set(self.cache_line_by_code)
+            unknown_codes -= self.cache_unknown_codes
+            financial_lines = FinancialLine
+            if unknown_codes:
+                financial_lines = FinancialLine.search([('code', 'in', list(unknown_codes))])
+                self.cache_unknown_codes |= unknown_codes - set(financial_lines.mapped('code'))
+
+        # Track the involved codes inside the formula. Suppose a line 'A' having 'B + C' as formula.
+        # We need to know 'B' and 'C' are used by the 'A' formula.
+        for financial_line in visited_lines:
+            sub_codes = {name for name in self._get_formula(financial_line)[0] if name in self.cache_line_by_code}
+            if sub_codes:
+                self.cache_results_by_id[financial_line.id].setdefault('sub_codes', set())
+                self.cache_results_by_id[financial_line.id]['sub_codes'] |= sub_codes
+
+        results_by_line = leaves._compute_sums(self.options_list)
+        for leaf in leaves:
+            self._set_amls_results(leaf, results_by_line[leaf.id])
 
     def _get_number_of_days(self, period_index):
         ''' Helper to compute the NDays value that could be used inside formulas. This key returns the number of days
@@ -250,7 +295,7 @@ class FormulaSolver:
         :return: see 'cache_results_by_id' for more details.
         '''
         if financial_line.id not in self.cache_results_by_id:
-            # The financial line has not pre-computed using '_prefetch_line'. Then, it could lead to some
+            # The financial line has not pre-computed using '_prefetch_lines'. Then, it could lead to some
             # wrong values.
             return {}
 
@@ -264,12 +309,11 @@ class FormulaSolver:
         The lines involved through a formula will also be prefetched.
         :param financial_lines: An account.financial.html.report.line recordset.
         '''
-        children_financial_lines = self.env['account.financial.html.report.line']
-        for financial_line in financial_lines:
-            self._prefetch_line(financial_line)
-            children_financial_lines += financial_line.children_ids
-        if children_financial_lines:
-            self.fetch_lines(children_financial_lines)
+        all_financial_lines = self.env['account.financial.html.report.line']
+        while financial_lines:
+            all_financial_lines |= financial_lines
+            financial_lines = financial_lines.children_ids
+        self._prefetch_lines(all_financial_lines)
 
     def get_keys(self):
         ''' Get all involved keys found in the solver. '''
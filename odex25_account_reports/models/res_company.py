@@ -64,7 +64,12 @@ class ResCompany(models.Model):
             or values.get('account_tax_periodicity_journal_id', company.account_tax_periodicity_journal_id.id) != company.account_tax_periodicity_journal_id.id):
                 values['account_tax_original_periodicity_reminder_day'] = False
 
-        return super(ResCompany, self).write(values)
+        res = super(ResCompany, self).write(values)
+
+        # The invoicing switch threshold moves journal items between the 'posted' and 'cancel' states in SQL.
+        if 'invoicing_switch_threshold' in values:
+            self.env['account.report.balance.snapshot'].sudo()._rebuild()
+        return res
 
     def _update_account_tax_periodicity_reminder_day(self):
         self.ensure_one()
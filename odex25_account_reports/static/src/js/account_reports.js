@@ -971,7 +971,9 @@ var accountReportsWidget = AbstractAction.extend({
         var offset = $line.data('offset') || 0;
         var progress = $line.data('progress') || 0;
         var remaining = $line.data('remaining') || 0;
-        var options = _.extend({}, this.report_options, {lines_offset: offset, lines_progress: progress, lines_remaining: remaining});
+        // Read the raw attribute: the cursor is an opaque token jQuery would parse as JSON.
+        var cursor = $line.attr('data-cursor') || false;
+        var options = _.extend({}, this.report_options, {lines_offset: offset, lines_progress: progress, lines_remaining: remaining, lines_cursor: cursor});
         var self = this;
         this._rpc({
                 model: this.report_model,
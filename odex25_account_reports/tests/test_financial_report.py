@@ -359,3 +359,44 @@ class TestFinancialReport(TestAccountReportsCommon):
                 ('Total Receivables',                       1000.0,             1000.0,             50.0,               1000.0,             1000.0,             0.0),
             ],
         )
+
+    def test_financial_report_balance_snapshot(self):
+        line_id = self.env.ref('odex25_account_reports.account_financial_report_bank_view0').id
+        options = self._init_options(self.report, fields.Date.from_string('2019-01-01'), fields.Date.from_string('2019-12-31'))
+        options['unfolded_lines'] = [line_id]
+        options.pop('multi_company', None)
+
+        # Month boundaries: the totals are read from the snapshot.
+        tables, where_clause, where_params = self.report._query_get(options, snapshot=True)
+        self.assertEqual(tables, '"account_report_balance_snapshot" AS "account_move_line"')
+
+        # Not a month boundary or draft entries requested: fallback on the journal items.
+        options_mid_month = self._init_options(self.report, fields.Date.from_string('2019-01-01'), fields.Date.from_string('2019-12-15'))
+        tables, where_clause, where_params = self.report._query_get(options_mid_month, snapshot=True)
+        self.assertEqual(tables, '"account_move_line"')
+        tables, where_clause, where_params = self.report._query_get({**options, 'all_entries': True}, snapshot=True)
+        self.assertNotIn('account_report_balance_snapshot', tables)
+
+        expected_lines = [
+            ('Bank and Cash Accounts',                      -1300.0),
+            ('code2 account2',                              -1300.0),
+            ('Total Bank and Cash Accounts',                -1300.0),
+        ]
+        self.assertLinesValues(self.report._get_lines(options, line_id=line_id), [0, 1], expected_lines)
+        self.assertLinesValues(
+            self.report.with_context(no_balance_snapshot=True)._get_lines(options, line_id=line_id),
+            [0, 1],
+            expected_lines,
+        )
+
+        # Resetting an entry to draft removes it from the snapshot.
+        self.move_2019.button_draft()
+        self.assertLinesValues(
+            self.report._get_lines(options, line_id=line_id),
+            [0, 1],
+            [
+                ('Bank and Cash Accounts',                  -1000.0),
+                ('code2 account2',                          -1000.0),
+                ('Total Bank and Cash Accounts',            -1000.0),
+            ],
+        )
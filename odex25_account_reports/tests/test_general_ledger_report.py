@@ -193,6 +193,47 @@ class TestGeneralLedgerReport(TestAccountReportsCommon):
                 ],
             )
 
+    def test_general_ledger_unfold_3_load_more_cursor(self):
+        ''' Test the load more when the next slice is fetched using the cursor. '''
+        report = self.env['account.general.ledger']
+        line_id = 'account_%s' % self.company_data['default_account_revenue'].id
+        options = self._init_options(report, fields.Date.from_string('2017-01-01'), fields.Date.from_string('2017-12-31'))
+        options['unfolded_lines'] = [line_id]
+
+        with patch.object(type(report), 'MAX_LINES', 2):
+            report_lines = report._get_lines(options, line_id=line_id)
+            load_more_line = report_lines[4]
+            self.assertTrue(load_more_line['cursor'])
+
+            options['unfolded_lines'] = [load_more_line['id']]
+            options.update({
+                'lines_cursor': load_more_line['cursor'],
+                'lines_remaining': load_more_line['remaining'],
+            })
+
+            report_lines = report._get_lines(options, line_id=load_more_line['id'])
+            self.assertLinesValues(
+                report_lines,
+                #   Name                                    Debit           Credit          Balance
+                [   0,                                      4,              5,              6],
+                [
+                    ('INV/2017/01/0001',                    4000.0,         '',             9000.0),
+                    ('INV/2017/01/0001',                    5000.0,         '',             14000.0),
+                    ('Load more... (1 remaining)',          '',             '',             ''),
+                ],
+            )
+
+    def test_general_ledger_unfold_4_export_chunks(self):
+        ''' Test the lines of the whole printed report are the same when fetched by chunks. '''
+        report = self.env['account.general.ledger'].with_context(print_mode=True)
+        options = self._init_options(report, fields.Date.from_string('2017-01-01'), fields.Date.from_string('2017-12-31'))
+
+        with patch.object(type(report), 'EXPORT_CHUNK_SIZE', 2):
+            chunks = list(report._get_lines_chunks(options))
+
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual([line for lines in chunks for line in lines], report._get_lines(options))
+
     def test_general_ledger_foreign_currency_account(self):
         ''' Ensure the total in foreign currency of an account is displayed only if all journal items are sharing the
         same currency.
@@ -120,6 +120,12 @@ class ReportGeneralLedger(models.AbstractModel):
         self._prepare_lines_for_cash_basis(options)
         return super()._get_lines(options, line_id)
 
+    def _get_lines_chunks(self, options, line_id=None):
+        # The whole report is printed without going through '_get_lines'.
+        if self._is_printed_by_chunks(options, line_id=line_id):
+            self._prepare_lines_for_cash_basis(options)
+        yield from super()._get_lines_chunks(options, line_id=line_id)
+
 
 class ReportAccountFinancialReport(models.Model):
     _inherit = "account.financial.html.report"
@@ -1,14 +1,20 @@
 # -*- coding: utf-8 -*-
 
 import base64
-import re
-import xml.dom.minidom
-from io import BytesIO
+import itertools
+import tempfile
 from collections import defaultdict
 
+from lxml import etree
+from lxml.builder import ElementMaker
+
 from odoo import fields, models, tools, release, _
 from odoo.exceptions import UserError
 
+# Number of journal items fetched at once from the server-side cursor when streaming the general ledger entries.
+SAFT_FETCH_SIZE = 10000
+SAFT_INDENT = '  '
+
 
 class AccountGeneralLedger(models.AbstractModel):
     _inherit = "account.general.ledger"
@@ -245,7 +251,59 @@ class AccountGeneralLedger(models.AbstractModel):
         self._cr.execute(query, where_params)
         return self._cr.dictfetchall()
 
-    def _prepare_amount_data(self, amount, move_line):
+    def _iter_move_lines(self, options):
+        """Yield the journal items of the SAF-T grouped by journal then by journal entry. They are fetched by batches
+        from a server-side cursor so that the whole period is never loaded at once."""
+        query, where_params = self._get_updated_query_amls(options)
+        self._cr.execute('''
+            DECLARE saft_move_lines NO SCROLL CURSOR FOR
+            SELECT * FROM (''' + query + ''') saft_lines
+            ORDER BY saft_lines.journal_id, saft_lines.move_date, saft_lines.move_id, saft_lines.id
+        ''', where_params)
+        try:
+            while True:
+                self._cr.execute('FETCH %s FROM saft_move_lines', [SAFT_FETCH_SIZE])
+                move_lines = self._cr.dictfetchall()
+                if not move_lines:
+                    break
+                yield from move_lines
+        finally:
+            self._cr.execute('CLOSE saft_move_lines')
+
+    def _prepare_general_ledger_summary(self, options):
+        """Same as '_prepare_general_ledger_data' but only compute the totals and the taxes of the journal items with
+        a single aggregated query, the entries themselves being streamed by '_iter_move_lines'."""
+        query, where_params = self._get_updated_query_amls(options)
+        self._cr.execute('''
+            SELECT COUNT(DISTINCT saft_lines.move_id)                                                AS total_entries,
+                   COALESCE(SUM(saft_lines.debit), 0.0)                                              AS total_debit,
+                   COALESCE(SUM(saft_lines.credit), 0.0)                                             AS total_credit,
+                   COALESCE(ARRAY_AGG(DISTINCT COALESCE(saft_lines.tax_line_id, saft_lines.invoice_line_tax_id)), '{}') AS tax_ids
+            FROM (''' + query + ''') saft_lines
+        ''', where_params)
+        summary = self._cr.dictfetchone()
+        all_tax_data = self._get_all_tax_data()
+        return {
+            'all_tax_data': all_tax_data,
+            'taxes': {tax_id: all_tax_data[tax_id] for tax_id in summary['tax_ids'] if tax_id in all_tax_data},
+            'general_ledger_data': {
+                'total_entries': summary['total_entries'],
+                'total_debit': '%.2f' % summary['total_debit'],
+                'total_credit': '%.2f' % summary['total_credit'],
+                'journals': {},
+            },
+        }
+
+    def _get_exchange_rate(self, currency_id, date, rates_cache=None):
+        if rates_cache is not None and (currency_id, date) in rates_cache:
+            return rates_cache[currency_id, date]
+        currency = self.env['res.currency'].browse(currency_id)
+        exchange_rate = currency._get_rates(self.env.company, date)[currency_id]
+        if rates_cache is not None:
+            rates_cache[currency_id, date] = exchange_rate
+        return exchange_rate
+
+    def _prepare_amount_data(self, amount, move_line, rates_cache=None):
         amount_data = {
             'amount': '%.2f' % amount,
         }
@@ -253,7 +311,7 @@ class AccountGeneralLedger(models.AbstractModel):
         company = self.env.company
         if move_line and line_currency_id and company.currency_id.id != line_currency_id:
             currency = self.env['res.currency'].browse(line_currency_id)
-            exchange_rate = currency._get_rates(company, move_line.get('date'))[line_currency_id]
+            exchange_rate = self._get_exchange_rate(line_currency_id, move_line.get('date'), rates_cache)
             amount_data.update({
                 'currency_code': currency.name,
                 'exchange_rate': '%.8f' % exchange_rate,
@@ -273,7 +331,11 @@ class AccountGeneralLedger(models.AbstractModel):
         else:
             return '%.2f' % amount
 
-    def _prepare_general_ledger_data(self, move_lines_data):
+    def _prepare_general_ledger_data(self, move_lines_data, all_tax_data=None, rates_cache=None):
+        """
+        :param all_tax_data:    The taxes as returned by '_get_all_tax_data', fetched if not given.
+        :param rates_cache:     A dictionary caching the exchange rates between calls, see '_get_exchange_rate'.
+        """
         gl_total_entries = 0
         gl_total_debit = 0
         gl_total_credit = 0
@@ -284,7 +346,8 @@ class AccountGeneralLedger(models.AbstractModel):
 
         move_line_tax_info = {} # dictionary holding tax information for all move lines(to be shown for GeneralLedgerEntries transactions)
 
-        all_tax_data = self._get_all_tax_data()
+        if all_tax_data is None:
+            all_tax_data = self._get_all_tax_data()
 
         for move_line in move_lines_data:
             move_id = move_line['move_id']
@@ -298,9 +361,9 @@ class AccountGeneralLedger(models.AbstractModel):
                 tax_master_data[tax_id] = all_tax_data[tax_id]
 
             if move_line.get('credit'):
-                move_line['credit_amount'] = self._prepare_amount_data(move_line.get('credit'), move_line)
+                move_line['credit_amount'] = self._prepare_amount_data(move_line.get('credit'), move_line, rates_cache)
             else:
-                move_line['debit_amount'] = self._prepare_amount_data(move_line.get('debit'), move_line)
+                move_line['debit_amount'] = self._prepare_amount_data(move_line.get('debit'), move_line, rates_cache)
             # `move_line` dictionary has most of the data of moves and move lines
             # hence, just updating line_data dictionary to update it
             line_data = {move_line['id']: move_line}
@@ -350,7 +413,7 @@ class AccountGeneralLedger(models.AbstractModel):
                 tax_amount_signed = self._convert_amount_to_company_currency(move_line['amount_tax'], move_line['currency_id'], move_line['date'])
                 tax_line_dict = {
                     'line_id': move_line['id'],
-                    'amount_data': self._prepare_amount_data(float(tax_amount_signed), move_line),
+                    'amount_data': self._prepare_amount_data(float(tax_amount_signed), move_line, rates_cache),
                 }
                 # In cases when there are multiple taxes applied to same invoice line, the taxed amount is grouped
                 # and saved in the database. So, tax's name/type/amount_type etc can not be determined.
@@ -386,7 +449,11 @@ class AccountGeneralLedger(models.AbstractModel):
             'general_ledger_data': general_ledger_data,
         }
 
-    def _prepare_saft_report_data(self, options):
+    def _prepare_saft_report_data(self, options, stream_move_lines=False):
+        """
+        :param stream_move_lines: Only compute the totals of the general ledger entries, the journal items being
+                                  streamed while writing the file, see '_write_general_ledger_entries'.
+        """
         company = self.env.company
 
         header_data = self._prepare_header_data(options)
@@ -394,8 +461,11 @@ class AccountGeneralLedger(models.AbstractModel):
         account_master_data = self._prepare_account_master_data(options)
 
         customer_master_data, supplier_master_data = self._prepare_partner_master_data(options)
-        move_lines_data = self._get_move_lines(options)
-        data = self._prepare_general_ledger_data(move_lines_data)
+        if stream_move_lines:
+            data = self._prepare_general_ledger_summary(options)
+        else:
+            move_lines_data = self._get_move_lines(options)
+            data = self._prepare_general_ledger_data(move_lines_data)
 
         return dict({
             'xmlns': '',
@@ -415,26 +485,120 @@ class AccountGeneralLedger(models.AbstractModel):
     def _get_xsd_file(self):
         return False
 
+    @tools.ormcache('attachment_id', 'checksum')
+    def _get_xsd_schema_from_attachment(self, attachment_id, checksum):
+        attachment = self.env['ir.attachment'].sudo().browse(attachment_id)
+        return etree.XMLSchema(etree.fromstring(base64.b64decode(attachment.datas)))
+
+    def _get_xsd_schema(self):
+        """Return the XSD schema cached into attachments during SAFT module installation, parsed once per process."""
+        xsd_file = self._get_xsd_file()
+        if not xsd_file:
+            return None
+        attachment = self.env['ir.attachment'].search([('name', '=', 'xsd_cached_{0}'.format(xsd_file.replace('.', '_')))], limit=1)
+        if not attachment:
+            return None
+        return self._get_xsd_schema_from_attachment(attachment.id, attachment.checksum)
+
+    def _check_with_xsd_schema(self, xml_file, schema):
+        """Validate the file against the schema while parsing it, without keeping the whole tree in memory."""
+        try:
+            for dummy, element in etree.iterparse(xml_file, events=('end',), schema=schema):
+                element.clear()
+        except (etree.XMLSyntaxError, etree.DocumentInvalid) as e:
+            raise UserError(str(e))
+
+    def _write_indented(self, xf, element, level):
+        etree.indent(element, space=SAFT_INDENT, level=level)
+        xf.write('\n' + SAFT_INDENT * level)
+        xf.write(element)
+
+    def _render_saft_fragment(self, template, report_data):
+        """Render a sub-template of the SAF-T and return its root elements, in the namespace of the audit file."""
+        content = self.env['ir.qweb']._render(template, report_data)
+        if isinstance(content, str):
+            content = content.encode()
+        parser = etree.XMLParser(remove_blank_text=True)
+        wrapper = b'<AuditFile xmlns="%s">%s</AuditFile>' % ((report_data['xmlns'] or '').encode(), content)
+        return list(etree.fromstring(wrapper, parser=parser))
+
+    def _write_general_ledger_entries(self, xf, E, options, report_data, level):
+        """Write the GeneralLedgerEntries section, streaming the journal items grouped by journal and entry."""
+        general_ledger_data = report_data['general_ledger_data']
+        if not general_ledger_data['total_entries']:
+            return
+        rates_cache = {}
+        xf.write('\n' + SAFT_INDENT * level)
+        with xf.element(E.GeneralLedgerEntries().tag):
+            self._write_indented(xf, E.NumberOfEntries(str(general_ledger_data['total_entries'])), level + 1)
+            self._write_indented(xf, E.TotalDebit(general_ledger_data['total_debit']), level + 1)
+            self._write_indented(xf, E.TotalCredit(general_ledger_data['total_credit']), level + 1)
+            move_lines = self._iter_move_lines(options)
+            for dummy, journal_lines in itertools.groupby(move_lines, key=lambda line: line['journal_id']):
+                journal_lines = iter(journal_lines)
+                first_line = next(journal_lines)
+                xf.write('\n' + SAFT_INDENT * (level + 1))
+                with xf.element(E.Journal().tag):
+                    self._write_indented(xf, E.JournalID(str(first_line['journal_id'])), level + 2)
+                    self._write_indented(xf, E.Description(first_line['journal_name'][:256]), level + 2)
+                    self._write_indented(xf, E.Type(first_line['journal_type'][:9]), level + 2)
+                    lines = itertools.chain([first_line], journal_lines)
+                    for dummy, move_lines_group in itertools.groupby(lines, key=lambda line: line['move_id']):
+                        # Each entry is rendered with the same template as when the whole file is rendered at once.
+                        entry_data = self._prepare_general_ledger_data(list(move_lines_group), all_tax_data=report_data['all_tax_data'], rates_cache=rates_cache)
+                        for move in entry_data['move_data'].values():
+                            values = dict(report_data, move=move, move_line_tax_info=entry_data['move_line_tax_info'])
+                            for element in self._render_saft_fragment('odex25_account_saft.TransactionTemplate', values):
+                                self._write_indented(xf, element, level + 2)
+                    xf.write('\n' + SAFT_INDENT * (level + 1))
+            xf.write('\n' + SAFT_INDENT * level)
+
+    def _write_saft(self, output, options):
+        """Write the SAF-T of the base template into the file-like object output, section by section.
+
+        The Header and MasterFiles sections are rendered with their QWeb templates while the general ledger entries,
+        which make most of the file, are written entry by entry as the journal items are fetched.
+        """
+        report_data = self._prepare_saft_report_data(options, stream_move_lines=True)
+        namespace = report_data['xmlns'] or None
+        E = ElementMaker(namespace=namespace, nsmap={None: namespace} if namespace else None)
+        output.write(b"<?xml version='1.0' encoding='UTF-8'?>\n")
+        with etree.xmlfile(output, encoding='UTF-8') as xf:
+            with xf.element(E.AuditFile().tag, nsmap=E._nsmap):
+                for template in ('odex25_account_saft.HeaderTemplate', 'odex25_account_saft.MasterFilesTemplate'):
+                    for element in self._render_saft_fragment(template, report_data):
+                        self._write_indented(xf, element, 1)
+                self._write_general_ledger_entries(xf, E, options, report_data, 1)
+                xf.write('\n')
+
     def get_xml(self, options):
+        """Return the SAF-T as a temporary file object, positioned at its start, so that it can be streamed to the
+        user without being loaded in memory. The caller is responsible for closing it.
+        """
         template = self._get_template()
         if not template:
             return super().get_xml(options)
 
         # We do not want data from multi companies, just for current selected companies
         'multi_company' in options and options.pop('multi_company')
-        report_data = self._prepare_saft_report_data(options)
-        rendered_content = self.env['ir.qweb']._render(template, report_data)
-        # Indent the XML data and return as Pretty XML string.
-        pretty_xml = xml.dom.minidom.parseString(rendered_content).toprettyxml()
-        # remove extra new lines
-        audit_content = "\n".join(re.split(r'\n\s*\n', pretty_xml))
-
-        xsd_file = self._get_xsd_file()
-
-        # load XSD file which was cached into attachments during SAFT module installation
-        attachment = self.env['ir.attachment'].search([('name', '=', 'xsd_cached_{0}'.format(xsd_file.replace('.', '_')))])
-        if attachment:
-            xsd_datas = base64.b64decode(attachment.datas)
-            with BytesIO(xsd_datas) as xsd:
-                tools.xml_utils._check_with_xsd(audit_content, xsd)
-        return audit_content
+        output = tempfile.TemporaryFile()
+        try:
+            if template == 'odex25_account_saft.SaftTemplate':
+                self._write_saft(output, options)
+            else:
+                # Templates of the localizations are rendered at once.
+                report_data = self._prepare_saft_report_data(options)
+                rendered_content = self.env['ir.qweb']._render(template, report_data)
+                parser = etree.XMLParser(remove_blank_text=True)
+                output.write(etree.tostring(etree.fromstring(rendered_content, parser=parser),
+                                            pretty_print=True, xml_declaration=True, encoding='UTF-8'))
+
+            schema = self._get_xsd_schema()
+            if schema is not None:
+                output.seek(0)
+                self._check_with_xsd_schema(output, schema)
+        except Exception:
+            output.close()
+            raise
+        output.seek(0)
+        return output
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+from lxml import etree
+
+from odoo import fields
+from odoo.addons.odex25_account_reports.tests.common import TestAccountReportsCommon
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSaftReport(TestAccountReportsCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+
+        cls.company_data['company'].write({
+            'company_registry': '1010101010',
+            'city': 'Riyadh',
+            'zip': '12211',
+            'phone': '+966 11 000 0000',
+        })
+        cls.partner_a.write({
+            'city': 'Jeddah',
+            'zip': '21411',
+            'phone': '+966 12 000 0000',
+        })
+        cls.invoice = cls.init_invoice('out_invoice', partner=cls.partner_a, invoice_date='2019-01-15', post=True, products=cls.product_a)
+        cls.bill = cls.init_invoice('in_invoice', partner=cls.partner_a, invoice_date='2019-01-20', post=True, products=cls.product_b)
+        cls.report = cls.env['account.general.ledger']
+
+    def _get_options(self, date_from, date_to):
+        return self._init_options(self.report, fields.Date.from_string(date_from), fields.Date.from_string(date_to))
+
+    def _get_saft_tree(self, date_from, date_to):
+        with self.report.get_xml(self._get_options(date_from, date_to)) as saft_file:
+            return etree.parse(saft_file, etree.XMLParser(remove_blank_text=True)).getroot()
+
+    def _get_general_ledger_entries(self, root):
+        ''' Return the GeneralLedgerEntries element of a SAF-T as a string, with the journals, entries and journal items
+        sorted by id as their order is not the same when the file is streamed.
+        '''
+        def sort_children(node, tag, key_tag):
+            children = [child for child in node if child.tag == tag]
+            for child in children:
+                node.remove(child)
+            node.extend(sorted(children, key=lambda child: int(child.findtext(key_tag))))
+
+        entries = root.find('GeneralLedgerEntries')
+        sort_children(entries, 'Journal', 'JournalID')
+        for journal in entries.iter('Journal'):
+            sort_children(journal, 'Transaction', 'TransactionID')
+        for transaction in entries.iter('Transaction'):
+            sort_children(transaction, 'Line', 'RecordID')
+        return etree.tostring(entries)
+
+    def test_saft_empty_period(self):
+        root = self._get_saft_tree('2018-01-01', '2018-12-31')
+        self.assertEqual(etree.QName(root).localname, 'AuditFile')
+        self.assertFalse(root.xpath('//*[local-name()="GeneralLedgerEntries"]'))
+
+    def test_saft_general_ledger_entries(self):
+        root = self._get_saft_tree('2019-01-01', '2019-01-31')
+        entries = root.xpath('//*[local-name()="GeneralLedgerEntries"]')
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].xpath('string(*[local-name()="NumberOfEntries"])'), '2')
+        self.assertEqual(entries[0].xpath('string(*[local-name()="TotalDebit"])'), '%.2f' % (self.invoice.amount_total + self.bill.amount_total))
+        transactions = entries[0].xpath('.//*[local-name()="Transaction"][*[local-name()="TransactionID"]="%s"]' % self.invoice.id)
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(
+            sorted(int(record_id) for record_id in transactions[0].xpath('*[local-name()="Line"]/*[local-name()="RecordID"]/text()')),
+            sorted(self.invoice.line_ids.ids),
+        )
+
+    def test_saft_streamed_as_rendered(self):
+        ''' The streamed general ledger entries must be the same as the ones rendered by the QWeb templates. '''
+        streamed_root = self._get_saft_tree('2019-01-01', '2019-01-31')
+
+        report_data = self.report._prepare_saft_report_data(self._get_options('2019-01-01', '2019-01-31'))
+        rendered_content = self.env['ir.qweb']._render('odex25_account_saft.SaftTemplate', report_data)
+        rendered_root = etree.fromstring(rendered_content, etree.XMLParser(remove_blank_text=True))
+
+        self.assertEqual(self._get_general_ledger_entries(streamed_root), self._get_general_ledger_entries(rendered_root))
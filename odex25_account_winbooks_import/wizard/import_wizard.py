@@ -7,6 +7,7 @@ import logging
 import os
 import zipfile
 import re
+import time
 from datetime import datetime, timedelta
 from tempfile import TemporaryDirectory
 
@@ -24,6 +25,9 @@ except ImportError:
     DBF = None
     _logger.warning('dbfread library not found, Winbooks Import features disabled. If you plan to use it, please install the dbfread library from https://pypi.org/project/dbfread/')
 
+# Number of journal entries created, posted and committed together during the import of the moves.
+MOVE_BATCH_SIZE = 1000
+
 
 class WinbooksImportWizard(models.TransientModel):
     _name = "account.winbooks.import.wizard"
@@ -48,21 +52,31 @@ class WinbooksImportWizard(models.TransientModel):
         category_data = {}
         ResPartnerTitle = self.env['res.partner.title']
         ResPartnerCategory = self.env['res.partner.category']
+        title_ids = self._get_lookup_data(ResPartnerTitle, 'shortcut')
+        category_ids = self._get_lookup_data(ResPartnerCategory, 'name')
         for file_name in files:
             for rec in DBF(join(file_dir, file_name), encoding='latin').records:
                 if rec.get('TTYPE') == 'CIVILITY':
                     shortcut = rec.get('TID')
-                    title = ResPartnerTitle.search([('shortcut', '=', shortcut)], limit=1)
-                    if not title:
-                        title = ResPartnerTitle.create({'shortcut': shortcut, 'name': rec.get('TDESC')})
-                    civility_data[shortcut] = title.id
+                    if shortcut not in title_ids:
+                        title_ids[shortcut] = ResPartnerTitle.create({'shortcut': shortcut, 'name': rec.get('TDESC')}).id
+                    civility_data[shortcut] = title_ids[shortcut]
                 elif rec.get('TTYPE').startswith('CAT'):
-                    category = ResPartnerCategory.search([('name', '=', rec.get('TDESC'))], limit=1)
-                    if not category:
-                        category = ResPartnerCategory.create({'name': rec.get('TDESC')})
-                    category_data[rec.get('TID')] = category.id
+                    if rec.get('TDESC') not in category_ids:
+                        category_ids[rec.get('TDESC')] = ResPartnerCategory.create({'name': rec.get('TDESC')}).id
+                    category_data[rec.get('TID')] = category_ids[rec.get('TDESC')]
         return civility_data, category_data
 
+    def _get_lookup_data(self, model, field_name, domain=None):
+        """Load in one query the records used as lookup during the import.
+        :return: a dictionary whose keys are the values of field_name and the
+            values the ids of the first record (in the default order) having it.
+        """
+        lookup_data = {}
+        for record in model.search_read([(field_name, '!=', False)] + (domain or []), [field_name]):
+            lookup_data.setdefault(record[field_name], record['id'])
+        return lookup_data
+
     def import_partner(self, file_dir, files, civility_data, category_data, account_data):
         """Import partners from *_csf*.dbf files.
         The data in those files is the partner details, its type, its category,
@@ -76,15 +90,19 @@ class WinbooksImportWizard(models.TransientModel):
         ResCountry = self.env['res.country']
         ResPartner = self.env['res.partner']
         ResPartnerBank = self.env['res.partner.bank']
+        partner_ids_by_ref = self._get_lookup_data(ResPartner, 'ref')
+        country_ids = self._get_lookup_data(ResCountry, 'code')
+        partner_bank_ids = self._get_lookup_data(ResPartnerBank, 'acc_number')
+        bank_ids = self._get_lookup_data(ResBank, 'name')
         partner_data_dict = {}
         for file_name in files:
             for rec in DBF(join(file_dir, file_name), encoding='latin').records:
                 if not rec.get('NUMBER'):
                     continue
-                partner = ResPartner.search([('ref', '=', rec.get('NUMBER'))], limit=1)
-                if partner:
-                    partner_data[rec.get('NUMBER')] = partner.id
-                if not partner:
+                partner_id = partner_ids_by_ref.get(rec.get('NUMBER'))
+                if partner_id:
+                    partner_data[rec.get('NUMBER')] = partner_id
+                else:
                     vatcode = rec.get('VATNUMBER') and rec.get('COUNTRY') and (rec.get('COUNTRY') + rec.get('VATNUMBER').replace('.', ''))
                     if not rec.get('VATNUMBER') or not rec.get('COUNTRY') or not ResPartner.simple_vat_check(rec.get('COUNTRY').lower(), vatcode):
                         vatcode = ''
@@ -92,7 +110,7 @@ class WinbooksImportWizard(models.TransientModel):
                         'ref': rec.get('NUMBER'),
                         'name': rec.get('NAME1'),
                         'street': rec.get('ADRESS1'),
-                        'country_id': ResCountry.search([('code', '=', rec.get('COUNTRY'))], limit=1).id,
+                        'country_id': country_ids.get(rec.get('COUNTRY'), False),
                         'city': rec.get('CITY'),
                         'street2': rec.get('ADRESS2'),
                         'vat': vatcode,
@@ -113,17 +131,15 @@ class WinbooksImportWizard(models.TransientModel):
                         })
                     # manage the bank account of the partner
                     if rec.get('IBANAUTO'):
-                        partner_bank = ResPartnerBank.search([('acc_number', '=', rec.get('IBANAUTO'))], limit=1)
-                        if partner_bank:
-                            data['bank_ids'] = [(4, partner_bank.id)]
+                        if rec.get('IBANAUTO') in partner_bank_ids:
+                            data['bank_ids'] = [(4, partner_bank_ids[rec.get('IBANAUTO')])]
                         else:
-                            bank = ResBank.search([('name', '=', rec.get('BICAUTO'))], limit=1)
-                            if not bank:
-                                bank = ResBank.create({'name': rec.get('BICAUTO')})
+                            if rec.get('BICAUTO') not in bank_ids:
+                                bank_ids[rec.get('BICAUTO')] = ResBank.create({'name': rec.get('BICAUTO')}).id
                             data.update({
                                 'bank_ids': [(0, 0, {
                                     'acc_number': rec.get('IBANAUTO'),
-                                    'bank_id': bank.id
+                                    'bank_id': bank_ids[rec.get('BICAUTO')]
                                 })],
                             })
                     # manage the default payable/receivable accounts for the partner
@@ -209,24 +225,29 @@ class WinbooksImportWizard(models.TransientModel):
         for item in recs:
             grouped[item.get('TYPE')].append(item)
         rec_number_list = []
+        rec_number_set = set()
         account_data_list = []
         journal_centered_list = []
         is_deprecated_list = []
         account_deprecated_ids = self.env['account.account']
+        account_ids_by_code = self._get_lookup_data(AccountAccount, 'code', [('company_id', '=', self.env.company.id)])
+        group_ids = self._get_lookup_data(AccountGroup, 'code_prefix_start')
+        currency_ids = self._get_lookup_data(ResCurrency, 'name')
+        for account_type in account_types:
+            account_type['user_type_id'] = self.env.ref(account_type['id']).id
         for key, val in grouped.items():
             if key == '3':  # 3=general account, 9=title account
                 for rec in val:
-                    account = AccountAccount.search(
-                        [('code', '=', rec.get('NUMBER')), ('company_id', '=', self.env.company.id)], limit=1)
+                    account = AccountAccount.browse(account_ids_by_code.get(rec.get('NUMBER')))
                     if account:
                         account_data[rec.get('NUMBER')] = account.id
                         rec['CENTRALID'] and manage_centralid(account, rec['CENTRALID'])
-                    if not account and rec.get('NUMBER') not in rec_number_list:
+                    if not account and rec.get('NUMBER') not in rec_number_set:
                         data = {
                             'code': rec.get('NUMBER'),
                             'name': rec.get('NAME11'),
-                            'group_id': AccountGroup.search([('code_prefix_start', '=', rec.get('CATEGORY'))], limit=1).id,
-                            'currency_id': ResCurrency.search([('name', '=', rec.get('CURRENCY'))], limit=1).id
+                            'group_id': group_ids.get(rec.get('CATEGORY'), False),
+                            'currency_id': currency_ids.get(rec.get('CURRENCY'), False),
                         }
                         if rec.get('VATCODE'):
                             account_tax[rec.get('NUMBER')] = rec.get('VATCODE')
@@ -238,7 +259,7 @@ class WinbooksImportWizard(models.TransientModel):
                         for account_type in account_types:
                             if account_code in range(account_type['min'], account_type['max']):
                                 data.update({
-                                    'user_type_id': self.env.ref(account_type['id']).id,
+                                    'user_type_id': account_type['user_type_id'],
                                     'reconcile': account_type.get('reconcile', False)
                                 })
                                 break
@@ -247,6 +268,7 @@ class WinbooksImportWizard(models.TransientModel):
                             data['user_type_id'] = self.env.ref('account.data_account_type_other_income').id
                         account_data_list.append(data)
                         rec_number_list.append(rec.get('NUMBER'))
+                        rec_number_set.add(rec.get('NUMBER'))
                         journal_centered_list.append(rec.get('CENTRALID'))
                         is_deprecated_list.append(rec.get('ISLOCKED'))
 
@@ -324,9 +346,8 @@ class WinbooksImportWizard(models.TransientModel):
         @scandbk.zip files are the attachments.
         """
         _logger.info("Import Moves")
-        recs = []
         ResCurrency = self.env['res.currency']
-        IrAttachment = self.env['ir.attachment']
+        AccountAccount = self.env['account.account']
         suspense_account = self.env['account.account'].search([('code', '=', self.suspense_code)], limit=1)
         if not self.only_open and not suspense_account:
             raise UserError(_("The code for the Suspense Account you entered doesn't match any account"))
@@ -334,15 +355,28 @@ class WinbooksImportWizard(models.TransientModel):
         for file_name in scanfiles:
             with zipfile.ZipFile(join(file_dir, file_name), 'r') as scan_zip:
                 scan_zip.extractall(file_dir)
+        # The records are streamed from the files and duplicates are dropped on the fly.
+        seen_recs = set()
+        grouped = collections.defaultdict(list)
         for file_name in files:
             for rec in DBF(join(file_dir, file_name), encoding='latin').records:
-                if rec.get('BOOKYEAR') and rec.get('DOCNUMBER') != '99999999':
-                    recs.append(rec)
-        result = [dict(tupleized) for tupleized in set(tuple(item.items()) for item in recs)]
-        grouped = collections.defaultdict(list)
-        for item in result:
-            # Group by number/year/period
-            grouped[item['DOCNUMBER'], item['DBKCODE'], item['DBKTYPE'], item['BOOKYEAR'], item['PERIOD']] += [item]
+                if not rec.get('BOOKYEAR') or rec.get('DOCNUMBER') == '99999999':
+                    continue
+                tupleized = tuple(rec.items())
+                if tupleized in seen_recs:
+                    continue
+                seen_recs.add(tupleized)
+                # Group by number/year/period
+                grouped[rec['DOCNUMBER'], rec['DBKCODE'], rec['DBKTYPE'], rec['BOOKYEAR'], rec['PERIOD']] += [dict(rec)]
+        seen_recs = None
+
+        currencies = {currency.name: currency for currency in ResCurrency.search([])}
+        currencies[self.env.company.currency_id.name] = ResCurrency
+        accounts = AccountAccount.browse(list(set(account_data.values())))
+        account_types = {account.id: account.user_type_id.type for account in accounts}
+        scanned_files = self._get_scanned_files(file_dir)
+        imported_moves = self._get_imported_moves(journal_data)
+        imported_count = 0
 
         move_data_list = []
         pdf_file_list = []
@@ -371,6 +405,12 @@ class WinbooksImportWizard(models.TransientModel):
             }
             if not move_data_dict.get('journal_id') and key[1] == 'MATCHG':
                 continue
+            # Resume an interrupted import: the moves of the batches already committed are skipped but their lines
+            # might still have to be reconciled.
+            if (move_data_dict['journal_id'], move_data_dict['ref'], move_data_dict['date']) in imported_moves:
+                reconcile_number_set.update('%s-%s' % (rec['ACCOUNTGL'], rec['MATCHNO']) for rec in val if rec.get('MATCHNO'))
+                imported_count += 1
+                continue
             move_line_data_list = []
             move_amount_total = 0
             move_total_receivable_payable = 0
@@ -387,11 +427,9 @@ class WinbooksImportWizard(models.TransientModel):
 
             # Basic line info
             for rec in val:
-                currency = ResCurrency.search([('name', '=', rec.get('CURRCODE'))], limit=1)
-                if currency == self.env.company.currency_id:
-                    currency = self.env['res.currency']
+                currency = currencies.get(rec.get('CURRCODE'), ResCurrency)
                 partner_id = self.env['res.partner'].browse(partner_data.get(rec.get('ACCOUNTRP'), False))
-                account_id = self.env['account.account'].browse(account_data.get(rec.get('ACCOUNTGL')))
+                account_id = AccountAccount.browse(account_data.get(rec.get('ACCOUNTGL')))
                 matching_number = rec.get('MATCHNO') and '%s-%s' % (rec.get('ACCOUNTGL'), rec.get('MATCHNO')) or False
                 line_data = {
                     'date': rec.get('DATE', False),
@@ -405,14 +443,14 @@ class WinbooksImportWizard(models.TransientModel):
                     'amount_currency': rec.get('CURRAMOUNT') if currency and rec.get('CURRAMOUNT') else 0.0,
                     'amount_residual_currency': rec.get('CURRAMOUNT') if currency and rec.get('CURRAMOUNT') else 0.0,
                     'winbooks_matching_number': matching_number,
-                    'exclude_from_invoice_tab': rec.get('DOCORDER') == 'VAT' or (account_id.user_type_id.type in ('receivable', 'payable') and journal_id.type in ('sale', 'purchase')),
+                    'exclude_from_invoice_tab': rec.get('DOCORDER') == 'VAT' or (account_types.get(account_id.id) in ('receivable', 'payable') and journal_id.type in ('sale', 'purchase')),
                 }
                 if matching_number:
                     reconcile_number_set.add(matching_number)
                 if rec.get('AMOUNTEUR'):
                     move_amount_total = round(move_amount_total, 2) + round(rec.get('AMOUNTEUR'), 2)
                 move_line_data_list.append((0, 0, line_data))
-                if account_id.user_type_id.type in ('receivable', 'payable'):
+                if account_types.get(account_id.id) in ('receivable', 'payable'):
                     move_total_receivable_payable += rec.get('AMOUNTEUR')
 
             # Compute refund value
@@ -423,7 +461,7 @@ class WinbooksImportWizard(models.TransientModel):
 
             # Add tax information
             for line_data, rec in zip(move_line_data_list, val):
-                if self.env['account.account'].browse(account_data.get(rec.get('ACCOUNTGL'))).user_type_id.type in ('receivable', 'payable'):
+                if account_types.get(account_data.get(rec.get('ACCOUNTGL'))) in ('receivable', 'payable'):
                     continue
                 tax_line = self.env['account.tax'].browse(vatcode_data.get(rec.get('VATCODE') or rec.get('VATIMPUT', [])))
                 if not tax_line and line_data[2]['account_id'] in account_central.values():
@@ -471,34 +509,33 @@ class WinbooksImportWizard(models.TransientModel):
             # Link all to the move
             move_data_dict['line_ids'] = move_line_data_list
             attachment = '%s_%s_%s' % (key[1], key[4], key[0])
-            pdf_file = self.find_file(attachment, file_dir)
+            pdf_file = [path for path in scanned_files if attachment in os.path.basename(path)]
             pdf_file_list.append(pdf_file)
             move_data_list.append(move_data_dict)
 
-            if len(move_data_list) % 100 == 0:
-                _logger.info("Advancement: {}".format(len(move_data_list)))
+            if len(move_data_list) >= MOVE_BATCH_SIZE:
+                imported_count += self._create_moves(move_data_list, pdf_file_list)
+                _logger.info("Advancement: {}/{} moves".format(imported_count, len(grouped)))
+                move_data_list, pdf_file_list = [], []
+
+        if move_data_list:
+            imported_count += self._create_moves(move_data_list, pdf_file_list)
+            _logger.info("Advancement: {}/{} moves".format(imported_count, len(grouped)))
 
-        _logger.info("Creating moves")
-        move_ids = self.env['account.move'].create(move_data_list)
-        move_ids._post()
-        _logger.info("Creating attachments")
-        for move, pdf_file in zip(move_ids, pdf_file_list):
-            if pdf_file:
-                attachment_ids = []
-                for pdf in pdf_file:
-                    attachment_data = {
-                        'name': pdf.split('/')[-1],
-                        'type': 'binary',
-                        'datas': base64.b64encode(open(pdf, "rb").read()),
-                        'res_model': move._name,
-                        'res_id': move.id,
-                        'res_name': move.name
-                    }
-                    attachment_ids.append(IrAttachment.create(attachment_data))
-                move.message_post(attachments=attachment_ids)
         _logger.info("Reconcile")
-        for matching_number in reconcile_number_set:
-            lines = self.env['account.move.line'].search([('winbooks_matching_number', '=', matching_number), ('reconciled', '=', False)])
+        AccountMoveLine = self.env['account.move.line']
+        AccountMoveLine.flush(['winbooks_matching_number', 'reconciled'])
+        self._cr.execute('''
+            SELECT winbooks_matching_number, ARRAY_AGG(id)
+            FROM account_move_line
+            WHERE winbooks_matching_number = ANY(%s)
+            AND reconciled IS NOT TRUE
+            GROUP BY winbooks_matching_number
+        ''', [list(reconcile_number_set)])
+        line_ids_by_number = dict(self._cr.fetchall())
+        all_line_ids = [line_id for line_ids in line_ids_by_number.values() for line_id in line_ids]
+        for matching_number, line_ids in line_ids_by_number.items():
+            lines = AccountMoveLine.browse(line_ids).with_prefetch(all_line_ids)
             try:
                 lines.with_context(no_exchange_difference=True).reconcile()
             except UserError as ue:
@@ -512,6 +549,62 @@ class WinbooksImportWizard(models.TransientModel):
                     raise ue
         return True
 
+    def _get_scanned_files(self, file_dir):
+        """List once the files that can be attached to the imported moves, see `find_file`."""
+        return [
+            os.path.join(root, file_name)
+            for root, dirs, files in os.walk(file_dir)
+            for file_name in files
+            if '.xml' not in file_name.lower()
+        ]
+
+    def _get_imported_moves(self, journal_data):
+        """Retrieve the moves created by a previous execution of the import.
+        :return: a set of (journal_id, ref, date) tuples.
+        """
+        if not journal_data:
+            return set()
+        self.env['account.move'].flush(['journal_id', 'ref', 'date', 'company_id'])
+        self._cr.execute('''
+            SELECT journal_id, ref, date
+            FROM account_move
+            WHERE company_id = %s
+            AND journal_id = ANY(%s)
+            AND ref IS NOT NULL
+        ''', [self.env.company.id, list(set(journal_data.values()))])
+        return set(self._cr.fetchall())
+
+    def _create_moves(self, move_data_list, pdf_file_list):
+        """Create and post a batch of moves with their attachments. The batch is
+        committed so that an interrupted import can be resumed by running it
+        again with the same file.
+        :return: the number of moves created.
+        """
+        start = time.time()
+        move_ids = self.env['account.move'].create(move_data_list)
+        move_ids._post()
+        attachment_data_list = []
+        for move, pdf_file in zip(move_ids, pdf_file_list):
+            for pdf in pdf_file:
+                with open(pdf, 'rb') as pdf_content:
+                    attachment_data_list.append({
+                        'name': pdf.split('/')[-1],
+                        'type': 'binary',
+                        'datas': base64.b64encode(pdf_content.read()),
+                        'res_model': move._name,
+                        'res_id': move.id,
+                        'res_name': move.name
+                    })
+        attachment_ids_by_move = collections.defaultdict(list)
+        for attachment in self.env['ir.attachment'].create(attachment_data_list):
+            attachment_ids_by_move[attachment.res_id].append(attachment.id)
+        for move in move_ids.filtered(lambda m: m.id in attachment_ids_by_move):
+            move.message_post(attachment_ids=attachment_ids_by_move[move.id])
+        if not self.pool.in_test_mode():
+            self.env.cr.commit()
+        _logger.info("%s moves created in %.1fs", len(move_ids), time.time() - start)
+        return len(move_ids)
+
     def import_analytic_account(self, file_dir, files):
         """Import the analytic accounts from *_anf*.dbf files.
         :return: a dictionary whose keys are the Winbooks analytic account
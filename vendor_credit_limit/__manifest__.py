@@ -15,7 +15,6 @@
 
     'data': [
         'security/ir.model.access.csv',
-        'data/ir_cron.xml',
         'views/res_partner_views.xml',
     ],
 
@@ -5,38 +5,51 @@ from odoo.exceptions import ValidationError
 class AccountMove(models.Model):
     _inherit = 'account.move'
 
-    def action_post(self):
-        result = super(AccountMove, self).action_post()
-        for inv in self:
-            if inv.move_type in {'out_refund', 'out_invoice'}:
-                partner = inv.partner_id
-                invoice_date = inv.invoice_date or fields.Date.today()
+    def _get_credit_limit_line(self, check_period=True):
+        """Return the limit line of the partner covering the invoice, the first one whose period includes the
+        invoice date."""
+        self.ensure_one()
+        invoice_date = self.invoice_date or fields.Date.today()
+        for lim in self.partner_id.limit_ids:
+            if check_period and lim.remaining_period == 0:
+                raise ValidationError(_("❌ You have exceeded the allowed period."))
+            days_passed = (invoice_date - lim.create_date.date()).days
+            if days_passed <= lim.period:
+                return lim
+        return self.env['vendor.limit.lines']
 
-                if partner and partner.agreement_limit:
-                    for lim in partner.limit_ids:
-                        if lim.remaining_period == 0 :
-                            raise ValidationError(_("❌ You have exceeded the allowed period."))
-                        days_passed = (invoice_date - lim.create_date.date()).days
-                        if days_passed <= lim.period:
-                            if inv.amount_total <= lim.residual_credit:
-                                lim.used_credit += inv.amount_total
-                                return result
-                            else:
-                                raise ValidationError(_("❌ You have exceeded the allowed limit!"))
+    def _get_credit_limit_amounts(self, raise_if_not_found=True):
+        """Group the amounts of the customer invoices and refunds in self by limit line.
 
-                    raise ValidationError(_("❌ No valid credit agreement found within the allowed period."))
+        :param raise_if_not_found: Raise if a partner under agreement has no limit line covering the invoice or if
+                                   the period of one of its lines is over.
+        :return: A dictionary mapping the limit line ids to the total amount of their invoices.
+        """
+        amounts = {}
+        for inv in self:
+            if inv.move_type not in {'out_refund', 'out_invoice'}:
+                continue
+            if not inv.partner_id or not inv.partner_id.agreement_limit:
+                continue
+            lim = inv._get_credit_limit_line(check_period=raise_if_not_found)
+            if lim:
+                amounts[lim.id] = amounts.get(lim.id, 0.0) + inv.amount_total
+            elif raise_if_not_found:
+                raise ValidationError(_("❌ No valid credit agreement found within the allowed period."))
+        return amounts
 
+    def action_post(self):
+        result = super(AccountMove, self).action_post()
+        amounts = self._get_credit_limit_amounts()
+        if amounts:
+            self.env['vendor.limit.lines']._reserve_credit(amounts)
         return result
 
     def button_draft(self):
         result = super(AccountMove, self).button_draft()
-        for inv in self:
-            if inv.move_type in {'out_refund', 'out_invoice'}:
-                partner = inv.partner_id
-                if partner and partner.agreement_limit:
-                    for lim in partner.limit_ids:
-                        days_passed = (inv.invoice_date - lim.create_date.date()).days
-                        if days_passed <= lim.period:
-                            lim.used_credit -= inv.amount_total
-                            return result
-        return result
\ No newline at end of file
+        amounts = self._get_credit_limit_amounts(raise_if_not_found=False)
+        if amounts:
+            self.env['vendor.limit.lines']._reserve_credit({
+                line_id: -amount for line_id, amount in amounts.items()
+            }, check=False)
+        return result
@@ -1,4 +1,5 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -19,8 +20,8 @@ class LimitLines(models.Model):
     start_date = fields.Date("Start Date")
     end_date = fields.Date("End Date")
     period = fields.Integer("Allowed Period (Days)", help="The number of days for the credit limit period")
-    used_period = fields.Integer("Used Period")
-    remaining_period = fields.Integer("Remaining Period", compute="_compute_remaining_period", store=True)
+    used_period = fields.Integer("Used Period", compute="_compute_remaining_period")
+    remaining_period = fields.Integer("Remaining Period", compute="_compute_remaining_period")
     opening_balance = fields.Float("Opening Balance", digits=(8, 2))
     upper_limit = fields.Float("Upper Limit", digits=(8, 2), compute="compute_upper_limit", store=True, readonly=False)
     used_credit = fields.Float("Used Credit", digits=(8, 2), readonly=True)
@@ -43,19 +44,42 @@ class LimitLines(models.Model):
             else:
                 rec.upper_limit = 0.0
 
-    @api.depends('period', 'used_period')
+    @api.depends('period', 'create_date')
     def _compute_remaining_period(self):
+        today = fields.Date.context_today(self)
         for rec in self:
+            rec.used_period = (today - rec.create_date.date()).days if rec.create_date else 0
             if rec.period > 0:
                 rec.remaining_period = rec.period - rec.used_period
             else:
                 rec.remaining_period = 0
 
     @api.model
-    def calculate_remaining_period(self):
-        records = self.search([('period', '>', 0)])
-        _logger.info(">> Starting cron: calculate_remaining_period")
-        for rec in records:
-            _logger.info(f">> Processing record ID: {rec.id}")
-            rec.used_period += 1
-            rec.remaining_period = rec.period - rec.used_period
\ No newline at end of file
+    def _reserve_credit(self, amounts, check=True):
+        """Atomically add amounts to the used credit of limit lines.
+
+        The check and the update are done by a single UPDATE statement, which locks the rows of the limit lines
+        until the end of the transaction, so that concurrent postings can't exceed nor lose a reservation.
+
+        :param amounts: A dictionary mapping the limit line ids to the amount to add to their used credit.
+        :param check: Raise if the residual credit of a line is lower than its amount.
+        """
+        line_ids = list(amounts)
+        self.flush(['used_credit', 'residual_credit', 'upper_limit', 'opening_balance'])
+        self._cr.execute("""
+            UPDATE vendor_limit_lines lim
+            SET used_credit = COALESCE(lim.used_credit, 0) + reserve.amount,
+                residual_credit = CASE
+                    WHEN lim.upper_limit > 0 AND lim.opening_balance != 0
+                    THEN lim.upper_limit - (COALESCE(lim.used_credit, 0) + reserve.amount) - lim.opening_balance
+                    ELSE lim.residual_credit
+                END
+            FROM UNNEST(%s::integer[], %s::numeric[]) AS reserve(id, amount)
+            WHERE lim.id = reserve.id
+            AND (NOT %s OR COALESCE(lim.residual_credit, 0) >= reserve.amount)
+            RETURNING lim.id
+        """, [line_ids, [amounts[line_id] for line_id in line_ids], check])
+        updated_ids = {row[0] for row in self._cr.fetchall()}
+        self.browse(line_ids).invalidate_cache(['used_credit', 'residual_credit'])
+        if check and len(updated_ids) != len(line_ids):
+            raise ValidationError(_("❌ You have exceeded the allowed limit!"))
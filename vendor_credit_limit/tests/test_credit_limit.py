@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+
+@tagged('post_install', '-at_install')
+class TestVendorCreditLimit(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.partner_a.agreement_limit = True
+        cls.limit_line = cls.env['vendor.limit.lines'].create({
+            'vendor_id': cls.partner_a.id,
+            'period': 30,
+            'upper_limit': 1000.0,
+            'opening_balance': 100.0,
+        })
+
+    def _create_invoice(self, amount):
+        return self.init_invoice('out_invoice', partner=self.partner_a, invoice_date=fields.Date.today(), amounts=[amount])
+
+    def test_post_over_limit(self):
+        invoice = self._create_invoice(5000.0)
+        with self.assertRaises(ValidationError):
+            invoice.action_post()
+        self.assertRecordValues(self.limit_line, [{'used_credit': 0.0, 'residual_credit': 900.0}])
+
+    def test_post_multi_invoices_same_line(self):
+        invoices = self._create_invoice(100.0) + self._create_invoice(200.0)
+        invoices.action_post()
+        total = sum(invoices.mapped('amount_total'))
+        self.assertRecordValues(self.limit_line, [{'used_credit': total, 'residual_credit': 900.0 - total}])
+
+        # Resetting an invoice to draft releases its credit.
+        invoices[0].button_draft()
+        used_credit = invoices[1].amount_total
+        self.assertRecordValues(self.limit_line, [{'used_credit': used_credit, 'residual_credit': 900.0 - used_credit}])